@@ -1,46 +1,102 @@
-from flask import Flask, send_from_directory
+from flask import Flask, send_from_directory, jsonify, request, abort
 from flask_cors import CORS
+import hmac
 import os
-from dotenv import load_dotenv
 import sys
 
 # Add current directory to path to ensure imports work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables
-load_dotenv()
+# config loads .env exactly once for the whole app
+from config import Config
+from utils.uploads import SpooledRequest
+
+# Route all logging through a non-blocking queue before anything logs
+from utils.logger import init_logging
 
 app = Flask(__name__, static_folder='../frontend', static_url_path='')
+app.request_class = SpooledRequest
+# orjson-backed (stdlib fallback) serializer for jsonify, request.get_json and NDJSON streams
+from utils.json_provider import FastJSONProvider
+app.json = FastJSONProvider(app)
+# Oversized request bodies are rejected by Werkzeug before they are read
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+init_logging(app)
 
 # Configure CORS
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
+# Per-route latency, status and Supabase/bcrypt/SMTP timings, exposed at /metrics
+from utils.metrics import init_metrics
+init_metrics(app)
+
 # Import and register blueprints
 from routes.auth_routes import auth_bp
 from routes.user_routes import user_bp
 from routes.item_routes import item_bp
 from routes.account_routes import account_bp
+from routes.search_routes import search_bp
+from routes.bootstrap_routes import bootstrap_bp
+from routes.sync_routes import sync_bp
 
 app.register_blueprint(auth_bp)
 app.register_blueprint(user_bp)
 app.register_blueprint(item_bp)
 app.register_blueprint(account_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(bootstrap_bp)
+app.register_blueprint(sync_bp)
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'success': False, 'message': 'Uploaded file is too large.'}), 413
+
+# Fingerprinted, precompressed frontend assets served from memory under /assets
+from utils.static_assets import static_assets
+static_assets.init_app(app)
 
 @app.route('/')
+@app.route('/index.html')
 def serve_index():
-    return send_from_directory(app.static_folder, 'index.html')
+    return static_assets.serve_page('index.html')
 
 @app.route('/dashboard')
+@app.route('/dashboard.html')
 def serve_dashboard():
-    return send_from_directory(app.static_folder, 'dashboard.html')
+    return static_assets.serve_page('dashboard.html')
 
 @app.route('/images/<path:filename>')
 def serve_images(filename):
-    return send_from_directory(os.path.join(app.static_folder, 'images'), filename)
+    response = static_assets.serve_file(f'images/{filename}', 'public, max-age=86400')
+    if response is None:
+        return send_from_directory(os.path.join(app.static_folder, 'images'), filename)
+    return response
+
+# Mail templates compile on first render and static assets on first request;
+# with LAZY_INIT off (the default outside Vercel) everything is built up front
+from utils.mail_templates import mail_templates
+from utils.warmup import warmup
+if not Config.LAZY_INIT:
+    warmup()
+
+# Image deletions a previous process left in its spill file
+from utils.storage_cleanup import storage_cleanup
+storage_cleanup.resume()
+
+@app.route('/warmup')
+def warmup_route():
+    # Point a cron job or deploy hook here to pay lazy-init costs before real traffic
+    if not Config.WARMUP_TOKEN:
+        abort(404)
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode('utf-8'), Config.WARMUP_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'message': 'Unauthorized.'}), 401
+    return jsonify({'success': True, 'timingsMs': warmup()})
 
 # Vercel requires the app to be exposed as 'app'
 # The existing code already does this: app = Flask(...)
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    mail_templates.auto_reload = True
     app.run(host='0.0.0.0', port=port, debug=True)
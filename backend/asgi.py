@@ -0,0 +1,90 @@
+"""ASGI entry point: async controllers in front of the Flask app.
+
+The I/O-heavy routes in routes/aio_routes.py (accounts, items, /bootstrap)
+run as coroutines on one event loop, sharing an async Supabase client, so a
+worker process serves many of them concurrently. Every other route falls
+through to the Flask app in `app.py` on a thread pool. Needs the packages in
+requirements-async.txt:
+
+    hypercorn asgi:app --bind 0.0.0.0:5000
+    uvicorn asgi:app --port 5000
+"""
+import os
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from quart import Quart, request, g, jsonify
+from werkzeug.exceptions import HTTPException
+from a2wsgi import WSGIMiddleware
+from config import Config
+from app import app as flask_app
+from routes.aio_routes import blueprints
+from utils.json_provider import FastJSONProvider
+from utils.metrics import REQUEST_LATENCY, REQUESTS, IN_FLIGHT
+
+aio_app = Quart(__name__)
+aio_app.json = FastJSONProvider(aio_app)
+aio_app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+for blueprint in blueprints:
+    aio_app.register_blueprint(blueprint)
+
+
+@aio_app.before_request
+async def _before_request():
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+    g.metrics_started = time.perf_counter()
+    g.metrics_labels = (request.blueprint or '', request.endpoint or 'unmatched')
+    IN_FLIGHT.labels(*g.metrics_labels).inc()
+
+
+@aio_app.after_request
+async def _after_request(response):
+    blueprint, endpoint = g.metrics_labels
+    REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - g.metrics_started)
+    REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+    response.headers['X-Request-ID'] = g.request_id
+    # Same policy as CORS(app) in app.py; preflights are answered by Flask
+    origin = request.headers.get('Origin')
+    if origin:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        response.headers['Access-Control-Allow-Credentials'] = 'true'
+        response.vary.add('Origin')
+    return response
+
+
+@aio_app.teardown_request
+async def _teardown_request(exc):
+    labels = g.get('metrics_labels')
+    if labels is not None:
+        IN_FLIGHT.labels(*labels).dec()
+
+
+@aio_app.errorhandler(413)
+async def request_too_large(e):
+    return jsonify({'success': False, 'message': 'Uploaded file is too large.'}), 413
+
+
+wsgi_app = WSGIMiddleware(flask_app, workers=Config.ASGI_WSGI_THREADS)
+_routes = aio_app.url_map.bind('')
+
+
+def handled_async(method, path):
+    # CORS preflights stay with flask_cors
+    if method == 'OPTIONS':
+        return False
+    try:
+        _routes.match(path, method=method)
+        return True
+    except HTTPException:
+        return False
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan' or (scope['type'] == 'http' and handled_async(scope['method'], scope['path'])):
+        await aio_app(scope, receive, send)
+    else:
+        await wsgi_app(scope, receive, send)
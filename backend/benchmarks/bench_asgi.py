@@ -0,0 +1,89 @@
+"""Compare requests per second of the WSGI app and the ASGI app (asgi.py).
+
+Start one worker process of each against the same Supabase project, e.g.:
+
+    gunicorn -w 1 --threads 32 -b 127.0.0.1:5001 app:app
+    hypercorn -w 1 -b 127.0.0.1:5002 asgi:app
+
+then drive both with the same number of concurrent clients:
+
+    python benchmarks/bench_asgi.py --email you@example.com --password secret \
+        --sync-url http://127.0.0.1:5001 --async-url http://127.0.0.1:5002 \
+        --concurrency 100 200 --seconds 15
+
+Each client loops over --paths (read-only by default) for --seconds. The
+throughput is per process, so keep -w 1 on both servers.
+"""
+import argparse
+import asyncio
+import time
+import httpx
+
+
+async def client_loop(client, paths, deadline, latencies, errors):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(base_url, token, paths, concurrency, seconds):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {'Authorization': f'Bearer {token}'}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        # One untimed pass so lazy initialization doesn't count
+        for path in paths:
+            await client.get(path)
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + seconds
+        await asyncio.gather(*(client_loop(client, paths, deadline, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float('nan')
+
+    return len(latencies) / elapsed, percentile(0.5), percentile(0.99), len(errors)
+
+
+def login(base_url, email, password):
+    response = httpx.post(f'{base_url}/login', json={'email': email, 'password': password}, timeout=30).json()
+    if not response.get('success'):
+        raise SystemExit(f"Login failed: {response.get('message')}")
+    return response['token']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sync-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--async-url', default='http://127.0.0.1:5002')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--paths', nargs='+', default=['/bootstrap', '/accounts', '/read'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[100, 200])
+    parser.add_argument('--seconds', type=float, default=15)
+    args = parser.parse_args()
+
+    # Both servers share JWT_SECRET and the users table, so one token serves both
+    token = login(args.sync_url, args.email, args.password)
+
+    print(f"{'server':<8} {'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        for name, base_url in (('wsgi', args.sync_url), ('asgi', args.async_url)):
+            rps, p50, p99, errors = asyncio.run(run(base_url, token, args.paths, concurrency, args.seconds))
+            print(f'{name:<8} {concurrency:>8} {rps:>9.1f} {p50:>9.1f} {p99:>9.1f} {errors:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare per-item CRUD against the /items/batch endpoints.
+
+Runs against a live server, because the gain comes from skipping
+per-request token checks and Supabase round trips:
+
+    python benchmarks/bench_item_batch.py --base-url http://127.0.0.1:5000 \
+        --email you@example.com --password secret --count 200
+
+Items created by the benchmark are deleted before it exits.
+"""
+import argparse
+import time
+import requests
+
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f'{label:<28} {count:>6} items  {elapsed:8.2f} s  {count / elapsed:10.1f} items/s')
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--email', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    login = session.post(f'{args.base_url}/login', json={'email': args.email, 'password': args.password}).json()
+    if not login.get('success'):
+        raise SystemExit(f"Login failed: {login.get('message')}")
+    session.headers['Authorization'] = f"Bearer {login['token']}"
+
+    rows = [{'name': f'bench-{i}', 'description': 'benchmark item'} for i in range(args.count)]
+
+    def create_one_by_one():
+        return [session.post(f'{args.base_url}/create', json=row).json()['itemId'] for row in rows]
+
+    def delete_one_by_one(ids):
+        for item_id in ids:
+            session.delete(f'{args.base_url}/delete', json={'id': item_id})
+
+    def create_batch():
+        results = session.post(f'{args.base_url}/items/batch', json={'items': rows}).json()['results']
+        return [result['id'] for result in results if result['success']]
+
+    def update_batch(ids):
+        payload = [{'id': item_id, 'name': f'bench-{item_id}-updated', 'description': 'updated'} for item_id in ids]
+        return session.put(f'{args.base_url}/items/batch', json={'items': payload}).json()
+
+    def delete_batch(ids):
+        return session.delete(f'{args.base_url}/items/batch', json={'ids': ids}).json()
+
+    single_ids, single_create = timed('single create', args.count, create_one_by_one)
+    _, single_delete = timed('single delete', args.count, lambda: delete_one_by_one(single_ids))
+
+    batch_ids, batch_create = timed('batch create', args.count, create_batch)
+    timed('batch update', args.count, lambda: update_batch(batch_ids))
+    _, batch_delete = timed('batch delete', args.count, lambda: delete_batch(batch_ids))
+
+    print(f'\ncreate speedup: {single_create / batch_create:.1f}x, delete speedup: {single_delete / batch_delete:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Compare Flask's default JSON provider with FastJSONProvider.
+
+Serializes account and item list payloads shaped like the /accounts and
+/read responses, 10 to 10,000 rows each, through the full jsonify() path:
+
+    python benchmarks/bench_json.py --sizes 10 100 1000 10000
+
+Runs in-process, with no server or Supabase project needed. Without orjson
+installed the fast provider falls back to the stdlib, and the speedup
+column shows how much the compact stdlib settings alone are worth.
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_provider
+from utils.json_provider import FastJSONProvider
+
+IMAGE = 'https://example.supabase.co/storage/v1/object/public/images/accounts/{}.png'
+
+
+def account_rows(count):
+    return [{
+        'id': i,
+        'site': f'https://site-{i}.example.com/login',
+        'username': f'user{i}@example.com',
+        'password': f'p@ss-{i:06d}-secret',
+        'image': IMAGE.format(uuid.UUID(int=i).hex),
+        'imageVariants': {'64': IMAGE.format(f'{i}.64.webp'), '256': IMAGE.format(f'{i}.256.webp')}
+    } for i in range(count)]
+
+
+def item_rows(count):
+    created = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    return [{
+        'id': i,
+        'name': f'Item {i}',
+        'description': 'A reasonably sized description of the item, with some ünïcödé. ' * 2,
+        'created_at': created + datetime.timedelta(minutes=i),
+        'owner': uuid.UUID(int=i)
+    } for i in range(count)]
+
+
+def payloads(count):
+    return {
+        'accounts': {'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': account_rows(count)},
+        'items': {'success': True, 'message': 'Items retrieved successfully!', 'items': item_rows(count)}
+    }
+
+
+class StdlibProvider(DefaultJSONProvider):
+    # Flask's default, but with ISO datetimes so both sides emit the same values
+    default = staticmethod(json_provider._default)
+
+
+def time_provider(provider_class, payload, min_seconds):
+    app = Flask(__name__)
+    app.json = provider_class(app)
+    with app.app_context():
+        runs = 0
+        size = 0
+        started = time.perf_counter()
+        while True:
+            size = len(app.json.response(payload).get_data())
+            runs += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                return elapsed / runs, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--min-seconds', type=float, default=0.5, help='time spent on each measurement')
+    args = parser.parse_args()
+
+    backend = 'orjson' if json_provider.orjson is not None else 'stdlib fallback'
+    print(f'FastJSONProvider backend: {backend}\n')
+    print(f"{'payload':<10} {'rows':>7} {'stdlib ms':>11} {'fast ms':>9} {'speedup':>8} {'stdlib KB':>10} {'fast KB':>9}")
+    for count in args.sizes:
+        for name, payload in payloads(count).items():
+            slow, slow_size = time_provider(StdlibProvider, payload, args.min_seconds)
+            fast, fast_size = time_provider(FastJSONProvider, payload, args.min_seconds)
+            print(f'{name:<10} {count:>7} {slow * 1000:>11.3f} {fast * 1000:>9.3f} {slow / fast:>7.1f}x '
+                  f'{slow_size / 1024:>10.1f} {fast_size / 1024:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
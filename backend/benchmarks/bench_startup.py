@@ -0,0 +1,112 @@
+"""Measure cold-start cost: import-time breakdown and time to first response.
+
+Every run starts a fresh interpreter, the way a Vercel cold start does, and
+compares LAZY_INIT=1 with eager initialisation:
+
+    python benchmarks/bench_startup.py --runs 5 --top 15 --path /
+
+Pass --max-import-ms to fail (exit 1) when the lazy-mode import of `app`
+gets slower than a budget, so regressions are caught in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_RESPONSE = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get({path!r})
+finished = time.perf_counter()
+print(json.dumps({{
+    'status': response.status_code,
+    'importMs': (imported - started) * 1000,
+    'firstResponseMs': (finished - imported) * 1000
+}}))
+"""
+
+
+def child_env(lazy):
+    env = dict(os.environ)
+    env['LAZY_INIT'] = '1' if lazy else '0'
+    # A syntactically valid project keeps the client code path realistic
+    # without sending anything over the network at startup
+    env.setdefault('SUPABASE_URL', 'https://example.supabase.co')
+    env.setdefault('SUPABASE_KEY', 'benchmark-key')
+    env.setdefault('LOG_LEVEL', 'WARNING')
+    return env
+
+
+def import_times(lazy):
+    # -X importtime writes "import time: self [us] | cumulative | imported package" to stderr
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=BACKEND_DIR, env=child_env(lazy), capture_output=True, text=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def first_response(lazy, path):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', FIRST_RESPONSE.format(path=path)],
+        cwd=BACKEND_DIR, env=child_env(lazy), capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['wallMs'] = wall_ms
+    return timings
+
+
+def report_imports(label, modules, top):
+    total = next((cumulative for name, _, cumulative, _ in modules if name == 'app'), 0)
+    print(f'\n{label}: import app {total / 1000:.1f} ms')
+    # Direct dependencies of app (depth 1) show which subsystems cost the most
+    direct = sorted((m for m in modules if m[3] == 1), key=lambda m: m[2], reverse=True)[:top]
+    print(f"  {'module':<40} {'cumulative ms':>14} {'self ms':>10}")
+    for name, self_us, cumulative_us, _ in direct:
+        print(f'  {name:<40} {cumulative_us / 1000:>14.1f} {self_us / 1000:>10.1f}')
+    return total / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--max-import-ms', type=float)
+    args = parser.parse_args()
+
+    lazy_import_ms = None
+    for label, lazy in (('lazy', True), ('eager', False)):
+        import_ms = report_imports(label, import_times(lazy), args.top)
+        runs = [first_response(lazy, args.path) for _ in range(args.runs)]
+        print(f'  first response to GET {args.path} (median of {args.runs}, status {runs[-1]["status"]}):')
+        for key, name in (('importMs', 'import app'), ('firstResponseMs', 'first request'), ('wallMs', 'process wall time')):
+            print(f'    {name:<20} {statistics.median(run[key] for run in runs):8.1f} ms')
+        if lazy:
+            lazy_import_ms = statistics.median(run['importMs'] for run in runs)
+
+    if args.max_import_ms is not None and lazy_import_ms > args.max_import_ms:
+        print(f'\nFAIL: lazy import took {lazy_import_ms:.1f} ms, budget is {args.max_import_ms:.1f} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Smoke test for the ASGI entry point (asgi.py).
+
+Sends requests through `asgi.app` in process, with no server and no Supabase
+calls, and checks that the async routes reach the Quart app while everything
+else falls through to the Flask app:
+
+    pip install -r requirements-async.txt
+    python benchmarks/smoke_asgi.py
+
+Exits non-zero on the first failed check.
+"""
+import asyncio
+import json
+import os
+import sys
+
+os.environ.setdefault('LAZY_INIT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asgi
+
+handled = []
+
+
+def tap(name, inner):
+    async def wrapped(scope, receive, send):
+        handled.append(name)
+        await inner(scope, receive, send)
+    return wrapped
+
+
+# asgi.app looks both up at call time
+asgi.aio_app = tap('quart', asgi.aio_app)
+asgi.wsgi_app = tap('flask', asgi.wsgi_app)
+
+
+async def request(method, path, headers=()):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('ascii'),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        'client': ('127.0.0.1', 50000),
+        'server': ('127.0.0.1', 5000)
+    }
+    done = asyncio.Event()
+    received = False
+    messages = []
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Only report the disconnect once the response is complete
+        await done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body' and not message.get('more_body'):
+            done.set()
+
+    handled.clear()
+    await asgi.app(scope, receive, send)
+    start = next(message for message in messages if message['type'] == 'http.response.start')
+    response_headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in start['headers']}
+    body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.response.body')
+    return list(handled), start['status'], response_headers, body
+
+
+def check(condition, message):
+    if not condition:
+        raise SystemExit(f'FAIL: {message}')
+    print(f'ok   {message}')
+
+
+async def main():
+    # Lifespan startup and shutdown go to the Quart app, as under hypercorn
+    to_app, from_app = asyncio.Queue(), asyncio.Queue()
+    lifespan = asyncio.create_task(asgi.app({'type': 'lifespan', 'asgi': {'version': '3.0'}}, to_app.get, from_app.put))
+    await to_app.put({'type': 'lifespan.startup'})
+    check((await from_app.get())['type'] == 'lifespan.startup.complete', 'lifespan startup completes')
+
+    routes, status, headers, body = await request('GET', '/accounts')
+    check(routes == ['quart'], 'GET /accounts is served by the async blueprint')
+    check(status == 401 and json.loads(body)['success'] is False, 'GET /accounts without a token is rejected with 401')
+    check('x-request-id' in headers, 'async responses carry X-Request-ID')
+
+    routes, status, headers, body = await request('GET', '/bootstrap', [('Authorization', 'Bearer')])
+    check(routes == ['quart'] and status == 401, 'GET /bootstrap is served by the async blueprint')
+
+    routes, status, headers, body = await request('GET', '/')
+    check(routes == ['flask'], 'GET / falls through to Flask')
+    check(status == 200 and headers.get('content-type', '').startswith('text/html'), 'GET / returns the index page')
+
+    routes, status, headers, body = await request('OPTIONS', '/accounts', [
+        ('Origin', 'http://localhost:3000'),
+        ('Access-Control-Request-Method', 'GET')
+    ])
+    check(routes == ['flask'], 'CORS preflights go to Flask')
+    check(headers.get('access-control-allow-origin') == 'http://localhost:3000', 'the preflight is answered by flask_cors')
+
+    routes, status, headers, body = await request('GET', '/no-such-route')
+    check(routes == ['flask'] and status == 404, 'unknown paths fall through to Flask')
+
+    await to_app.put({'type': 'lifespan.shutdown'})
+    check((await from_app.get())['type'] == 'lifespan.shutdown.complete', 'lifespan shutdown completes')
+    await lifespan
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,3 +9,137 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL')
     SUPABASE_KEY = os.environ.get('SUPABASE_KEY')
     BASE_URL = os.environ.get('BASE_URL') or 'http://localhost:5000'
+
+    # Verified-token cache used by token_required (0 disables it)
+    TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE') or 1024)
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL') or 60)
+
+    # Versions behind ETags and /search freshness: "supabase" (shared by every
+    # instance, needs sql/resource_versions.sql) or "memory" (one process only)
+    RESOURCE_VERSIONS = os.environ.get('RESOURCE_VERSIONS') or 'supabase'
+
+    # Outgoing mail
+    EMAIL_HOST = os.environ.get('EMAIL_HOST') or 'smtp.gmail.com'
+    EMAIL_PORT = int(os.environ.get('EMAIL_PORT') or 587)
+    EMAIL_USER = os.environ.get('EMAIL_USER') or 'darielganzon2003@gmail.com'
+    EMAIL_PASS = os.environ.get('EMAIL_PASS') or 'azfs mmtr jhxh tsyu'
+    EMAIL_FROM_NAME = os.environ.get('EMAIL_FROM_NAME') or 'Leirad Noznag'
+    # Send from a background queue; off by default on Vercel, which freezes
+    # background threads after the response and would strand queued mail
+    MAIL_ASYNC = os.environ.get('MAIL_ASYNC', '0' if os.environ.get('VERCEL') else '1') != '0'
+    MAIL_WORKERS = int(os.environ.get('MAIL_WORKERS') or 2)
+    MAIL_QUEUE_SIZE = int(os.environ.get('MAIL_QUEUE_SIZE') or 100)
+    MAIL_MAX_RETRIES = int(os.environ.get('MAIL_MAX_RETRIES') or 3)
+
+    # Re-read mail templates from disk when they change (development only)
+    TEMPLATE_AUTO_RELOAD = os.environ.get('TEMPLATE_AUTO_RELOAD', '0') == '1'
+
+    # Password hashing: bcrypt cost is sized to BCRYPT_TARGET_MS at startup
+    # unless BCRYPT_ROUNDS pins it. BCRYPT_MIN_ROUNDS is the fleet-wide floor
+    # (12 is bcrypt's default); set BCRYPT_ROUNDS to give every instance the
+    # same cost. BCRYPT_POOL is 'process' or 'thread'.
+    BCRYPT_POOL = os.environ.get('BCRYPT_POOL') or 'process'
+    BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS') or 0) or None
+    BCRYPT_TARGET_MS = int(os.environ.get('BCRYPT_TARGET_MS') or 250)
+    BCRYPT_MIN_ROUNDS = int(os.environ.get('BCRYPT_MIN_ROUNDS') or 12)
+    BCRYPT_MAX_ROUNDS = int(os.environ.get('BCRYPT_MAX_ROUNDS') or 14)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS') or 0) or None
+
+    # List endpoints (/read, /accounts) paging
+    PAGE_DEFAULT_LIMIT = int(os.environ.get('PAGE_DEFAULT_LIMIT') or 100)
+    PAGE_MAX_LIMIT = int(os.environ.get('PAGE_MAX_LIMIT') or 1000)
+    STREAM_PAGE_SIZE = int(os.environ.get('STREAM_PAGE_SIZE') or 500)
+
+    # Maximum number of entries accepted by the /items/batch endpoints
+    ITEM_BATCH_LIMIT = int(os.environ.get('ITEM_BATCH_LIMIT') or 500)
+
+    # Uploads: whole-request cap enforced by Werkzeug, per-file cap, and the
+    # size above which an upload is spooled to disk and streamed to storage
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH') or 4718592)
+    MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE') or 4194304)
+    UPLOAD_SPOOL_SIZE = int(os.environ.get('UPLOAD_SPOOL_SIZE') or 524288)
+
+    # Resized WebP variants generated in the background for uploaded images
+    IMAGE_VARIANT_SIZES = [int(size) for size in (os.environ.get('IMAGE_VARIANT_SIZES') or '64,256').split(',') if size.strip()]
+    IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY') or 80)
+    # Larger images are stored but get no variants; decoding them would take
+    # width x height x 4 bytes however small the compressed upload is
+    IMAGE_MAX_PIXELS = int(os.environ.get('IMAGE_MAX_PIXELS') or 16777216)
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS') or 2)
+    # Vercel freezes the process after the response, so a background pool would
+    # leave variant URLs pointing at files that were never written
+    IMAGE_VARIANTS_INLINE = os.environ.get('IMAGE_VARIANTS_INLINE', '1' if os.environ.get('VERCEL') else '0') != '0'
+
+    # Shared HTTP pool for PostgREST and Storage calls (timeouts in seconds)
+    SUPABASE_MAX_CONNECTIONS = int(os.environ.get('SUPABASE_MAX_CONNECTIONS') or 20)
+    SUPABASE_MAX_KEEPALIVE = int(os.environ.get('SUPABASE_MAX_KEEPALIVE') or 10)
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY') or 30)
+    SUPABASE_HTTP2 = os.environ.get('SUPABASE_HTTP2', '1') != '0'
+    SUPABASE_CONNECT_TIMEOUT = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT') or 3)
+    SUPABASE_POOL_TIMEOUT = float(os.environ.get('SUPABASE_POOL_TIMEOUT') or 5)
+    SUPABASE_READ_TIMEOUT = float(os.environ.get('SUPABASE_READ_TIMEOUT') or 10)
+    SUPABASE_WRITE_TIMEOUT = float(os.environ.get('SUPABASE_WRITE_TIMEOUT') or 15)
+    SUPABASE_STORAGE_TIMEOUT = float(os.environ.get('SUPABASE_STORAGE_TIMEOUT') or 60)
+    SUPABASE_RETRIES = int(os.environ.get('SUPABASE_RETRIES') or 2)
+    SUPABASE_RETRY_BACKOFF = float(os.environ.get('SUPABASE_RETRY_BACKOFF') or 0.2)
+    # Identical concurrent PostgREST reads share one request
+    SUPABASE_SINGLE_FLIGHT = os.environ.get('SUPABASE_SINGLE_FLIGHT', '1') != '0'
+
+    # Bearer token /metrics requires; the route is disabled while it is unset
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Structured logging: records are queued and written by a background listener
+    LOG_LEVEL = (os.environ.get('LOG_LEVEL') or 'INFO').upper()
+    LOG_LEVELS = os.environ.get('LOG_LEVELS') or ''  # e.g. "utils.mailer=WARNING,controllers.auth_controller=DEBUG"
+    LOG_FORMAT = (os.environ.get('LOG_FORMAT') or 'json').lower()  # json or text
+    LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE') or 1.0)  # share of high-volume info events kept
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE') or 10000)
+
+    # Defer the Supabase client, bcrypt calibration, templates and static assets
+    # to first use; on by default on Vercel, where every cold start pays for them
+    LAZY_INIT = os.environ.get('LAZY_INIT', '1' if os.environ.get('VERCEL') else '0') != '0'
+    # Bearer token /warmup requires; Vercel cron jobs send CRON_SECRET. The
+    # route is disabled while neither is set.
+    WARMUP_TOKEN = os.environ.get('WARMUP_TOKEN') or os.environ.get('CRON_SECRET')
+
+    # Auth endpoint throttling; a redis:// URL shares counters across instances
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+    RATE_LIMIT_STORAGE_URL = os.environ.get('RATE_LIMIT_STORAGE_URL')
+    RATE_LIMIT_SHARDS = int(os.environ.get('RATE_LIMIT_SHARDS') or 16)
+    RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', '1' if os.environ.get('VERCEL') else '0') != '0'
+    # Throttled endpoints answer 503 once this many of them are running at once
+    LOAD_SHED_MAX_IN_FLIGHT = int(os.environ.get('LOAD_SHED_MAX_IN_FLIGHT') or 32)
+
+    # One-time codes: "table" (the plain otps table, no attempt limit), "supabase"
+    # (adds attempt limits; run sql/otp_store.sql first) or "memory" (single instance)
+    OTP_STORE = os.environ.get('OTP_STORE') or 'table'
+    OTP_TTL = int(os.environ.get('OTP_TTL') or 300)
+    OTP_MAX_ATTEMPTS = int(os.environ.get('OTP_MAX_ATTEMPTS') or 5)
+    OTP_SWEEP_INTERVAL = float(os.environ.get('OTP_SWEEP_INTERVAL') or 60)
+
+    # Per-user /search indexes share this many (estimated) bytes per process
+    SEARCH_INDEX_MEMORY = int(os.environ.get('SEARCH_INDEX_MEMORY') or 64 * 1024 * 1024)
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS') or 50)
+
+    # /bootstrap loads its sections concurrently on a shared, bounded pool
+    BOOTSTRAP_WORKERS = int(os.environ.get('BOOTSTRAP_WORKERS') or 8)
+    BOOTSTRAP_TIMEOUT = float(os.environ.get('BOOTSTRAP_TIMEOUT') or 10)
+
+    # Unreferenced images are deleted after the response, batched per bucket.
+    # Off by default on Vercel, which freezes background threads after the
+    # response; deletions then run inline. Deletions still pending at shutdown
+    # go to the spill file, a best effort that needs a disk that outlives the
+    # process (not Vercel's /tmp). A lost deletion only leaks a blob.
+    STORAGE_CLEANUP_ASYNC = os.environ.get('STORAGE_CLEANUP_ASYNC', '0' if os.environ.get('VERCEL') else '1') != '0'
+    STORAGE_CLEANUP_BATCH_SIZE = int(os.environ.get('STORAGE_CLEANUP_BATCH_SIZE') or 100)
+    STORAGE_CLEANUP_INTERVAL = float(os.environ.get('STORAGE_CLEANUP_INTERVAL') or 2)
+    STORAGE_CLEANUP_MAX_RETRIES = int(os.environ.get('STORAGE_CLEANUP_MAX_RETRIES') or 5)
+    STORAGE_CLEANUP_SPILL_PATH = os.environ.get('STORAGE_CLEANUP_SPILL_PATH') or os.path.join(tempfile.gettempdir(), 'storage-cleanup.jsonl')
+
+    # /sync returns at most this many rows per resource per call
+    SYNC_PAGE_LIMIT = int(os.environ.get('SYNC_PAGE_LIMIT') or 500)
+    # Keep in step with the sync_tombstones pruning job (sql/sync.sql)
+    SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS') or 30)
+
+    # asgi.py: threads running the Flask routes that have no async version
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS') or 16)
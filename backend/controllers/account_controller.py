@@ -1,6 +1,19 @@
+import logging
 from flask import request, jsonify, g
 from utils.supabase_client import supabase
-from utils.supabase_storage import upload_file_to_supabase, delete_file_from_supabase
+from utils.etag import resource_versions
+from utils.search_index import search_indexes
+from utils.uploads import prepare_upload, UploadError
+from utils.image_variants import variant_urls
+from utils.content_store import store_image, release_image
+from utils.pagination import parse_list_args, fetch_page, stream_rows
+from utils.sync_log import changed_since, record_deletes
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_FIELDS = ('id', 'site', 'username', 'password', 'image')
+DEFAULT_IMAGE = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png'
 
 def create_account():
     user_id = g.user['id']
@@ -13,23 +26,27 @@ def create_account():
     if not all([site, username, password]):
         return jsonify({'success': False, 'message': 'Site, username, and password are required.'}), 400
 
-    image_path = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png'
+    image_path = DEFAULT_IMAGE
     
     if 'image' in request.files:
         file = request.files['image']
         if file.filename != '':
             try:
-                file_content = file.read()
-                file_name = f"accounts/{file.filename}"
-                upload_result = upload_file_to_supabase(file_content, file_name, 'images')
+                upload = prepare_upload(file)
+            except UploadError as e:
+                return jsonify({'success': False, 'message': str(e)}), e.status_code
+
+            try:
+                with upload:
+                    upload_result = store_image(upload, 'accounts')
                 
                 if upload_result['error']:
-                    print(f"Error uploading image: {upload_result['error']}")
+                    logger.error('Error uploading image: %s', upload_result['error'])
                     return jsonify({'success': False, 'message': 'Failed to upload image.'}), 500
                 
                 image_path = upload_result['publicUrl']
             except Exception as e:
-                print(f"Error reading file: {e}")
+                logger.exception('Error reading file')
                 
     try:
         response = supabase.table('accounts').insert({
@@ -41,30 +58,120 @@ def create_account():
         }).execute()
         
         if response.data:
+            resource_versions.bump(user_id, 'accounts')
+            search_indexes.apply(user_id, 'accounts', upserts=response.data)
             return jsonify({'success': True, 'message': 'Account created successfully!', 'accountId': response.data[0]['id']})
         else:
+            release_image(image_path)
             return jsonify({'success': False, 'message': 'Error creating account.'}), 500
             
     except Exception as e:
-        print(f'Error creating account: {e}')
+        logger.exception('Error creating account')
+        # No row references the stored image
+        release_image(image_path)
         return jsonify({'success': False, 'message': 'Error creating account.'}), 500
 
+def _with_default_image(account):
+    # Process accounts to ensure image paths are correct (similar to JS logic)
+    if 'image' in account:
+        if not account.get('image'):
+            account['image'] = DEFAULT_IMAGE
+        account['imageVariants'] = variant_urls(account['image'])
+    return account
+
+def list_accounts(user_id):
+    response = supabase.table('accounts').select('id, site, username, password, image').eq('user_id', user_id).execute()
+    return [_with_default_image(account) for account in response.data]
+
+def account_changes(user_id, position, limit):
+    rows = changed_since('accounts', 'id, site, username, password, image, updated_at', user_id, position, limit)
+    return [_with_default_image(account) for account in rows]
+
 def get_accounts():
     user_id = g.user['id']
     try:
-        response = supabase.table('accounts').select('id, site, username, password, image').eq('user_id', user_id).execute()
-        
-        accounts = response.data
-        # Process accounts to ensure image paths are correct (similar to JS logic)
-        for account in accounts:
-            if not account.get('image'):
-                account['image'] = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png'
-        
-        return jsonify({'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': accounts})
+        page = parse_list_args(ACCOUNT_FIELDS, 'id, site, username, password, image')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    def build_query(fields):
+        return supabase.table('accounts').select(fields).eq('user_id', user_id)
+
+    try:
+        if page is None:
+            accounts = list_accounts(user_id)
+            return jsonify({'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': accounts})
+
+        if page['stream']:
+            return stream_rows(build_query, page, _with_default_image)
+
+        accounts, next_cursor = fetch_page(build_query, page)
+        accounts = [_with_default_image(account) for account in accounts]
+        return jsonify({'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': accounts, 'nextCursor': next_cursor})
     except Exception as e:
-        print(f'Error reading accounts: {e}')
+        logger.exception('Error reading accounts')
         return jsonify({'success': False, 'message': 'Error reading accounts.'}), 500
 
+# Columns the DataTables view may sort on, by column data name
+DATATABLE_ORDERABLE = ('id', 'site', 'username')
+
+# Characters with a meaning in Postgres regular expressions
+REGEX_SPECIAL = frozenset('\\^$.|?*+()[]{}')
+
+def _search_pattern(value):
+    # PostgREST turns every '*' of an ilike pattern into '%', so no escaping
+    # could make '*', '%' or '_' match literally there; a case-insensitive
+    # regex with its metacharacters escaped matches the term as typed
+    value = ''.join(f'\\{char}' if char in REGEX_SPECIAL else char for char in value)
+    # Double-quote the term so commas and parentheses can't break PostgREST's or=() syntax
+    value = value.replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{value}"'
+
+def get_accounts_datatable():
+    # DataTables server-side processing: filtering, ordering and paging run in Supabase
+    user_id = g.user['id']
+    args = request.args
+
+    try:
+        draw = int(args.get('draw', 0))
+        start = max(int(args.get('start', 0)), 0)
+        length = int(args.get('length', 10))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid paging parameters.'}), 400
+
+    if length < 0 or length > Config.PAGE_MAX_LIMIT:
+        length = Config.PAGE_MAX_LIMIT
+
+    search = (args.get('search[value]') or '').strip()
+    order_column = args.get(f"columns[{args.get('order[0][column]', '0')}][data]") or 'id'
+    if order_column not in DATATABLE_ORDERABLE:
+        order_column = 'id'
+    descending = args.get('order[0][dir]') == 'desc'
+
+    try:
+        total_response = supabase.table('accounts').select('id', count='exact', head=True).eq('user_id', user_id).execute()
+        records_total = total_response.count or 0
+
+        query = supabase.table('accounts').select('id, site, username, password, image', count='exact').eq('user_id', user_id)
+        if search:
+            pattern = _search_pattern(search)
+            query = query.or_(f'site.imatch.{pattern},username.imatch.{pattern}')
+        response = query.order(order_column, desc=descending).range(start, start + length - 1).execute()
+
+        accounts = [_with_default_image(account) for account in response.data]
+        records_filtered = response.count if response.count is not None else records_total
+
+        return jsonify({
+            'success': True,
+            'draw': draw,
+            'recordsTotal': records_total,
+            'recordsFiltered': records_filtered,
+            'data': accounts
+        })
+    except Exception as e:
+        logger.exception('Error reading accounts for DataTables')
+        return jsonify({'success': False, 'draw': draw, 'error': 'Error reading accounts.'}), 500
+
 def update_account(id):
     user_id = g.user['id']
     account_id = id
@@ -83,55 +190,61 @@ def update_account(id):
             return jsonify({'success': False, 'message': 'Account not found or you do not have permission to update it.'}), 404
             
         current_image = response.data[0].get('image')
-        image_path = current_image or 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png'
+        image_path = current_image or DEFAULT_IMAGE
+        replaced_image = None
+        stored_image = None
         
         if 'image' in request.files:
             file = request.files['image']
             if file.filename != '':
-                file_content = file.read()
-                file_name = f"accounts/{file.filename}"
-                upload_result = upload_file_to_supabase(file_content, file_name, 'images')
+                try:
+                    upload = prepare_upload(file)
+                except UploadError as e:
+                    return jsonify({'success': False, 'message': str(e)}), e.status_code
+
+                with upload:
+                    upload_result = store_image(upload, 'accounts')
                 
                 if upload_result['error']:
-                    print(f"Error uploading image: {upload_result['error']}")
+                    logger.error('Error uploading image: %s', upload_result['error'])
                     return jsonify({'success': False, 'message': 'Failed to upload image.'}), 500
                 
-                image_path = upload_result['publicUrl']
-                
-                # Delete old image if it exists and is not default
-                if current_image and 'supabase.co/storage' in current_image and 'default.png' not in current_image:
-                     try:
-                        parts = current_image.split('/public/images/')
-                        if len(parts) > 1:
-                            old_file_path = parts[1]
-                            delete_file_from_supabase(old_file_path, 'images')
-                     except Exception as e:
-                        print(f"Error deleting old file: {e}")
+                image_path = stored_image = upload_result['publicUrl']
+                replaced_image = current_image
         
-        elif request.form.get('image') == 'images/default.png' or request.form.get('image') == 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png':
-             image_path = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png'
-             # Delete old image logic here as well if needed
-             if current_image and 'supabase.co/storage' in current_image and 'default.png' not in current_image:
-                 try:
-                    parts = current_image.split('/public/images/')
-                    if len(parts) > 1:
-                        old_file_path = parts[1]
-                        delete_file_from_supabase(old_file_path, 'images')
-                 except Exception as e:
-                    print(f"Error deleting old file: {e}")
+        elif request.form.get('image') == 'images/default.png' or request.form.get('image') == DEFAULT_IMAGE:
+             image_path = DEFAULT_IMAGE
+             replaced_image = current_image
 
         # Update account
-        supabase.table('accounts').update({
-            'site': site,
-            'username': username,
-            'password': password,
-            'image': image_path
-        }).eq('id', account_id).eq('user_id', user_id).execute()
+        try:
+            updated = supabase.table('accounts').update({
+                'site': site,
+                'username': username,
+                'password': password,
+                'image': image_path
+            }).eq('id', account_id).eq('user_id', user_id).execute()
+        except Exception:
+            # The new image's reference would otherwise never be dropped
+            if stored_image:
+                release_image(stored_image)
+            raise
+        if not updated.data:
+            # Deleted since the select above
+            if stored_image:
+                release_image(stored_image)
+            return jsonify({'success': False, 'message': 'Account not found or you do not have permission to update it.'}), 404
+        resource_versions.bump(user_id, 'accounts')
+        search_indexes.apply(user_id, 'accounts', upserts=[{'id': account_id, 'site': site, 'username': username, 'image': image_path}])
+
+        # Drop the old image only once nothing points at it any more
+        if replaced_image:
+            release_image(replaced_image)
         
         return jsonify({'success': True, 'message': 'Account updated successfully!'})
 
     except Exception as e:
-        print(f'Error updating account: {e}')
+        logger.exception('Error updating account')
         return jsonify({'success': False, 'message': 'Error updating account.'}), 500
 
 def delete_account(id):
@@ -148,19 +261,15 @@ def delete_account(id):
         
         # Delete account
         supabase.table('accounts').delete().eq('id', account_id).eq('user_id', user_id).execute()
+        resource_versions.bump(user_id, 'accounts')
+        search_indexes.apply(user_id, 'accounts', deletes=[account_id])
+        record_deletes(user_id, 'accounts', [account_id])
         
-        # Delete image
-        if account_image and 'supabase.co/storage' in account_image and 'default.png' not in account_image:
-             try:
-                parts = account_image.split('/public/images/')
-                if len(parts) > 1:
-                    old_file_path = parts[1]
-                    delete_file_from_supabase(old_file_path, 'images')
-             except Exception as e:
-                print(f"Error deleting old file: {e}")
+        # Delete image once its last reference is gone
+        release_image(account_image)
 
         return jsonify({'success': True, 'message': 'Account deleted successfully!'})
 
     except Exception as e:
-        print(f'Error deleting account: {e}')
+        logger.exception('Error deleting account')
         return jsonify({'success': False, 'message': 'Error deleting account.'}), 500
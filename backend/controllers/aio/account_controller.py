@@ -0,0 +1,201 @@
+import asyncio
+import logging
+from quart import request, jsonify, g, current_app, Response
+from utils.supabase_client import get_async_supabase
+from utils.etag import resource_versions
+from utils.search_index import search_indexes
+from utils.uploads import prepare_upload, UploadError
+from utils.content_store import store_image_async, release_image_async
+from utils.pagination import parse_list_args, fetch_page_async, stream_rows_async, NDJSON
+from utils.sync_log import record_deletes_async
+from controllers.account_controller import ACCOUNT_FIELDS, DEFAULT_IMAGE, _with_default_image
+
+logger = logging.getLogger(__name__)
+
+# Async twins of controllers/account_controller.py for the ASGI app: same
+# requests and responses, with independent Supabase calls run concurrently
+
+async def _store_upload(supabase, file):
+    # (result, None) or (None, error response)
+    try:
+        upload = prepare_upload(file)
+    except UploadError as e:
+        return None, (jsonify({'success': False, 'message': str(e)}), e.status_code)
+    with upload:
+        result = await store_image_async(supabase, upload, 'accounts')
+    if result['error']:
+        logger.error('Error uploading image: %s', result['error'])
+        return None, (jsonify({'success': False, 'message': 'Failed to upload image.'}), 500)
+    return result, None
+
+async def create_account():
+    user_id = g.user['id']
+    form = await request.form
+    files = await request.files
+
+    site = form.get('site')
+    username = form.get('username')
+    password = form.get('password')
+
+    if not all([site, username, password]):
+        return jsonify({'success': False, 'message': 'Site, username, and password are required.'}), 400
+
+    image_path = DEFAULT_IMAGE
+    try:
+        supabase = await get_async_supabase()
+        file = files.get('image')
+        if file is not None and file.filename != '':
+            result, error = await _store_upload(supabase, file)
+            if error:
+                return error
+            image_path = result['publicUrl']
+
+        response = await supabase.table('accounts').insert({
+            'site': site,
+            'username': username,
+            'password': password,
+            'image': image_path,
+            'user_id': user_id
+        }).execute()
+
+        if response.data:
+            resource_versions.bump(user_id, 'accounts')
+            await search_indexes.apply_async(supabase, user_id, 'accounts', upserts=response.data)
+            return jsonify({'success': True, 'message': 'Account created successfully!', 'accountId': response.data[0]['id']})
+        await release_image_async(supabase, image_path)
+        return jsonify({'success': False, 'message': 'Error creating account.'}), 500
+
+    except Exception as e:
+        logger.exception('Error creating account')
+        # No row references the stored image
+        if image_path != DEFAULT_IMAGE:
+            await release_image_async(supabase, image_path)
+        return jsonify({'success': False, 'message': 'Error creating account.'}), 500
+
+async def get_accounts():
+    user_id = g.user['id']
+    try:
+        page = parse_list_args(ACCOUNT_FIELDS, 'id, site, username, password, image', request)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        supabase = await get_async_supabase()
+
+        def build_query(fields):
+            return supabase.table('accounts').select(fields).eq('user_id', user_id)
+
+        if page is None:
+            response = await build_query('id, site, username, password, image').execute()
+            accounts = [_with_default_image(account) for account in response.data]
+            return jsonify({'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': accounts})
+
+        if page['stream']:
+            return Response(stream_rows_async(build_query, page, current_app.json.dumps, _with_default_image), mimetype=NDJSON)
+
+        accounts, next_cursor = await fetch_page_async(build_query, page)
+        accounts = [_with_default_image(account) for account in accounts]
+        return jsonify({'success': True, 'message': 'Accounts retrieved successfully!', 'accounts': accounts, 'nextCursor': next_cursor})
+    except Exception as e:
+        logger.exception('Error reading accounts')
+        return jsonify({'success': False, 'message': 'Error reading accounts.'}), 500
+
+async def update_account(id):
+    user_id = g.user['id']
+    account_id = id
+    form = await request.form
+    files = await request.files
+
+    site = form.get('site')
+    username = form.get('username')
+    password = form.get('password')
+
+    if not all([site, username, password]):
+        return jsonify({'success': False, 'message': 'Site, username, and password are required.'}), 400
+
+    try:
+        supabase = await get_async_supabase()
+        current = supabase.table('accounts').select('image').eq('id', account_id).eq('user_id', user_id).execute()
+
+        file = files.get('image')
+        if file is not None and file.filename != '':
+            # The ownership check and the image upload don't depend on each other
+            response, stored = await asyncio.gather(current, _store_upload(supabase, file), return_exceptions=True)
+            if isinstance(stored, BaseException):
+                raise stored
+            upload_result, error = stored
+            if isinstance(response, BaseException) or not response.data:
+                # Whatever the ownership check ended with, the upload holds a reference
+                if upload_result:
+                    await release_image_async(supabase, upload_result['publicUrl'])
+                if isinstance(response, BaseException):
+                    raise response
+                return jsonify({'success': False, 'message': 'Account not found or you do not have permission to update it.'}), 404
+            if error:
+                return error
+            current_image = response.data[0].get('image')
+            image_path = stored_image = upload_result['publicUrl']
+            replaced_image = current_image
+        else:
+            response = await current
+            if not response.data:
+                return jsonify({'success': False, 'message': 'Account not found or you do not have permission to update it.'}), 404
+            current_image = response.data[0].get('image')
+            image_path = current_image or DEFAULT_IMAGE
+            replaced_image = stored_image = None
+            if form.get('image') in ('images/default.png', DEFAULT_IMAGE):
+                image_path = DEFAULT_IMAGE
+                replaced_image = current_image
+
+        try:
+            updated = await supabase.table('accounts').update({
+                'site': site,
+                'username': username,
+                'password': password,
+                'image': image_path
+            }).eq('id', account_id).eq('user_id', user_id).execute()
+        except Exception:
+            if stored_image:
+                await release_image_async(supabase, stored_image)
+            raise
+        if not updated.data:
+            # Deleted since the select above
+            if stored_image:
+                await release_image_async(supabase, stored_image)
+            return jsonify({'success': False, 'message': 'Account not found or you do not have permission to update it.'}), 404
+        resource_versions.bump(user_id, 'accounts')
+        await search_indexes.apply_async(supabase, user_id, 'accounts', upserts=[{'id': account_id, 'site': site, 'username': username, 'image': image_path}])
+
+        # Drop the old image only once nothing points at it any more
+        if replaced_image:
+            await release_image_async(supabase, replaced_image)
+
+        return jsonify({'success': True, 'message': 'Account updated successfully!'})
+
+    except Exception as e:
+        logger.exception('Error updating account')
+        return jsonify({'success': False, 'message': 'Error updating account.'}), 500
+
+async def delete_account(id):
+    user_id = g.user['id']
+    account_id = id
+
+    try:
+        supabase = await get_async_supabase()
+        # The deleted row comes back with its image, saving the separate select
+        response = await supabase.table('accounts').delete().eq('id', account_id).eq('user_id', user_id).execute()
+        if not response.data:
+            return jsonify({'success': False, 'message': 'Account not found or you do not have permission to delete it.'}), 404
+
+        resource_versions.bump(user_id, 'accounts')
+        await search_indexes.apply_async(supabase, user_id, 'accounts', deletes=[account_id])
+        await asyncio.gather(
+            release_image_async(supabase, response.data[0].get('image')),
+            record_deletes_async(supabase, user_id, 'accounts', [account_id])
+        )
+
+        return jsonify({'success': True, 'message': 'Account deleted successfully!'})
+
+    except Exception as e:
+        logger.exception('Error deleting account')
+        return jsonify({'success': False, 'message': 'Error deleting account.'}), 500
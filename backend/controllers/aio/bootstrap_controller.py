@@ -0,0 +1,77 @@
+import asyncio
+import logging
+import time
+from quart import request, jsonify, g
+from utils.supabase_client import get_async_supabase
+from controllers.account_controller import _with_default_image
+from controllers.user_controller import _with_default_picture
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# /bootstrap on the event loop: the sections are concurrent coroutines instead
+# of jobs on the BOOTSTRAP_WORKERS thread pool
+
+async def load_user(supabase, user_id):
+    response = await supabase.table('users').select('id, firstname, middlename, lastname, email, profilepicture').eq('id', user_id).execute()
+    return _with_default_picture(response.data[0]) if response.data else None
+
+async def list_accounts(supabase, user_id):
+    response = await supabase.table('accounts').select('id, site, username, password, image').eq('user_id', user_id).execute()
+    return [_with_default_image(account) for account in response.data]
+
+async def list_items(supabase, user_id):
+    return (await supabase.table('items').select('*').eq('user_id', user_id).execute()).data
+
+SECTIONS = {
+    'user': load_user,
+    'accounts': list_accounts,
+    'items': list_items
+}
+
+async def _timed(loader, supabase, user_id):
+    started = time.perf_counter()
+    try:
+        return await loader(supabase, user_id), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+async def get_bootstrap():
+    user_id = g.user['id']
+    requested = [name.strip() for name in (request.args.get('sections') or ','.join(SECTIONS)).split(',') if name.strip()]
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown or not requested:
+        return jsonify({'success': False, 'message': f"sections must be drawn from: {', '.join(SECTIONS)}."}), 400
+
+    started = time.perf_counter()
+    supabase = await get_async_supabase()
+    tasks = {name: asyncio.ensure_future(_timed(SECTIONS[name], supabase, user_id)) for name in dict.fromkeys(requested)}
+    done, _ = await asyncio.wait(tasks.values(), timeout=Config.BOOTSTRAP_TIMEOUT)
+
+    payload = {'success': True}
+    timings = {}
+    errors = {}
+    for name, task in tasks.items():
+        if task not in done:
+            task.cancel()
+            errors[name] = 'Timed out.'
+            continue
+        data, error, elapsed = task.result()
+        timings[name] = round(elapsed * 1000, 2)
+        if error is not None:
+            logger.error('Error loading bootstrap section %s', name, exc_info=error)
+            errors[name] = f'Error loading {name}.'
+        else:
+            payload[name] = data
+
+    if 'user' in tasks and 'user' not in errors and payload.get('user') is None:
+        return jsonify({'success': False, 'message': 'User not found.'}), 404
+
+    timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+    payload['timingsMs'] = timings
+    if errors:
+        payload['errors'] = errors
+
+    response = jsonify(payload)
+    response.headers['Server-Timing'] = ', '.join(f'{name};dur={ms}' for name, ms in timings.items())
+    return response
@@ -0,0 +1,113 @@
+import logging
+from quart import request, jsonify, g, current_app, Response
+from utils.supabase_client import get_async_supabase
+from utils.etag import resource_versions
+from utils.search_index import search_indexes
+from utils.pagination import parse_list_args, fetch_page_async, stream_rows_async, NDJSON
+from utils.sync_log import record_deletes_async
+from controllers.item_controller import ITEM_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Async twins of the single-item handlers in controllers/item_controller.py
+
+async def create_item():
+    user_id = g.user['id']
+    data = await request.get_json()
+    name = data.get('name')
+    description = data.get('description')
+
+    if not name:
+        return jsonify({'success': False, 'message': 'Name is required.'}), 400
+
+    try:
+        supabase = await get_async_supabase()
+        response = await supabase.table('items').insert({
+            'name': name,
+            'description': description,
+            'user_id': user_id
+        }).execute()
+
+        if response.data:
+            resource_versions.bump(user_id, 'items')
+            await search_indexes.apply_async(supabase, user_id, 'items', upserts=response.data)
+            return jsonify({'success': True, 'message': 'Item created successfully!', 'itemId': response.data[0]['id']})
+        return jsonify({'success': False, 'message': 'Failed to create item.'}), 500
+
+    except Exception as e:
+        logger.exception('Error creating item')
+        return jsonify({'success': False, 'message': 'Error creating item.'}), 500
+
+async def read_items():
+    user_id = g.user['id']
+    try:
+        page = parse_list_args(ITEM_FIELDS, '*', request)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        supabase = await get_async_supabase()
+
+        def build_query(fields):
+            return supabase.table('items').select(fields).eq('user_id', user_id)
+
+        if page is None:
+            items = (await build_query('*').execute()).data
+            return jsonify({'success': True, 'message': 'Items retrieved successfully!', 'items': items})
+
+        if page['stream']:
+            return Response(stream_rows_async(build_query, page, current_app.json.dumps), mimetype=NDJSON)
+
+        items, next_cursor = await fetch_page_async(build_query, page)
+        return jsonify({'success': True, 'message': 'Items retrieved successfully!', 'items': items, 'nextCursor': next_cursor})
+    except Exception as e:
+        logger.exception('Error reading items')
+        return jsonify({'success': False, 'message': 'Error reading items.'}), 500
+
+async def update_item():
+    user_id = g.user['id']
+    data = await request.get_json()
+    item_id = data.get('id')
+
+    if not item_id:
+        return jsonify({'success': False, 'message': 'Item ID is required.'}), 400
+
+    try:
+        supabase = await get_async_supabase()
+        response = await supabase.table('items').update({
+            'name': data.get('name'),
+            'description': data.get('description')
+        }).eq('id', item_id).eq('user_id', user_id).execute()
+
+        if response.data:
+            resource_versions.bump(user_id, 'items')
+            await search_indexes.apply_async(supabase, user_id, 'items', upserts=response.data)
+            return jsonify({'success': True, 'message': 'Item updated successfully!'})
+        return jsonify({'success': False, 'message': 'Item not found or you do not have permission to update it.'}), 404
+
+    except Exception as e:
+        logger.exception('Error updating item')
+        return jsonify({'success': False, 'message': 'Error updating item.'}), 500
+
+async def delete_item():
+    user_id = g.user['id']
+    data = await request.get_json()
+    item_id = data.get('id')
+
+    if not item_id:
+        return jsonify({'success': False, 'message': 'Item ID is required.'}), 400
+
+    try:
+        supabase = await get_async_supabase()
+        response = await supabase.table('items').delete().eq('id', item_id).eq('user_id', user_id).execute()
+
+        if response.data:
+            resource_versions.bump(user_id, 'items')
+            await search_indexes.apply_async(supabase, user_id, 'items', deletes=[item_id])
+            await record_deletes_async(supabase, user_id, 'items', [item_id])
+            return jsonify({'success': True, 'message': 'Item deleted successfully!'})
+        return jsonify({'success': False, 'message': 'Item not found or you do not have permission to delete it.'}), 404
+
+    except Exception as e:
+        logger.exception('Error deleting item')
+        return jsonify({'success': False, 'message': 'Error deleting item.'}), 500
@@ -1,21 +1,47 @@
-from flask import request, jsonify, current_app
-import bcrypt
-import jwt
+from flask import request, jsonify
+import logging
 import datetime
-import random
-import os
 from utils.supabase_client import supabase
-from utils.mailer import send_mail
+from utils.mailer import queue_mail, MailQueueFull
+from utils.mail_templates import mail_templates
+from utils.token_cache import token_cache
+from utils.password_hasher import password_hasher
+from utils.otp_store import otp_store, VERIFIED, MISMATCH, EXPIRED, LOCKED
 from config import Config
+from utils.lazy import lazy_import
+
+jwt = lazy_import('jwt')
+logger = logging.getLogger(__name__)
+
+OTP_MESSAGES = {
+    MISMATCH: 'Invalid OTP. Please try again.',
+    EXPIRED: 'OTP has expired. Please request a new one.',
+    LOCKED: 'Too many incorrect attempts. Please request a new OTP.'
+}
+
+# Seconds clients are told to wait while the mail queue is full
+MAIL_BUSY_RETRY_AFTER = 30
+
+def _discard_otp(email):
+    # A code that was never mailed must not stay valid
+    try:
+        otp_store.discard(email)
+    except Exception:
+        logger.exception('Error discarding unsent OTP')
+
+def _mail_busy():
+    response = jsonify({'success': False, 'message': 'Too many emails are waiting to be sent. Please try again shortly.'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(MAIL_BUSY_RETRY_AFTER)
+    return response
 
 def request_otp():
     data = request.get_json()
     email = data.get('email')
     
-    print(f'OTP request for email: {email}')
+    logger.info('OTP requested', extra={'email': email, 'sampled': True})
 
     if not email:
-        print('Email is required')
         return jsonify({'success': False, 'message': 'Email is required.'}), 400
 
     # Check if user already exists
@@ -23,43 +49,32 @@ def request_otp():
     users = response.data
     
     if response.data and len(users) > 0:
-        print(f'Email already in use: {email}')
+        logger.info('OTP requested for registered email', extra={'email': email})
         return jsonify({'success': False, 'message': 'Email already in use. Please try logging in.'}), 409
 
-    otp = str(random.randint(100000, 999999))
-    expires_at = (datetime.datetime.utcnow() + datetime.timedelta(minutes=5)).isoformat()
-    
-    print(f'Generated OTP: {otp} Expires at: {expires_at}')
-
-    # Insert or update OTP
-    otp_data = {
-        'email': email,
-        'otp_code': otp,
-        'expires_at': expires_at
-    }
-    
     try:
-        supabase.table('otps').upsert(otp_data, on_conflict='email').execute()
-        print('OTP stored successfully')
-        
-        template_path = os.path.join(current_app.static_folder, 'templates', 'otp_email.html')
-        with open(template_path, 'r', encoding='utf-8') as f:
-            email_html = f.read()
+        # Replaces any earlier code for this email
+        otp, expires_at = otp_store.issue(email)
         
-        email_html = email_html.replace('{{OTP_CODE}}', otp)
+        email_html, email_text = mail_templates.render('otp_email', OTP_CODE=otp)
         
-        send_mail(
+        queue_mail(
             to_email=email,
             subject='Your OTP for Registration',
             html_content=email_html,
-            text_content=f'Your One-Time Password (OTP) is: {otp}. It is valid for 5 minutes. Do not share this with anyone.'
+            text_content=email_text
         )
         
-        print(f'OTP email sent successfully to: {email}')
+        logger.info('OTP email queued', extra={'email': email, 'expiresAt': expires_at})
         return jsonify({'success': True, 'message': f'OTP sent successfully to {email}'})
         
+    except MailQueueFull:
+        logger.warning('Mail queue full, OTP not sent', extra={'email': email})
+        _discard_otp(email)
+        return _mail_busy()
     except Exception as e:
-        print(f'Error processing OTP request: {e}')
+        logger.exception('Error processing OTP request')
+        _discard_otp(email)
         return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
 
 def request_password_reset_otp():
@@ -76,34 +91,25 @@ def request_password_reset_otp():
     if not users or len(users) == 0:
         return jsonify({'success': False, 'message': 'Email not found.'}), 404
 
-    otp = str(random.randint(100000, 999999))
-    expires_at = (datetime.datetime.utcnow() + datetime.timedelta(minutes=5)).isoformat()
-
-    # Insert or update OTP
-    otp_data = {
-        'email': email,
-        'otp_code': otp,
-        'expires_at': expires_at
-    }
-
     try:
-        supabase.table('otps').upsert(otp_data, on_conflict='email').execute()
+        otp, expires_at = otp_store.issue(email)
         
-        template_path = os.path.join(current_app.static_folder, 'templates', 'forgot_password_otp_email.html')
-        with open(template_path, 'r', encoding='utf-8') as f:
-            email_html = f.read()
-            
-        email_html = email_html.replace('{{OTP_CODE}}', otp)
+        email_html, email_text = mail_templates.render('forgot_password_otp_email', OTP_CODE=otp)
 
-        send_mail(
+        queue_mail(
             to_email=email,
             subject='Password Reset OTP',
             html_content=email_html,
-            text_content=f'Your One-Time Password (OTP) for password reset is: {otp}. It is valid for 5 minutes. Do not share this with anyone.'
+            text_content=email_text
         )
         return jsonify({'success': True, 'message': f'Password reset OTP sent successfully to {email}'})
+    except MailQueueFull:
+        logger.warning('Mail queue full, password reset OTP not sent', extra={'email': email})
+        _discard_otp(email)
+        return _mail_busy()
     except Exception as e:
-        print(f'Error sending password reset email: {e}')
+        logger.exception('Error sending password reset email')
+        _discard_otp(email)
         return jsonify({'success': False, 'message': f'Failed to send password reset OTP. Error: {str(e)}'}), 500
 
 def verify_otp_and_register():
@@ -115,43 +121,26 @@ def verify_otp_and_register():
     password = data.get('password')
     otp = data.get('otp')
     
-    print(f'Registration attempt for email: {email}')
+    logger.info('Registration attempt', extra={'email': email, 'sampled': True})
 
     if not all([firstname, lastname, email, password, otp]):
-        print('Missing required fields')
         return jsonify({'success': False, 'message': 'All fields including OTP are required.'}), 400
 
-    # Get OTP from database
-    response = supabase.table('otps').select('otp_code, expires_at').eq('email', email).execute()
-    otps = response.data
+    # Kept until the user row exists, so a failed insert doesn't burn the code
+    result = otp_store.verify(email, otp, consume=False)
 
-    if not otps or len(otps) == 0:
-        print(f'No OTP found for email: {email}')
-        return jsonify({'success': False, 'message': 'Invalid or expired OTP.'}), 400
-
-    stored_otp = otps[0]
-    current_time = datetime.datetime.utcnow()
-    expires_at = datetime.datetime.fromisoformat(stored_otp['expires_at'].replace('Z', '+00:00')).replace(tzinfo=None) # Handle ISO format
-
-    print(f"Stored OTP: {stored_otp['otp_code']}, Provided OTP: {otp}")
-
-    if stored_otp['otp_code'] != otp:
-        print('OTP mismatch')
-        return jsonify({'success': False, 'message': 'Invalid OTP. Please try again.'}), 400
-    
-    if current_time > expires_at:
-        print('OTP expired')
-        supabase.table('otps').delete().eq('email', email).execute()
-        return jsonify({'success': False, 'message': 'OTP has expired. Please request a new one.'}), 400
+    if result != VERIFIED:
+        logger.info('Registration rejected: OTP %s', result, extra={'email': email})
+        return jsonify({'success': False, 'message': OTP_MESSAGES.get(result, 'Invalid or expired OTP.')}), 400
 
     # Check if email already exists (double check)
     user_check = supabase.table('users').select('*').eq('email', email).execute()
     if user_check.data and len(user_check.data) > 0:
-        print(f'Email already in use: {email}')
+        logger.info('Registration rejected: email already in use', extra={'email': email})
         return jsonify({'success': False, 'message': 'Email already in use.'}), 409
 
     # Hash password
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    hashed_password = password_hasher.hash(password)
 
     # Insert user
     new_user_data = {
@@ -166,10 +155,10 @@ def verify_otp_and_register():
     try:
         insert_response = supabase.table('users').insert(new_user_data).execute()
         new_user = insert_response.data[0]
-        print(f'User inserted successfully: {new_user}')
+        logger.info('User registered', extra={'userId': new_user['id']})
 
         # Delete OTP
-        supabase.table('otps').delete().eq('email', email).execute()
+        otp_store.discard(email)
 
         # Generate Token
         access_token = jwt.encode({
@@ -181,7 +170,7 @@ def verify_otp_and_register():
         return jsonify({'success': True, 'message': 'Registration successful!', 'token': access_token})
 
     except Exception as e:
-        print(f'Error inserting user: {e}')
+        logger.exception('Error inserting user')
         return jsonify({'success': False, 'message': 'An error occurred during registration.'}), 500
 
 def verify_password_reset_otp():
@@ -192,22 +181,14 @@ def verify_password_reset_otp():
     if not email or not otp:
         return jsonify({'success': False, 'message': 'Email and OTP are required.'}), 400
 
-    response = supabase.table('otps').select('otp_code, expires_at').eq('email', email).execute()
-    otps = response.data
-
-    if not otps or len(otps) == 0:
-        return jsonify({'success': False, 'message': 'Invalid or expired OTP.'}), 400
-
-    stored_otp = otps[0]
-    current_time = datetime.datetime.utcnow()
-    expires_at = datetime.datetime.fromisoformat(stored_otp['expires_at'].replace('Z', '+00:00')).replace(tzinfo=None)
+    # Checks, counts the attempt and consumes the code in one store operation
+    result = otp_store.verify(email, otp)
 
-    if stored_otp['otp_code'] != otp or current_time > expires_at:
+    if result == LOCKED:
+        return jsonify({'success': False, 'message': OTP_MESSAGES[LOCKED]}), 400
+    if result != VERIFIED:
         return jsonify({'success': False, 'message': 'Invalid or expired OTP.'}), 400
 
-    # Delete OTP
-    supabase.table('otps').delete().eq('email', email).execute()
-
     return jsonify({'success': True, 'message': 'OTP verified successfully. You can now reset your password.'})
 
 def reset_password():
@@ -222,15 +203,16 @@ def reset_password():
     if new_password != confirm_new_password:
         return jsonify({'success': False, 'message': 'New password and confirm password do not match.'}), 400
 
-    hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    hashed_password = password_hasher.hash(new_password)
 
     try:
         supabase.table('users').update({'password': hashed_password}).eq('email', email).execute()
         supabase.table('users').update({'token': None}).eq('email', email).execute() # Clear token
+        token_cache.invalidate_user(email=email)
         
         return jsonify({'success': True, 'message': 'Password has been reset successfully! Please log in with your new password.'})
     except Exception as e:
-        print(f'Error updating password: {e}')
+        logger.exception('Error updating password')
         return jsonify({'success': False, 'message': 'An error occurred while resetting password.'}), 500
 
 def login():
@@ -238,7 +220,7 @@ def login():
     email = data.get('email')
     password = data.get('password')
     
-    print(f'Login attempt for email: {email}')
+    logger.info('Login attempt', extra={'email': email, 'sampled': True})
 
     response = supabase.table('users').select('*').eq('email', email).execute()
     users = response.data
@@ -248,7 +230,14 @@ def login():
 
     user = users[0]
     
-    if bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
+    if password_hasher.verify(password, user['password']):
+        # Bring the stored hash in line with the current bcrypt cost
+        if password_hasher.needs_rehash(user['password']):
+            try:
+                supabase.table('users').update({'password': password_hasher.hash(password)}).eq('id', user['id']).execute()
+            except Exception as e:
+                logger.exception('Error rehashing password on login')
+
         access_token = jwt.encode({
             'id': user['id'],
             'email': user['email'],
@@ -258,13 +247,15 @@ def login():
         # Update token in DB
         try:
             supabase.table('users').update({'token': access_token}).eq('id', user['id']).execute()
+            # The previous token is no longer the stored one
+            token_cache.invalidate_user(user_id=user['id'])
             return jsonify({
                 'success': True,
                 'message': 'Login successful!',
                 'token': access_token
             })
         except Exception as e:
-            print(f'Error storing token in DB: {e}')
+            logger.exception('Error storing token in DB')
             return jsonify({'success': False, 'message': 'An error occurred during login.'}), 500
     else:
         return jsonify({'success': False, 'message': 'Invalid credentials!'}), 401
@@ -276,7 +267,8 @@ def logout():
 
     try:
         supabase.table('users').update({'token': None}).eq('id', user_id).execute()
+        token_cache.invalidate_user(user_id=user_id)
         return jsonify({'success': True, 'message': 'Logout successful!'})
     except Exception as e:
-        print(f'Error clearing token from DB on logout: {e}')
+        logger.exception('Error clearing token from DB on logout')
         return jsonify({'success': False, 'message': 'An error occurred during logout.'}), 500
@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import request, jsonify, g
+from controllers.user_controller import load_user
+from controllers.account_controller import list_accounts
+from controllers.item_controller import list_items
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Section name -> loader(user_id); each runs on the pool without a request context
+SECTIONS = {
+    'user': load_user,
+    'accounts': list_accounts,
+    'items': list_items
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Bounded so a burst of dashboard loads can't open unbounded Supabase calls
+                _executor = ThreadPoolExecutor(max_workers=Config.BOOTSTRAP_WORKERS, thread_name_prefix='bootstrap')
+    return _executor
+
+def _timed(loader, user_id):
+    started = time.perf_counter()
+    try:
+        return loader(user_id), None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+def get_bootstrap():
+    user_id = g.user['id']
+    # ?sections=user,accounts limits the payload to what the caller renders
+    requested = [name.strip() for name in (request.args.get('sections') or ','.join(SECTIONS)).split(',') if name.strip()]
+    unknown = [name for name in requested if name not in SECTIONS]
+    if unknown or not requested:
+        return jsonify({'success': False, 'message': f"sections must be drawn from: {', '.join(SECTIONS)}."}), 400
+
+    started = time.perf_counter()
+    executor = _get_executor()
+    futures = {name: executor.submit(_timed, SECTIONS[name], user_id) for name in dict.fromkeys(requested)}
+    done, _ = wait(futures.values(), timeout=Config.BOOTSTRAP_TIMEOUT)
+
+    payload = {'success': True}
+    timings = {}
+    errors = {}
+    for name, future in futures.items():
+        if future not in done:
+            future.cancel()
+            errors[name] = 'Timed out.'
+            continue
+        data, error, elapsed = future.result()
+        timings[name] = round(elapsed * 1000, 2)
+        if error is not None:
+            logger.error('Error loading bootstrap section %s', name, exc_info=error)
+            errors[name] = f'Error loading {name}.'
+        else:
+            payload[name] = data
+
+    if 'user' in futures and 'user' not in errors and payload.get('user') is None:
+        return jsonify({'success': False, 'message': 'User not found.'}), 404
+
+    timings['total'] = round((time.perf_counter() - started) * 1000, 2)
+    payload['timingsMs'] = timings
+    if errors:
+        payload['errors'] = errors
+
+    response = jsonify(payload)
+    response.headers['Server-Timing'] = ', '.join(f'{name};dur={ms}' for name, ms in timings.items())
+    return response
@@ -1,5 +1,15 @@
+import logging
 from flask import request, jsonify, g
 from utils.supabase_client import supabase
+from utils.etag import resource_versions
+from utils.search_index import search_indexes
+from utils.pagination import parse_list_args, fetch_page, stream_rows
+from utils.sync_log import changed_since, record_deletes
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ITEM_FIELDS = ('id', 'name', 'description', 'user_id')
 
 def create_item():
     user_id = g.user['id']
@@ -20,21 +30,43 @@ def create_item():
         # Supabase returns the inserted data
         if response.data:
             new_item = response.data[0]
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', upserts=response.data)
             return jsonify({'success': True, 'message': 'Item created successfully!', 'itemId': new_item['id']})
         else:
             return jsonify({'success': False, 'message': 'Failed to create item.'}), 500
 
     except Exception as e:
-        print(f'Error creating item: {e}')
+        logger.exception('Error creating item')
         return jsonify({'success': False, 'message': 'Error creating item.'}), 500
 
+def list_items(user_id):
+    return supabase.table('items').select('*').eq('user_id', user_id).execute().data
+
+def item_changes(user_id, position, limit):
+    return changed_since('items', 'id, name, description, user_id, updated_at', user_id, position, limit)
+
 def read_items():
     user_id = g.user['id']
     try:
-        response = supabase.table('items').select('*').eq('user_id', user_id).execute()
-        return jsonify({'success': True, 'message': 'Items retrieved successfully!', 'items': response.data})
+        page = parse_list_args(ITEM_FIELDS, '*')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    def build_query(fields):
+        return supabase.table('items').select(fields).eq('user_id', user_id)
+
+    try:
+        if page is None:
+            return jsonify({'success': True, 'message': 'Items retrieved successfully!', 'items': list_items(user_id)})
+
+        if page['stream']:
+            return stream_rows(build_query, page)
+
+        items, next_cursor = fetch_page(build_query, page)
+        return jsonify({'success': True, 'message': 'Items retrieved successfully!', 'items': items, 'nextCursor': next_cursor})
     except Exception as e:
-        print(f'Error reading items: {e}')
+        logger.exception('Error reading items')
         return jsonify({'success': False, 'message': 'Error reading items.'}), 500
 
 def update_item():
@@ -56,12 +88,14 @@ def update_item():
         }).eq('id', item_id).eq('user_id', user_id).execute()
 
         if response.data and len(response.data) > 0:
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', upserts=response.data)
             return jsonify({'success': True, 'message': 'Item updated successfully!'})
         else:
             return jsonify({'success': False, 'message': 'Item not found or you do not have permission to update it.'}), 404
 
     except Exception as e:
-        print(f'Error updating item: {e}')
+        logger.exception('Error updating item')
         return jsonify({'success': False, 'message': 'Error updating item.'}), 500
 
 def delete_item():
@@ -76,10 +110,133 @@ def delete_item():
         response = supabase.table('items').delete().eq('id', item_id).eq('user_id', user_id).execute()
         
         if response.data and len(response.data) > 0:
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', deletes=[item_id])
+            record_deletes(user_id, 'items', [item_id])
             return jsonify({'success': True, 'message': 'Item deleted successfully!'})
         else:
             return jsonify({'success': False, 'message': 'Item not found or you do not have permission to delete it.'}), 404
 
     except Exception as e:
-        print(f'Error deleting item: {e}')
+        logger.exception('Error deleting item')
         return jsonify({'success': False, 'message': 'Error deleting item.'}), 500
+
+def _batch_payload(key):
+    data = request.get_json(silent=True) or {}
+    rows = data.get(key)
+    if not isinstance(rows, list) or not rows:
+        return None, (jsonify({'success': False, 'message': f'A non-empty "{key}" array is required.'}), 400)
+    if len(rows) > Config.ITEM_BATCH_LIMIT:
+        return None, (jsonify({'success': False, 'message': f'A batch can contain at most {Config.ITEM_BATCH_LIMIT} entries.'}), 413)
+    return rows, None
+
+def create_items_batch():
+    user_id = g.user['id']
+    rows, error = _batch_payload('items')
+    if error:
+        return error
+
+    results = [None] * len(rows)
+    to_insert = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or not row.get('name'):
+            results[index] = {'index': index, 'success': False, 'message': 'Name is required.'}
+            continue
+        to_insert.append((index, {'name': row['name'], 'description': row.get('description'), 'user_id': user_id}))
+
+    try:
+        if to_insert:
+            response = supabase.table('items').insert([item for _, item in to_insert]).execute()
+            # PostgREST returns inserted rows in request order
+            for (index, _), created in zip(to_insert, response.data):
+                results[index] = {'index': index, 'success': True, 'id': created['id']}
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', upserts=response.data)
+
+        created_count = sum(1 for result in results if result['success'])
+        return jsonify({'success': True, 'message': f'{created_count} of {len(rows)} items created.', 'results': results})
+    except Exception as e:
+        logger.exception('Error creating items batch')
+        return jsonify({'success': False, 'message': 'Error creating items.'}), 500
+
+def update_items_batch():
+    user_id = g.user['id']
+    rows, error = _batch_payload('items')
+    if error:
+        return error
+
+    results = [None] * len(rows)
+    candidates = []
+    seen = set()
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict) or not row.get('id'):
+            results[index] = {'index': index, 'success': False, 'message': 'Item ID is required.'}
+            continue
+        item_id = row['id']
+        if not _valid_item_id(item_id):
+            results[index] = {'index': index, 'success': False, 'message': 'Item ID must be a number.'}
+            continue
+        # Postgres can't update one row twice in a statement; the first entry wins
+        if str(item_id) in seen:
+            results[index] = {'index': index, 'success': False, 'id': item_id, 'message': 'Duplicate item ID in batch.'}
+            continue
+        seen.add(str(item_id))
+        candidates.append((index, {'id': int(item_id), 'name': row.get('name'), 'description': row.get('description')}))
+
+    try:
+        updated = {}
+        if candidates:
+            # One update-only statement (sql/items_batch.sql): rows the user doesn't
+            # own, or that were deleted meanwhile, are simply not touched
+            response = supabase.rpc('items_update_batch', {'p_user_id': user_id, 'p_items': [item for _, item in candidates]}).execute()
+            updated = {str(item['id']): item for item in response.data or []}
+
+        for index, item in candidates:
+            if str(item['id']) in updated:
+                results[index] = {'index': index, 'success': True, 'id': rows[index]['id']}
+            else:
+                results[index] = {'index': index, 'success': False, 'message': 'Item not found or you do not have permission to update it.'}
+
+        if updated:
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', upserts=list(updated.values()))
+
+        return jsonify({'success': True, 'message': f'{len(updated)} of {len(rows)} items updated.', 'results': results})
+    except Exception as e:
+        logger.exception('Error updating items batch')
+        return jsonify({'success': False, 'message': 'Error updating items.'}), 500
+
+def _valid_item_id(item_id):
+    # Anything else would make Postgres reject the whole batch statement
+    return not isinstance(item_id, bool) and (isinstance(item_id, int) or (isinstance(item_id, str) and item_id.isascii() and item_id.isdigit()))
+
+def delete_items_batch():
+    user_id = g.user['id']
+    ids, error = _batch_payload('ids')
+    if error:
+        return error
+    valid_ids = list(dict.fromkeys(int(item_id) for item_id in ids if _valid_item_id(item_id)))
+
+    try:
+        deleted_ids = set()
+        if valid_ids:
+            response = supabase.table('items').delete().in_('id', valid_ids).eq('user_id', user_id).execute()
+            deleted_ids = {str(item['id']) for item in response.data}
+        if deleted_ids:
+            resource_versions.bump(user_id, 'items')
+            search_indexes.apply(user_id, 'items', deletes=deleted_ids)
+            record_deletes(user_id, 'items', deleted_ids)
+
+        results = []
+        for index, item_id in enumerate(ids):
+            if not _valid_item_id(item_id):
+                results.append({'index': index, 'success': False, 'id': item_id, 'message': 'Item ID must be a number.'})
+            elif str(int(item_id)) in deleted_ids:
+                results.append({'index': index, 'success': True, 'id': item_id})
+            else:
+                results.append({'index': index, 'success': False, 'id': item_id, 'message': 'Item not found or you do not have permission to delete it.'})
+
+        return jsonify({'success': True, 'message': f'{len(deleted_ids)} of {len(ids)} items deleted.', 'results': results})
+    except Exception as e:
+        logger.exception('Error deleting items batch')
+        return jsonify({'success': False, 'message': 'Error deleting items.'}), 500
@@ -0,0 +1,47 @@
+import logging
+import time
+from flask import request, jsonify, g
+from utils.search_index import search_indexes, SEARCH_FIELDS
+from utils.image_variants import variant_urls
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 100
+
+def search():
+    user_id = g.user['id']
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': 'Query parameter "q" is required.'}), 400
+    if len(query) > MAX_QUERY_LENGTH:
+        return jsonify({'success': False, 'message': f'Query must be at most {MAX_QUERY_LENGTH} characters.'}), 400
+
+    # ?type=accounts,items narrows the search to those resources
+    types = [t.strip() for t in (request.args.get('type') or '').split(',') if t.strip()]
+    if any(t not in SEARCH_FIELDS for t in types):
+        return jsonify({'success': False, 'message': f"type must be one of: {', '.join(SEARCH_FIELDS)}."}), 400
+
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer.'}), 400
+    limit = max(1, min(limit, Config.SEARCH_MAX_RESULTS))
+
+    started = time.perf_counter()
+    try:
+        results = search_indexes.search(user_id, query, types or None, limit)
+    except Exception as e:
+        logger.exception('Error searching')
+        return jsonify({'success': False, 'message': 'Error searching.'}), 500
+
+    for result in results:
+        if result['type'] == 'accounts' and result.get('image'):
+            result['imageVariants'] = variant_urls(result['image'])
+
+    return jsonify({
+        'success': True,
+        'message': 'Search completed.',
+        'results': results,
+        'tookMs': round((time.perf_counter() - started) * 1000, 2)
+    })
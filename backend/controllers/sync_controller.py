@@ -0,0 +1,68 @@
+import logging
+import time
+from flask import request, jsonify, g
+from controllers.account_controller import account_changes
+from controllers.item_controller import item_changes
+from utils.sync_log import encode_sync_cursor, decode_sync_cursor, sync_watermark, deleted_since, advance
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Resource -> changes(user_id, position, limit)
+RESOURCES = {
+    'accounts': account_changes,
+    'items': item_changes
+}
+
+def get_sync():
+    user_id = g.user['id']
+    # ?since=<cursor from the previous response>; omitted for the first sync
+    try:
+        state = decode_sync_cursor(request.args['since'], ['tombstones', *RESOURCES]) if request.args.get('since') else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    try:
+        limit = int(request.args.get('limit') or Config.SYNC_PAGE_LIMIT)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'limit must be an integer.'}), 400
+    limit = max(1, min(limit, Config.SYNC_PAGE_LIMIT))
+
+    # Tombstones are pruned, so a cursor older than their retention can't be
+    # replayed; the client then replaces its cache, as on a first sync
+    reset = state is None or time.time() - state['at'] > Config.SYNC_TOMBSTONE_DAYS * 86400
+
+    deleted = {name: [] for name in RESOURCES}
+    has_more = False
+    try:
+        # Read before any rows, so nothing committed later can be skipped
+        watermark = sync_watermark()
+        if reset:
+            # Deletes older than the snapshot below don't concern a fresh cache
+            state = {'tombstones': {'from': watermark}}
+        else:
+            tombstones, state['tombstones'], more = advance(
+                state.get('tombstones'), deleted_since(user_id, state.get('tombstones'), limit), limit, watermark)
+            has_more = has_more or more
+            for tombstone in tombstones:
+                if tombstone['resource'] in deleted:
+                    deleted[tombstone['resource']].append(tombstone['row_id'])
+
+        payload = {'success': True, 'message': 'Changes retrieved successfully!'}
+        for name, changes in RESOURCES.items():
+            rows, state[name], more = advance(state.get(name), changes(user_id, state.get(name), limit), limit, watermark)
+            has_more = has_more or more
+            for row in rows:
+                row.pop('sync_xid', None)
+            payload[name] = rows
+    except Exception as e:
+        logger.exception('Error reading changes')
+        return jsonify({'success': False, 'message': 'Error reading changes.'}), 500
+
+    state['at'] = time.time()
+    payload.update({
+        'deleted': deleted,
+        'reset': reset,
+        'hasMore': has_more,
+        'cursor': encode_sync_cursor(state)
+    })
+    return jsonify(payload)
@@ -1,29 +1,45 @@
 from flask import request, jsonify, g
-import bcrypt
-import jwt
+import logging
 import datetime
 from utils.supabase_client import supabase
-from utils.supabase_storage import upload_file_to_supabase, delete_file_from_supabase
+from utils.etag import resource_versions
+from utils.token_cache import token_cache
+from utils.uploads import prepare_upload, UploadError
+from utils.image_variants import variant_urls
+from utils.content_store import store_image, release_image
+from utils.password_hasher import password_hasher
 from config import Config
+from utils.lazy import lazy_import
+
+jwt = lazy_import('jwt')
+logger = logging.getLogger(__name__)
+
+def load_user(user_id):
+    # Profile fields shared by /user-info and /bootstrap; None if the user is gone
+    response = supabase.table('users').select('id, firstname, middlename, lastname, email, profilepicture').eq('id', user_id).execute()
+    if not response.data:
+        return None
+    return _with_default_picture(response.data[0])
+
+def _with_default_picture(user):
+    if not user.get('profilepicture'):
+        user['profilepicture'] = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default-profile.png'
+    user['profilepictureVariants'] = variant_urls(user['profilepicture'])
+    return user
 
 def get_user_info():
     user_id = g.user['id']
-    print(f'getUserInfo: Fetching user info for user ID: {user_id}')
+    logger.debug('Fetching user info', extra={'userId': user_id})
 
     try:
-        response = supabase.table('users').select('id, firstname, middlename, lastname, email, profilepicture').eq('id', user_id).execute()
-        users = response.data
+        user = load_user(user_id)
 
-        if users and len(users) > 0:
-            user = users[0]
-            if not user.get('profilepicture'):
-                user['profilepicture'] = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default-profile.png'
-            
+        if user:
             return jsonify({'success': True, 'user': user})
         else:
             return jsonify({'success': False, 'message': 'User not found.'}), 404
     except Exception as e:
-        print(f'Error in getUserInfo: {e}')
+        logger.exception('Error in getUserInfo')
         return jsonify({'success': False, 'message': 'An error occurred while fetching user information.'}), 500
 
 def update_user_info(id):
@@ -47,10 +63,13 @@ def update_user_info(id):
             'lastname': lastname,
             'email': email
         }).eq('id', user_id).execute()
+        # Cached g.user entries still carry the old email
+        token_cache.invalidate_user(user_id=user_id)
+        resource_versions.bump(user_id, 'user-info')
         
         return jsonify({'success': True, 'message': 'Account information updated successfully!'})
     except Exception as e:
-        print(f'Error updating user info: {e}')
+        logger.exception('Error updating user info')
         return jsonify({'success': False, 'message': 'Error updating user information.'}), 500
 
 def upload_profile_picture():
@@ -62,6 +81,11 @@ def upload_profile_picture():
     if file.filename == '':
         return jsonify({'success': False, 'message': 'No file selected.'}), 400
 
+    try:
+        upload = prepare_upload(file)
+    except UploadError as e:
+        return jsonify({'success': False, 'message': str(e)}), e.status_code
+
     try:
         # Get current profile picture
         response = supabase.table('users').select('profilepicture').eq('id', user_id).execute()
@@ -71,36 +95,31 @@ def upload_profile_picture():
         current_profile_picture = response.data[0].get('profilepicture')
         
         # Upload new file
-        file_content = file.read()
-        file_name = f"profile-pictures/{file.filename}"
-        
-        upload_result = upload_file_to_supabase(file_content, file_name, 'images')
+        with upload:
+            upload_result = store_image(upload, 'profile-pictures')
         
         if upload_result['error']:
-            print(f"Error uploading: {upload_result['error']}")
+            logger.error('Error uploading profile picture: %s', upload_result['error'])
             return jsonify({'success': False, 'message': 'Failed to upload profile picture.'}), 500
             
         profile_picture_path = upload_result['publicUrl']
-        
-        # Delete old file if it exists and is not default
-        if current_profile_picture and 'supabase.co/storage' in current_profile_picture and 'default-profile.png' not in current_profile_picture:
-            try:
-                # Extract path from URL
-                # URL: https://.../storage/v1/object/public/images/path/to/file
-                parts = current_profile_picture.split('/public/images/')
-                if len(parts) > 1:
-                    old_file_path = parts[1]
-                    delete_file_from_supabase(old_file_path, 'images')
-            except Exception as e:
-                print(f"Error deleting old file: {e}")
 
         # Update user record
-        supabase.table('users').update({'profilepicture': profile_picture_path}).eq('id', user_id).execute()
+        try:
+            supabase.table('users').update({'profilepicture': profile_picture_path}).eq('id', user_id).execute()
+        except Exception:
+            # Nothing references the new picture yet
+            release_image(profile_picture_path)
+            raise
+        resource_versions.bump(user_id, 'user-info', 'profile-picture')
+
+        # Delete old file once its last reference is gone
+        release_image(current_profile_picture)
         
-        return jsonify({'success': True, 'message': 'Profile picture updated successfully!', 'profilepicture': profile_picture_path})
+        return jsonify({'success': True, 'message': 'Profile picture updated successfully!', 'profilepicture': profile_picture_path, 'profilepictureVariants': variant_urls(profile_picture_path)})
 
     except Exception as e:
-        print(f'Error in uploadProfilePicture: {e}')
+        logger.exception('Error in uploadProfilePicture')
         return jsonify({'success': False, 'message': 'Error saving profile picture.'}), 500
 
 def get_profile_picture():
@@ -111,11 +130,11 @@ def get_profile_picture():
             profile_picture = response.data[0].get('profilepicture')
             if not profile_picture:
                 profile_picture = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default-profile.png'
-            return jsonify({'success': True, 'profilepicture': profile_picture})
+            return jsonify({'success': True, 'profilepicture': profile_picture, 'profilepictureVariants': variant_urls(profile_picture)})
         else:
             return jsonify({'success': False, 'message': 'User not found.'}), 404
     except Exception as e:
-        print(f'Error in getProfilePicture: {e}')
+        logger.exception('Error in getProfilePicture')
         return jsonify({'success': False, 'message': 'An unexpected error occurred.'}), 500
 
 def verify_current_password():
@@ -132,12 +151,12 @@ def verify_current_password():
             return jsonify({'success': False, 'message': 'User not found.'}), 404
             
         hashed_password = response.data[0]['password']
-        if bcrypt.checkpw(current_password.encode('utf-8'), hashed_password.encode('utf-8')):
+        if password_hasher.verify(current_password, hashed_password):
             return jsonify({'success': True, 'message': 'Current password matches.'})
         else:
             return jsonify({'success': False, 'message': 'Current password does not match.'}), 401
     except Exception as e:
-        print(f'Error verifying password: {e}')
+        logger.exception('Error verifying password')
         return jsonify({'success': False, 'message': 'An error occurred.'}), 500
 
 def change_password():
@@ -161,11 +180,11 @@ def change_password():
             return jsonify({'success': False, 'message': 'User not found.'}), 404
             
         hashed_password = response.data[0]['password']
-        if not bcrypt.checkpw(current_password.encode('utf-8'), hashed_password.encode('utf-8')):
+        if not password_hasher.verify(current_password, hashed_password):
             return jsonify({'success': False, 'message': 'Invalid current password.'}), 401
 
         # Hash new password
-        new_hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        new_hashed_password = password_hasher.hash(new_password)
         
         # Update password
         supabase.table('users').update({'password': new_hashed_password}).eq('id', user_id).execute()
@@ -178,9 +197,10 @@ def change_password():
         }, Config.JWT_SECRET, algorithm="HS256")
         
         supabase.table('users').update({'token': new_access_token}).eq('id', user_id).execute()
+        token_cache.invalidate_user(user_id=user_id)
         
         return jsonify({'success': True, 'message': 'Password changed successfully!', 'token': new_access_token})
 
     except Exception as e:
-        print(f'Error changing password: {e}')
+        logger.exception('Error changing password')
         return jsonify({'success': False, 'message': 'An error occurred while changing password.'}), 500
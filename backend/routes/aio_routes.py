@@ -0,0 +1,26 @@
+from quart import Blueprint
+from controllers.aio import account_controller, item_controller, bootstrap_controller
+from utils.aio_decorators import token_required, conditional_get
+
+# Routes served by the async controllers under asgi.py; everything else falls
+# through to the Flask app. Paths and methods match the Flask blueprints.
+
+account_bp = Blueprint('account', __name__)
+
+account_bp.route('/accounts', methods=['POST'])(token_required(account_controller.create_account))
+account_bp.route('/accounts', methods=['GET'])(token_required(conditional_get('accounts')(account_controller.get_accounts)))
+account_bp.route('/accounts/<id>', methods=['PUT'])(token_required(account_controller.update_account))
+account_bp.route('/accounts/<id>', methods=['DELETE'])(token_required(account_controller.delete_account))
+
+item_bp = Blueprint('item', __name__)
+
+item_bp.route('/create', methods=['POST'])(token_required(item_controller.create_item))
+item_bp.route('/read', methods=['GET'])(token_required(conditional_get('items')(item_controller.read_items)))
+item_bp.route('/update', methods=['PUT'])(token_required(item_controller.update_item))
+item_bp.route('/delete', methods=['DELETE'])(token_required(item_controller.delete_item))
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+bootstrap_bp.route('/bootstrap', methods=['GET'])(token_required(bootstrap_controller.get_bootstrap))
+
+blueprints = (account_bp, item_bp, bootstrap_bp)
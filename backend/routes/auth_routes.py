@@ -1,13 +1,23 @@
 from flask import Blueprint
 from controllers import auth_controller
 from utils.decorators import token_required
+from utils.rate_limiter import rate_limiter, by_ip, by_email
 
 auth_bp = Blueprint('auth', __name__)
 
-auth_bp.route('/request-otp', methods=['POST'])(auth_controller.request_otp)
-auth_bp.route('/forgot-password/request-otp', methods=['POST'])(auth_controller.request_password_reset_otp)
-auth_bp.route('/verify-otp-and-register', methods=['POST'])(auth_controller.verify_otp_and_register)
-auth_bp.route('/forgot-password/verify-otp', methods=['POST'])(auth_controller.verify_password_reset_otp)
-auth_bp.route('/forgot-password/reset', methods=['POST'])(auth_controller.reset_password)
-auth_bp.route('/login', methods=['POST'])(auth_controller.login)
+# Each rule is (key, limit, seconds[, algorithm]); every rule must pass before
+# the controller runs any bcrypt, SMTP or Supabase work
+otp_limit = rate_limiter.limit('request-otp', (by_ip, 10, 600, 'bucket'), (by_email, 3, 600, 'bucket'))
+reset_otp_limit = rate_limiter.limit('reset-otp', (by_ip, 10, 600, 'bucket'), (by_email, 3, 600, 'bucket'))
+register_limit = rate_limiter.limit('register', (by_ip, 20, 600), (by_email, 5, 600))
+verify_reset_limit = rate_limiter.limit('verify-reset-otp', (by_ip, 20, 600), (by_email, 5, 600))
+reset_limit = rate_limiter.limit('reset-password', (by_ip, 10, 600), (by_email, 5, 600))
+login_limit = rate_limiter.limit('login', (by_ip, 20, 60), (by_email, 5, 60))
+
+auth_bp.route('/request-otp', methods=['POST'])(otp_limit(auth_controller.request_otp))
+auth_bp.route('/forgot-password/request-otp', methods=['POST'])(reset_otp_limit(auth_controller.request_password_reset_otp))
+auth_bp.route('/verify-otp-and-register', methods=['POST'])(register_limit(auth_controller.verify_otp_and_register))
+auth_bp.route('/forgot-password/verify-otp', methods=['POST'])(verify_reset_limit(auth_controller.verify_password_reset_otp))
+auth_bp.route('/forgot-password/reset', methods=['POST'])(reset_limit(auth_controller.reset_password))
+auth_bp.route('/login', methods=['POST'])(login_limit(auth_controller.login))
 auth_bp.route('/logout', methods=['POST'])(token_required(auth_controller.logout))
@@ -0,0 +1,7 @@
+from flask import Blueprint
+from controllers import bootstrap_controller
+from utils.decorators import token_required
+
+bootstrap_bp = Blueprint('bootstrap', __name__)
+
+bootstrap_bp.route('/bootstrap', methods=['GET'])(token_required(bootstrap_controller.get_bootstrap))
@@ -0,0 +1,7 @@
+from flask import Blueprint
+from controllers import search_controller
+from utils.decorators import token_required
+
+search_bp = Blueprint('search', __name__)
+
+search_bp.route('/search', methods=['GET'])(token_required(search_controller.search))
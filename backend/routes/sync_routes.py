@@ -0,0 +1,7 @@
+from flask import Blueprint
+from controllers import sync_controller
+from utils.decorators import token_required
+
+sync_bp = Blueprint('sync', __name__)
+
+sync_bp.route('/sync', methods=['GET'])(token_required(sync_controller.get_sync))
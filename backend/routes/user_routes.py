@@ -1,12 +1,17 @@
 from flask import Blueprint
 from controllers import user_controller
-from utils.decorators import token_required
+from utils.decorators import token_required, conditional_get
+from utils.rate_limiter import rate_limiter, by_ip, by_user
 
 user_bp = Blueprint('user', __name__)
 
-user_bp.route('/user-info', methods=['GET'])(token_required(user_controller.get_user_info))
+# Applied inside token_required so the limit is keyed on the verified user
+verify_password_limit = rate_limiter.limit('verify-password', (by_user, 5, 60), (by_ip, 20, 60))
+change_password_limit = rate_limiter.limit('change-password', (by_user, 5, 300), (by_ip, 20, 300))
+
+user_bp.route('/user-info', methods=['GET'])(token_required(conditional_get('user-info')(user_controller.get_user_info)))
 user_bp.route('/users/<id>', methods=['PUT'])(token_required(user_controller.update_user_info))
 user_bp.route('/upload-profile-picture', methods=['POST'])(token_required(user_controller.upload_profile_picture))
-user_bp.route('/profile-picture', methods=['GET'])(token_required(user_controller.get_profile_picture))
-user_bp.route('/verify-current-password', methods=['POST'])(token_required(user_controller.verify_current_password))
-user_bp.route('/change-password', methods=['POST'])(token_required(user_controller.change_password))
+user_bp.route('/profile-picture', methods=['GET'])(token_required(conditional_get('profile-picture')(user_controller.get_profile_picture)))
+user_bp.route('/verify-current-password', methods=['POST'])(token_required(verify_password_limit(user_controller.verify_current_password)))
+user_bp.route('/change-password', methods=['POST'])(token_required(change_password_limit(user_controller.change_password)))
@@ -0,0 +1,17 @@
+-- Update-only batch edit for PUT /items/batch
+-- Changes only rows that still exist and belong to p_user_id, in one
+-- statement. A row deleted concurrently is reported as not found instead of
+-- being recreated, as an upsert would do. Returns the updated rows.
+
+CREATE OR REPLACE FUNCTION items_update_batch(p_user_id INTEGER, p_items JSONB)
+RETURNS SETOF items
+LANGUAGE sql
+AS $$
+  UPDATE items AS i
+     SET name = x.name,
+         description = x.description
+    FROM jsonb_to_recordset(p_items) AS x(id BIGINT, name TEXT, description TEXT)
+   WHERE i.id = x.id
+     AND i.user_id = p_user_id
+  RETURNING i.*;
+$$;
@@ -0,0 +1,45 @@
+-- Attempt counting and single-round-trip verification for the otps table
+-- Used by utils/otp_store.py when OTP_STORE=supabase. Run this before setting it;
+-- the default OTP_STORE=table works without it.
+
+ALTER TABLE otps ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+-- Lets the background sweeper delete expired codes without a full scan
+CREATE INDEX IF NOT EXISTS otps_expires_at_idx ON otps (expires_at);
+
+-- Checks a code and updates the row in one locked operation. Returns one of
+-- 'verified', 'mismatch', 'expired', 'locked' or 'missing'. Codes are compared
+-- through their digests so timing does not reveal a matching prefix.
+CREATE OR REPLACE FUNCTION otp_verify(p_email TEXT, p_code TEXT, p_max_attempts INTEGER, p_consume BOOLEAN DEFAULT TRUE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_otp otps%ROWTYPE;
+BEGIN
+  SELECT * INTO v_otp FROM otps WHERE email = p_email FOR UPDATE;
+  IF NOT FOUND THEN
+    RETURN 'missing';
+  END IF;
+
+  IF v_otp.expires_at < (NOW() AT TIME ZONE 'utc') THEN
+    DELETE FROM otps WHERE email = p_email;
+    RETURN 'expired';
+  END IF;
+
+  IF sha256(convert_to(v_otp.otp_code, 'UTF8')) = sha256(convert_to(COALESCE(p_code, ''), 'UTF8')) THEN
+    IF p_consume THEN
+      DELETE FROM otps WHERE email = p_email;
+    END IF;
+    RETURN 'verified';
+  END IF;
+
+  IF v_otp.attempts + 1 >= p_max_attempts THEN
+    DELETE FROM otps WHERE email = p_email;
+    RETURN 'locked';
+  END IF;
+
+  UPDATE otps SET attempts = attempts + 1 WHERE email = p_email;
+  RETURN 'mismatch';
+END;
+$$;
@@ -0,0 +1,74 @@
+-- Shared per-user version counters for ETags and /search index freshness
+-- Used by utils/etag.py when RESOURCE_VERSIONS=supabase (the default). The
+-- counters are bumped by statement-level triggers, in the same transaction as
+-- the write, so every instance sees a change as soon as it commits.
+
+CREATE TABLE IF NOT EXISTS resource_versions (
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  resource TEXT NOT NULL,
+  version BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, resource)
+);
+
+-- One bump per affected user per statement, so a batch write counts once
+CREATE OR REPLACE FUNCTION bump_resource_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    INSERT INTO resource_versions (user_id, resource, version)
+      SELECT DISTINCT user_id, TG_ARGV[0], 1 FROM old_rows WHERE user_id IS NOT NULL
+      ON CONFLICT (user_id, resource) DO UPDATE SET version = resource_versions.version + 1;
+  ELSE
+    INSERT INTO resource_versions (user_id, resource, version)
+      SELECT DISTINCT user_id, TG_ARGV[0], 1 FROM new_rows WHERE user_id IS NOT NULL
+      ON CONFLICT (user_id, resource) DO UPDATE SET version = resource_versions.version + 1;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS accounts_version_insert ON accounts;
+DROP TRIGGER IF EXISTS accounts_version_update ON accounts;
+DROP TRIGGER IF EXISTS accounts_version_delete ON accounts;
+CREATE TRIGGER accounts_version_insert AFTER INSERT ON accounts
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('accounts');
+CREATE TRIGGER accounts_version_update AFTER UPDATE ON accounts
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('accounts');
+CREATE TRIGGER accounts_version_delete AFTER DELETE ON accounts
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('accounts');
+
+DROP TRIGGER IF EXISTS items_version_insert ON items;
+DROP TRIGGER IF EXISTS items_version_update ON items;
+DROP TRIGGER IF EXISTS items_version_delete ON items;
+CREATE TRIGGER items_version_insert AFTER INSERT ON items
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('items');
+CREATE TRIGGER items_version_update AFTER UPDATE ON items
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('items');
+CREATE TRIGGER items_version_delete AFTER DELETE ON items
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION bump_resource_version('items');
+
+-- Profile reads: only changes the /user-info and /profile-picture responses
+-- show count, so logins (which rewrite users.token) keep cached copies valid
+CREATE OR REPLACE FUNCTION bump_user_versions()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF (OLD.firstname, OLD.middlename, OLD.lastname, OLD.email, OLD.profilepicture)
+     IS DISTINCT FROM (NEW.firstname, NEW.middlename, NEW.lastname, NEW.email, NEW.profilepicture) THEN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.id, 'user-info', 1)
+      ON CONFLICT (user_id, resource) DO UPDATE SET version = resource_versions.version + 1;
+  END IF;
+  IF OLD.profilepicture IS DISTINCT FROM NEW.profilepicture THEN
+    INSERT INTO resource_versions (user_id, resource, version) VALUES (NEW.id, 'profile-picture', 1)
+      ON CONFLICT (user_id, resource) DO UPDATE SET version = resource_versions.version + 1;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS users_version_update ON users;
+CREATE TRIGGER users_version_update AFTER UPDATE ON users
+  FOR EACH ROW EXECUTE FUNCTION bump_user_versions();
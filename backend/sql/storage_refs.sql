@@ -0,0 +1,79 @@
+-- Reference counts for content-addressed images in the 'images' bucket
+-- Uploads are stored as <folder>/<sha256>.<ext>; a blob is only removed from
+-- storage once the last account/user row pointing at it lets go.
+--
+-- Removing a blob is claim -> storage.remove -> finish. While a path is
+-- claimed (deleting_at set) storage_ref_acquire returns NULL, so an uploader
+-- waits instead of re-using or re-uploading a blob that is about to go. A
+-- claim left behind by a crashed worker lapses after 5 minutes.
+
+CREATE TABLE IF NOT EXISTS storage_refs (
+  path TEXT PRIMARY KEY,
+  refcount INTEGER NOT NULL DEFAULT 0,
+  deleting_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE storage_refs ADD COLUMN IF NOT EXISTS deleting_at TIMESTAMPTZ;
+
+-- Adds a reference and returns the new count (1 means the blob is new), or
+-- NULL while the path is claimed for deletion
+CREATE OR REPLACE FUNCTION storage_ref_acquire(p_path TEXT)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+  INSERT INTO storage_refs AS r (path, refcount)
+  VALUES (p_path, 1)
+  ON CONFLICT (path) DO UPDATE
+    SET refcount = r.refcount + 1,
+        deleting_at = NULL,
+        updated_at = NOW()
+    WHERE r.deleting_at IS NULL OR r.deleting_at < NOW() - INTERVAL '5 minutes'
+  RETURNING refcount;
+$$;
+
+-- Drops a reference and returns the remaining count, or NULL for untracked
+-- (pre content-addressing) paths. Rows reaching 0 are deleted.
+CREATE OR REPLACE FUNCTION storage_ref_release(p_path TEXT)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  remaining INTEGER;
+BEGIN
+  UPDATE storage_refs
+    SET refcount = refcount - 1,
+        updated_at = NOW()
+    WHERE path = p_path
+    RETURNING refcount INTO remaining;
+
+  IF remaining IS NOT NULL AND remaining <= 0 THEN
+    DELETE FROM storage_refs WHERE path = p_path;
+  END IF;
+
+  RETURN remaining;
+END;
+$$;
+
+-- Claims the paths that are still unreferenced and returns them. Paths that
+-- were re-acquired since their release are left out. Untracked (legacy)
+-- paths get a claim row too, so an acquire can't slip in underneath.
+CREATE OR REPLACE FUNCTION storage_ref_claim_deletes(p_paths TEXT[])
+RETURNS TABLE (path TEXT)
+LANGUAGE sql
+AS $$
+  INSERT INTO storage_refs AS r (path, refcount, deleting_at)
+  SELECT DISTINCT p, 0, NOW() FROM unnest(p_paths) AS p
+  ON CONFLICT (path) DO UPDATE
+    SET deleting_at = NOW()
+    WHERE r.refcount <= 0
+  RETURNING r.path;
+$$;
+
+-- Drops the claims once storage.remove has run (or failed; the next attempt claims again)
+CREATE OR REPLACE FUNCTION storage_ref_finish_deletes(p_paths TEXT[])
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  DELETE FROM storage_refs WHERE path = ANY(p_paths) AND refcount <= 0;
+$$;
@@ -0,0 +1,69 @@
+-- Change tracking for GET /sync
+-- Rows carry the id of the transaction that last wrote them (sync_xid),
+-- maintained by trigger; deletions are recorded in sync_tombstones by the
+-- account and item handlers (utils/sync_log.py). Needs Postgres 13+.
+--
+-- Transaction ids are assigned when a transaction starts writing, not when it
+-- commits, so a timestamp or sequence cursor can pass a row that commits
+-- late. Instead every /sync call reads sync_watermark() first: the oldest
+-- transaction still running. Everything below it has committed, so the next
+-- call re-reads from that watermark and a late commit is never skipped (rows
+-- near the watermark may be sent twice; clients apply them idempotently).
+
+ALTER TABLE accounts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE items ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+ALTER TABLE accounts ADD COLUMN IF NOT EXISTS sync_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+ALTER TABLE items ADD COLUMN IF NOT EXISTS sync_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+
+CREATE OR REPLACE FUNCTION sync_touch_row()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at = NOW();
+  NEW.sync_xid = pg_current_xact_id();
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS accounts_touch_updated_at ON accounts;
+CREATE TRIGGER accounts_touch_updated_at BEFORE INSERT OR UPDATE ON accounts
+  FOR EACH ROW EXECUTE FUNCTION sync_touch_row();
+
+DROP TRIGGER IF EXISTS items_touch_updated_at ON items;
+CREATE TRIGGER items_touch_updated_at BEFORE INSERT OR UPDATE ON items
+  FOR EACH ROW EXECUTE FUNCTION sync_touch_row();
+
+DROP FUNCTION IF EXISTS sync_touch_updated_at();
+DROP INDEX IF EXISTS accounts_user_updated_idx;
+DROP INDEX IF EXISTS items_user_updated_idx;
+CREATE INDEX IF NOT EXISTS accounts_user_sync_idx ON accounts (user_id, sync_xid, id);
+CREATE INDEX IF NOT EXISTS items_user_sync_idx ON items (user_id, sync_xid, id);
+
+-- One row per deleted account or item, read with the same watermark
+CREATE TABLE IF NOT EXISTS sync_tombstones (
+  id BIGSERIAL PRIMARY KEY,
+  user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  resource TEXT NOT NULL,
+  row_id TEXT NOT NULL,
+  sync_xid xid8 NOT NULL DEFAULT pg_current_xact_id(),
+  deleted_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE sync_tombstones ADD COLUMN IF NOT EXISTS sync_xid xid8 NOT NULL DEFAULT pg_current_xact_id();
+DROP INDEX IF EXISTS sync_tombstones_user_idx;
+CREATE INDEX IF NOT EXISTS sync_tombstones_user_sync_idx ON sync_tombstones (user_id, sync_xid, id);
+
+-- Oldest transaction id still in progress; every lower id has finished
+CREATE OR REPLACE FUNCTION sync_watermark()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint;
+$$;
+
+-- Tombstones only need to outlive the oldest cursor clients still hold;
+-- cursors older than SYNC_TOMBSTONE_DAYS are answered with a full resync.
+-- Schedule this (e.g. with pg_cron) to keep the table small:
+--   DELETE FROM sync_tombstones WHERE deleted_at < NOW() - INTERVAL '30 days';
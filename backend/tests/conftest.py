@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Build nothing that needs Supabase at import time
+os.environ.setdefault('LAZY_INIT', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
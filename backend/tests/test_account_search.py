@@ -0,0 +1,27 @@
+import re
+import pytest
+from controllers.account_controller import _search_pattern
+
+
+def unquote(pattern):
+    # What PostgREST hands Postgres after reading the double-quoted value
+    assert pattern.startswith('"') and pattern.endswith('"')
+    return re.sub(r'\\(.)', r'\1', pattern[1:-1])
+
+
+@pytest.mark.parametrize('term', ['50%', 'a_b', 'x*', 'a.b', '(c)', 'a|b', '[x]', '^$', 'back\\slash', 'say "hi"', 'a,b'])
+def test_term_matches_only_itself(term):
+    regex = re.compile(unquote(_search_pattern(term)), re.IGNORECASE)
+    assert regex.search(f'pre {term.upper()} post')
+    assert not regex.search(term.replace(term[-1], '#'))
+
+
+def test_wildcards_are_not_wildcards():
+    regex = re.compile(unquote(_search_pattern('a%_*')), re.IGNORECASE)
+    assert not regex.search('abcd')
+    assert regex.search('xa%_*y')
+
+
+def test_term_cannot_leave_the_quoted_value():
+    pattern = _search_pattern('x",site.neq.y')
+    assert pattern.count('"') - pattern.count('\\"') == 2
@@ -0,0 +1,73 @@
+import pytest
+from flask import Flask
+from controllers import auth_controller
+from utils.mailer import MailQueueFull
+from utils.otp_store import MemoryOtpStore, OtpService, MISSING
+
+
+class Users:
+    # Just enough of the Supabase query builder for the users lookups
+    def __init__(self, rows):
+        self.data = rows
+
+    def table(self, name):
+        return self
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        return self
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = MemoryOtpStore()
+    monkeypatch.setattr(auth_controller, 'otp_store', OtpService(store, sweep_interval=0))
+    return store
+
+
+def call(view, email):
+    with Flask(__name__).test_request_context(json={'email': email}):
+        response = view()
+    return response if isinstance(response, tuple) else (response, response.status_code)
+
+
+def full_queue(**kwargs):
+    raise MailQueueFull('Mail queue is full, try again later.')
+
+
+@pytest.mark.parametrize('view, users', [
+    (auth_controller.request_otp, []),
+    (auth_controller.request_password_reset_otp, [{'id': 1}])
+])
+def test_full_mail_queue_returns_503_and_drops_the_code(monkeypatch, store, view, users):
+    monkeypatch.setattr(auth_controller, 'supabase', Users(users))
+    monkeypatch.setattr(auth_controller, 'queue_mail', full_queue)
+    response, status = call(view, 'a@x.com')
+    assert status == 503
+    assert response.headers['Retry-After'] == str(auth_controller.MAIL_BUSY_RETRY_AFTER)
+    assert len(store) == 0
+    assert store.verify('a@x.com', '000000') == MISSING
+
+
+def test_other_mail_failures_drop_the_code(monkeypatch, store):
+    def broken(**kwargs):
+        raise OSError('SMTP down')
+    monkeypatch.setattr(auth_controller, 'supabase', Users([]))
+    monkeypatch.setattr(auth_controller, 'queue_mail', broken)
+    response, status = call(auth_controller.request_otp, 'a@x.com')
+    assert status == 500
+    assert len(store) == 0
+
+
+def test_queued_mail_keeps_the_code(monkeypatch, store):
+    sent = []
+    monkeypatch.setattr(auth_controller, 'supabase', Users([]))
+    monkeypatch.setattr(auth_controller, 'queue_mail', lambda **kwargs: sent.append(kwargs))
+    response, status = call(auth_controller.request_otp, 'a@x.com')
+    assert status == 200
+    assert len(sent) == 1 and len(store) == 1
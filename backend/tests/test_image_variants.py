@@ -0,0 +1,38 @@
+import io
+import pytest
+from PIL import Image
+from config import Config
+from utils import image_variants
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    uploaded = []
+    monkeypatch.setattr(Config, 'IMAGE_VARIANT_SIZES', [64])
+    monkeypatch.setattr(image_variants, 'upload_file_to_supabase', lambda data, path, bucket, content_type: uploaded.append(path) or {'error': None})
+    return uploaded
+
+
+def png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def test_variants_are_built_for_normal_images(uploads):
+    image_variants._build_variants(png(100, 80), 'accounts/a.png', 'images')
+    assert uploads == ['accounts/a.png.64.webp']
+
+
+def test_images_over_the_pixel_limit_get_no_variants(uploads, monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_MAX_PIXELS', 100 * 80 - 1)
+    image_variants._build_variants(png(100, 80), 'accounts/a.png', 'images')
+    assert uploads == []
+
+
+def test_decompression_bomb_warning_is_an_error(uploads, monkeypatch):
+    monkeypatch.setattr(Config, 'IMAGE_MAX_PIXELS', 10 ** 9)
+    # Past Pillow's limit but under twice it, where Pillow only warns
+    monkeypatch.setattr(Image, 'MAX_IMAGE_PIXELS', 100 * 80 - 1)
+    image_variants._build_variants(png(100, 80), 'accounts/a.png', 'images')
+    assert uploads == []
@@ -0,0 +1,100 @@
+import pytest
+from utils import otp_store as module
+from utils.otp_store import MemoryOtpStore, VERIFIED, MISMATCH, EXPIRED, LOCKED, MISSING
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, 'time', lambda: now[0])
+    return now
+
+
+def wrong(code):
+    return '000000' if code != '000000' else '111111'
+
+
+def test_issue_returns_six_digit_code(clock):
+    store = MemoryOtpStore()
+    code, _ = store.issue('a@x.com', 300)
+    assert len(code) == 6 and code.isdigit()
+
+
+def test_correct_code_verifies_once(clock):
+    store = MemoryOtpStore()
+    code, _ = store.issue('a@x.com', 300)
+    assert store.verify('a@x.com', code) == VERIFIED
+    assert store.verify('a@x.com', code) == MISSING
+
+
+def test_verify_without_consume_keeps_the_code(clock):
+    store = MemoryOtpStore()
+    code, _ = store.issue('a@x.com', 300)
+    assert store.verify('a@x.com', code, consume=False) == VERIFIED
+    assert store.verify('a@x.com', code) == VERIFIED
+
+
+def test_codes_are_not_stored_in_plain_text(clock):
+    store = MemoryOtpStore()
+    code, _ = store.issue('a@x.com', 300)
+    assert code not in repr(store._entries)
+
+
+def test_wrong_codes_lock_out_after_max_attempts(clock):
+    store = MemoryOtpStore(max_attempts=3)
+    code, _ = store.issue('a@x.com', 300)
+    assert store.verify('a@x.com', wrong(code)) == MISMATCH
+    assert store.verify('a@x.com', wrong(code)) == MISMATCH
+    assert store.verify('a@x.com', wrong(code)) == LOCKED
+    # The locked-out code is gone, even the right one no longer works
+    assert store.verify('a@x.com', code) == MISSING
+
+
+def test_reissue_resets_attempts(clock):
+    store = MemoryOtpStore(max_attempts=2)
+    code, _ = store.issue('a@x.com', 300)
+    store.verify('a@x.com', wrong(code))
+    code, _ = store.issue('a@x.com', 300)
+    assert store.verify('a@x.com', wrong(code)) == MISMATCH
+    assert store.verify('a@x.com', code) == VERIFIED
+
+
+def test_expired_code_is_rejected(clock):
+    store = MemoryOtpStore()
+    code, _ = store.issue('a@x.com', 300)
+    clock[0] += 300
+    assert store.verify('a@x.com', code) == EXPIRED
+    assert store.verify('a@x.com', code) == MISSING
+
+
+def test_sweep_removes_only_expired_codes(clock):
+    store = MemoryOtpStore(tick=1.0, slots=8)
+    store.issue('short@x.com', 5)
+    store.issue('long@x.com', 300)
+    clock[0] += 4
+    assert store.sweep() == 0
+    clock[0] += 2
+    assert store.sweep() == 1
+    assert len(store) == 1
+    assert store.verify('short@x.com', '123456') == MISSING
+
+
+def test_sweep_handles_ttls_longer_than_one_wheel_turn(clock):
+    store = MemoryOtpStore(tick=1.0, slots=8)
+    code, _ = store.issue('a@x.com', 20)
+    for _ in range(19):
+        clock[0] += 1
+        store.sweep()
+    assert store.verify('a@x.com', code, consume=False) == VERIFIED
+    clock[0] += 2
+    assert store.sweep() == 1
+    assert len(store) == 0
+
+
+def test_sweep_keeps_reissued_code_with_later_expiry(clock):
+    store = MemoryOtpStore(tick=1.0, slots=64)
+    store.issue('a@x.com', 5)
+    code, _ = store.issue('a@x.com', 30)
+    clock[0] += 6
+    assert store.sweep() == 0
+    assert store.verify('a@x.com', code) == VERIFIED
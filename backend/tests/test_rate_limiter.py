@@ -0,0 +1,106 @@
+import pytest
+from flask import Flask
+from utils import rate_limiter
+from utils.rate_limiter import MemoryStore, RateLimiter
+
+
+def test_window_allows_up_to_limit_then_denies_until_window_ends():
+    store = MemoryStore()
+    assert store.hit_window('k', 2, 10, now=100) == (True, 0)
+    assert store.hit_window('k', 2, 10, now=101) == (True, 0)
+    allowed, retry_after = store.hit_window('k', 2, 10, now=102)
+    assert not allowed
+    assert retry_after == pytest.approx(8)
+
+
+def test_window_weights_previous_window_by_overlap():
+    store = MemoryStore()
+    store.hit_window('k', 2, 10, now=100)
+    store.hit_window('k', 2, 10, now=101)
+    # 80% of the previous window still overlaps: 2 * 0.8 = 1.6 < 2
+    assert store.hit_window('k', 2, 10, now=112) == (True, 0)
+    allowed, retry_after = store.hit_window('k', 2, 10, now=112)
+    assert not allowed
+    # 2 * weight + 1 drops to the limit once half the previous window is gone (t=115)
+    assert retry_after == pytest.approx(3)
+
+
+def test_window_forgets_counts_older_than_one_window():
+    store = MemoryStore()
+    store.hit_window('k', 1, 10, now=100)
+    assert not store.hit_window('k', 1, 10, now=105)[0]
+    assert store.hit_window('k', 1, 10, now=125) == (True, 0)
+
+
+def test_window_keys_are_independent():
+    store = MemoryStore()
+    store.hit_window('a', 1, 10, now=100)
+    assert not store.hit_window('a', 1, 10, now=100)[0]
+    assert store.hit_window('b', 1, 10, now=100) == (True, 0)
+
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    store = MemoryStore()
+    assert store.take_token('k', 1, 2, now=0) == (True, 0)
+    assert store.take_token('k', 1, 2, now=0) == (True, 0)
+    allowed, retry_after = store.take_token('k', 1, 2, now=0)
+    assert not allowed
+    assert retry_after == pytest.approx(1)
+    allowed, retry_after = store.take_token('k', 1, 2, now=0.5)
+    assert not allowed
+    assert retry_after == pytest.approx(0.5)
+    assert store.take_token('k', 1, 2, now=1.0) == (True, 0)
+
+
+def test_bucket_never_refills_past_capacity():
+    store = MemoryStore()
+    store.take_token('k', 1, 2, now=0)
+    assert store.take_token('k', 1, 2, now=1000) == (True, 0)
+    assert store.take_token('k', 1, 2, now=1000) == (True, 0)
+    assert not store.take_token('k', 1, 2, now=1000)[0]
+
+
+def test_sweep_drops_expired_entries_only():
+    store = MemoryStore(shards=1, sweep_every=2)
+    store.hit_window('old', 5, 10, now=100)
+    store.hit_window('new', 5, 10, now=200)
+    entries = store.shards[0][0]
+    assert 'old' not in entries and 'new' in entries
+
+
+def test_refunds_give_back_one_hit_or_token():
+    store = MemoryStore()
+    store.hit_window('w', 1, 10, now=100)
+    store.refund_window('w', 10, now=101)
+    assert store.hit_window('w', 1, 10, now=102) == (True, 0)
+    store.take_token('b', 1, 1, now=0)
+    store.refund_token('b', 1)
+    assert store.take_token('b', 1, 1, now=0) == (True, 0)
+    store.refund_token('b', 1)
+    store.refund_token('b', 1)
+    assert store.take_token('b', 1, 1, now=0) == (True, 0)
+    assert not store.take_token('b', 1, 1, now=0)[0]
+
+
+def test_rejected_request_does_not_use_up_earlier_rules(monkeypatch):
+    monkeypatch.setattr(rate_limiter.time, 'time', lambda: 1000.0)
+    app = Flask(__name__)
+    limiter = RateLimiter(store=MemoryStore())
+    identity = {'ip': 'a', 'email': 'x@example.com'}
+
+    @app.route('/')
+    @limiter.limit('test', (lambda: identity['ip'], 3, 60), (lambda: identity['email'], 1, 60))
+    def view():
+        return 'ok'
+
+    client = app.test_client()
+    assert client.get('/').status_code == 200
+    # The per-email rule rejects these; the per-IP rule must not count them
+    assert client.get('/').status_code == 429
+    assert client.get('/').status_code == 429
+    identity['email'] = 'y@example.com'
+    assert client.get('/').status_code == 200
+    identity['email'] = 'z@example.com'
+    assert client.get('/').status_code == 200
+    identity['email'] = 'w@example.com'
+    assert client.get('/').status_code == 429
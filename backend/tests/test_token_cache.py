@@ -0,0 +1,75 @@
+from utils import token_cache as module
+from utils.token_cache import TokenCache
+
+
+def at(monkeypatch, now):
+    monkeypatch.setattr(module.time, 'time', lambda: now)
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache = TokenCache(ttl=60)
+    at(monkeypatch, 1000)
+    cache.put('t', {'id': 1})
+    at(monkeypatch, 1059)
+    assert cache.get('t') == {'id': 1}
+    at(monkeypatch, 1060)
+    assert cache.get('t') is None
+
+
+def test_expiry_is_capped_by_jwt_exp(monkeypatch):
+    cache = TokenCache(ttl=60)
+    at(monkeypatch, 1000)
+    cache.put('t', {'id': 1}, exp=1005)
+    at(monkeypatch, 1004)
+    assert cache.get('t') == {'id': 1}
+    at(monkeypatch, 1005)
+    assert cache.get('t') is None
+
+
+def test_already_expired_token_is_never_served(monkeypatch):
+    cache = TokenCache(ttl=60)
+    at(monkeypatch, 1000)
+    cache.put('t', {'id': 1}, exp=999)
+    assert cache.get('t') is None
+
+
+def test_get_returns_a_copy():
+    cache = TokenCache()
+    cache.put('t', {'id': 1})
+    cache.get('t')['id'] = 2
+    assert cache.get('t') == {'id': 1}
+
+
+def test_invalidate_user_by_id_drops_every_token_of_that_user():
+    cache = TokenCache()
+    cache.put('a1', {'id': 1, 'email': 'a@x.com'})
+    cache.put('a2', {'id': '1', 'email': 'a@x.com'})
+    cache.put('b', {'id': 2, 'email': 'b@x.com'})
+    cache.invalidate_user(user_id=1)
+    assert cache.get('a1') is None and cache.get('a2') is None
+    assert cache.get('b') == {'id': 2, 'email': 'b@x.com'}
+
+
+def test_invalidate_user_by_email():
+    cache = TokenCache()
+    cache.put('a', {'id': 1, 'email': 'a@x.com'})
+    cache.put('b', {'id': 2, 'email': 'b@x.com'})
+    cache.invalidate_user(email='a@x.com')
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TokenCache(max_size=2)
+    cache.put('a', {'id': 1})
+    cache.put('b', {'id': 2})
+    cache.get('a')
+    cache.put('c', {'id': 3})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = TokenCache(max_size=0)
+    cache.put('t', {'id': 1})
+    assert cache.get('t') is None
@@ -0,0 +1,82 @@
+from functools import wraps
+import logging
+from quart import request, jsonify, g, make_response
+from config import Config
+from utils.supabase_client import get_async_supabase
+from utils.token_cache import token_cache
+from utils.etag import make_etag, resource_versions
+from utils.lazy import lazy_import
+
+jwt = lazy_import('jwt')
+logger = logging.getLogger(__name__)
+
+# Quart versions of utils/decorators.py for the ASGI app; same responses
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token = None
+        auth_header = request.headers.get('Authorization')
+
+        if auth_header:
+            try:
+                token = auth_header.split(" ")[1]
+            except IndexError:
+                return jsonify({'success': False, 'message': 'Token format invalid'}), 401
+
+        if not token:
+            return jsonify({'success': False, 'message': 'Access token required.'}), 401
+
+        try:
+            payload = jwt.decode(token, Config.JWT_SECRET, algorithms=["HS256"])
+            user_id = payload['id']
+
+            cached_user = token_cache.get(token)
+            if cached_user is not None:
+                g.user = cached_user
+            else:
+                supabase = await get_async_supabase()
+                response = await supabase.table('users').select('id, email').eq('id', user_id).eq('token', token).execute()
+
+                if not response.data:
+                    return jsonify({'success': False, 'message': 'Invalid token. Please log in again.'}), 403
+
+                g.user = response.data[0]
+                token_cache.put(token, g.user, payload.get('exp'))
+
+        except jwt.ExpiredSignatureError:
+            return jsonify({'success': False, 'message': 'Token expired. Please log in again.'}), 403
+        except jwt.InvalidTokenError:
+            return jsonify({'success': False, 'message': 'Invalid token. Please log in again.'}), 403
+        except Exception as e:
+            logger.warning('Token verification error: %s', e)
+            return jsonify({'success': False, 'message': 'An error occurred during token validation.'}), 500
+
+        return await f(*args, **kwargs)
+
+    return decorated
+
+def conditional_get(resource):
+    def decorator(f):
+        @wraps(f)
+        async def decorated(*args, **kwargs):
+            versions = await resource_versions.get_many_async(await get_async_supabase(), g.user['id'], [resource])
+            if versions is None:
+                return await f(*args, **kwargs)
+            etag = make_etag(g.user['id'], resource, request.full_path, versions[resource])
+
+            if request.if_none_match.contains_weak(etag):
+                response = await make_response('', 304)
+            else:
+                response = await make_response(await f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+
+        return decorated
+
+    return decorator
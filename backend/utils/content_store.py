@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import hashlib
+import time
+from utils.supabase_client import supabase
+from utils.supabase_storage import upload_file_to_supabase
+from utils.image_variants import schedule_variants, storage_path
+from utils.storage_cleanup import storage_cleanup, remove_unreferenced, remove_unreferenced_async
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 64 * 1024
+# storage_ref_acquire returns NULL while a deletion of the same content is in
+# flight; wait up to ACQUIRE_ATTEMPTS * ACQUIRE_RETRY_DELAY seconds for it
+ACQUIRE_ATTEMPTS = 20
+ACQUIRE_RETRY_DELAY = 0.25
+
+
+class ContentBusy(Exception):
+    pass
+
+
+def content_path(upload, folder):
+    # accounts/<sha256>.<ext>: identical bytes always map to the same object
+    digest = hashlib.sha256()
+    upload.stream.seek(0)
+    for chunk in iter(lambda: upload.stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    upload.stream.seek(0)
+    return f'{folder}/{digest.hexdigest()}.{upload.extension}'
+
+
+def _acquire(path):
+    for attempt in range(ACQUIRE_ATTEMPTS):
+        refcount = supabase.rpc('storage_ref_acquire', {'p_path': path}).execute().data
+        if refcount is not None:
+            return refcount
+        time.sleep(ACQUIRE_RETRY_DELAY)
+    raise ContentBusy(f'{path} is still being deleted')
+
+
+async def _acquire_async(client, path):
+    for attempt in range(ACQUIRE_ATTEMPTS):
+        refcount = (await client.rpc('storage_ref_acquire', {'p_path': path}).execute()).data
+        if refcount is not None:
+            return refcount
+        await asyncio.sleep(ACQUIRE_RETRY_DELAY)
+    raise ContentBusy(f'{path} is still being deleted')
+
+
+def _release(path):
+    response = supabase.rpc('storage_ref_release', {'p_path': path}).execute()
+    return response.data
+
+
+def store_image(upload, folder, bucket_name='images'):
+    # Same result shape as upload_file_to_supabase. The bytes are only sent to
+    # storage when no other row references this content yet.
+    path = content_path(upload, folder)
+    try:
+        refcount = _acquire(path)
+    except Exception as e:
+        # An untracked blob could be deleted by another row's release while
+        # this one still points at it, so don't store it at all
+        logger.exception('Error acquiring storage reference for %s', path)
+        return {'publicUrl': None, 'error': e}
+    storage_cleanup.discard([path], bucket_name)
+
+    if refcount > 1:
+        public_url = supabase.storage.from_(bucket_name).get_public_url(path)
+        return {'publicUrl': public_url, 'error': None}
+
+    result = upload_file_to_supabase(upload.body(), path, bucket_name, upload.content_type)
+    if result['error']:
+        try:
+            _release(path)
+        except Exception as e:
+            logger.exception('Error releasing storage reference for %s', path)
+        return result
+
+    schedule_variants(upload, path, bucket_name)
+    return result
+
+
+def release_image(url, bucket_name='images'):
+    # Drops one reference to an image URL and deletes the blob and its variants
+    # once nothing points at it. Default and external images are ignored.
+    path = storage_path(url)
+    if path is None:
+        return
+
+    try:
+        remaining = _release(path)
+    except Exception as e:
+        # Leaking a blob is safer than deleting one that may still be in use
+        logger.exception('Error releasing storage reference for %s', path)
+        return
+
+    # Untracked (legacy) paths come back as None and are deleted as before
+    if remaining is None or remaining <= 0:
+        if Config.STORAGE_CLEANUP_ASYNC:
+            # Removed in a batch after the response instead of inside the request
+            storage_cleanup.enqueue([path], bucket_name)
+            return
+        result = remove_unreferenced([path], bucket_name)
+        if result['error']:
+            logger.error('Error deleting old file: %s', result['error'])
+
+
+# Coroutine versions for the ASGI app; `client` is the async Supabase client
+
+async def store_image_async(client, upload, folder, bucket_name='images'):
+    path = await asyncio.to_thread(content_path, upload, folder)
+    try:
+        refcount = await _acquire_async(client, path)
+    except Exception as e:
+        logger.exception('Error acquiring storage reference for %s', path)
+        return {'publicUrl': None, 'error': e}
+    storage_cleanup.discard([path], bucket_name)
+
+    bucket = client.storage.from_(bucket_name)
+    if refcount > 1:
+        return {'publicUrl': await bucket.get_public_url(path), 'error': None}
+
+    try:
+        await bucket.upload(path=path, file=upload.body(), file_options={'content-type': upload.content_type, 'upsert': 'true'})
+        result = {'publicUrl': await bucket.get_public_url(path), 'error': None}
+    except Exception as e:
+        try:
+            await client.rpc('storage_ref_release', {'p_path': path}).execute()
+        except Exception:
+            logger.exception('Error releasing storage reference for %s', path)
+        return {'publicUrl': None, 'error': e}
+
+    # Inline variant builds (IMAGE_VARIANTS_INLINE) must not block the event loop
+    await asyncio.to_thread(schedule_variants, upload, path, bucket_name)
+    return result
+
+
+async def release_image_async(client, url, bucket_name='images'):
+    path = storage_path(url)
+    if path is None:
+        return
+
+    try:
+        remaining = (await client.rpc('storage_ref_release', {'p_path': path}).execute()).data
+    except Exception as e:
+        logger.exception('Error releasing storage reference for %s', path)
+        return
+
+    if remaining is None or remaining <= 0:
+        if Config.STORAGE_CLEANUP_ASYNC:
+            storage_cleanup.enqueue([path], bucket_name)
+            return
+        result = await remove_unreferenced_async(client, [path], bucket_name)
+        if result['error']:
+            logger.error('Error deleting old file: %s', result['error'])
+
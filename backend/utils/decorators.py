@@ -1,8 +1,14 @@
 from functools import wraps
-from flask import request, jsonify, g
-import jwt
+from flask import request, jsonify, g, make_response
+import logging
 from config import Config
 from utils.supabase_client import supabase
+from utils.token_cache import token_cache
+from utils.etag import make_etag, resource_versions
+from utils.lazy import lazy_import
+
+jwt = lazy_import('jwt')  # PyJWT pulls in cryptography; defer it to the first token check
+logger = logging.getLogger(__name__)
 
 def token_required(f):
     @wraps(f)
@@ -22,23 +28,56 @@ def token_required(f):
         try:
             payload = jwt.decode(token, Config.JWT_SECRET, algorithms=["HS256"])
             user_id = payload['id']
-            
-            # Verify token in Supabase
-            response = supabase.table('users').select('id, email').eq('id', user_id).eq('token', token).execute()
-            
-            if not response.data or len(response.data) == 0:
-                 return jsonify({'success': False, 'message': 'Invalid token. Please log in again.'}), 403
-            
-            g.user = response.data[0]
+
+            cached_user = token_cache.get(token)
+            if cached_user is not None:
+                g.user = cached_user
+            else:
+                # Verify token in Supabase
+                response = supabase.table('users').select('id, email').eq('id', user_id).eq('token', token).execute()
+
+                if not response.data or len(response.data) == 0:
+                     return jsonify({'success': False, 'message': 'Invalid token. Please log in again.'}), 403
+
+                g.user = response.data[0]
+                token_cache.put(token, g.user, payload.get('exp'))
             
         except jwt.ExpiredSignatureError:
             return jsonify({'success': False, 'message': 'Token expired. Please log in again.'}), 403
         except jwt.InvalidTokenError:
             return jsonify({'success': False, 'message': 'Invalid token. Please log in again.'}), 403
         except Exception as e:
-            print(f"Token verification error: {e}")
+            logger.warning('Token verification error: %s', e)
             return jsonify({'success': False, 'message': 'An error occurred during token validation.'}), 500
             
         return f(*args, **kwargs)
     
     return decorated
+
+def conditional_get(resource):
+    # Weak ETag validation for per-user reads; must run inside token_required.
+    # A matching If-None-Match is answered with 304 before the view queries Supabase.
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            versions = resource_versions.get_many(g.user['id'], [resource])
+            if versions is None:
+                # Versions unavailable: serve the read without validation
+                return f(*args, **kwargs)
+            etag = make_etag(g.user['id'], resource, request.full_path, versions[resource])
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Authorization')
+            return response
+
+        return decorated
+
+    return decorator
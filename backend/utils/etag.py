@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import threading
+import uuid
+from config import Config
+from utils.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+# Per-process nonce so in-memory versions restarting at 0 never match ETags
+# issued by an earlier process
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class ResourceVersions:
+    # Per-user, per-resource counters bumped by mutation handlers and folded
+    # into the ETags of the matching read endpoints. Process memory only: with
+    # several instances or workers a mutation only bumps the one that handled
+    # it, so use this for a single process.
+
+    shared = False
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, user_id, resources):
+        return {resource: self._versions.get((str(user_id), resource), 0) for resource in resources}
+
+    async def get_many_async(self, client, user_id, resources):
+        return self.get_many(user_id, resources)
+
+    def bump(self, user_id, *resources):
+        with self._lock:
+            for resource in resources:
+                key = (str(user_id), resource)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+
+class SupabaseResourceVersions:
+    # Counters in the resource_versions table, bumped by triggers in the same
+    # transaction as each write (sql/resource_versions.sql), so every instance
+    # agrees. get_many returns None when they can't be read, and callers then
+    # skip validation rather than risk answering from stale state.
+
+    shared = True
+
+    def __init__(self):
+        self._warned = False
+
+    def _versions(self, rows, resources):
+        found = {row['resource']: row['version'] for row in rows}
+        return {resource: found.get(resource, 0) for resource in resources}
+
+    def _failed(self, error):
+        if not self._warned:
+            self._warned = True
+            logger.warning('Resource versions unavailable, ETags are off (run sql/resource_versions.sql): %s', error)
+        return None
+
+    def get_many(self, user_id, resources):
+        try:
+            response = (supabase.table('resource_versions').select('resource, version')
+                        .eq('user_id', user_id).in_('resource', list(resources)).execute())
+        except Exception as e:
+            return self._failed(e)
+        return self._versions(response.data, resources)
+
+    async def get_many_async(self, client, user_id, resources):
+        try:
+            response = await (client.table('resource_versions').select('resource, version')
+                              .eq('user_id', user_id).in_('resource', list(resources)).execute())
+        except Exception as e:
+            return self._failed(e)
+        return self._versions(response.data, resources)
+
+    def bump(self, user_id, *resources):
+        # The database already bumped them with the write
+        pass
+
+
+def create_versions(kind=None):
+    kind = (kind or Config.RESOURCE_VERSIONS).lower()
+    if kind == 'memory':
+        return ResourceVersions()
+    return SupabaseResourceVersions()
+
+
+resource_versions = create_versions()
+
+
+def make_etag(user_id, resource, request_path, version):
+    # Shared versions mean the same thing on every instance, so the boot nonce
+    # is only mixed into process-local ones
+    scope = 'shared' if resource_versions.shared else BOOT_ID
+    raw = f'{scope}:{user_id}:{resource}:{version}:{request_path}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
@@ -0,0 +1,97 @@
+import logging
+import io
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from utils.supabase_storage import upload_file_to_supabase
+from utils.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Pillow is optional: without it uploads work as before, minus variants. It is
+# only loaded once the first variant is built.
+Image = lazy_import('PIL.Image')
+ImageOps = lazy_import('PIL.ImageOps')
+
+STORAGE_MARKER = '/public/images/'
+DEFAULT_IMAGES = ('default.png', 'default-profile.png')
+
+_executor = None
+
+
+def enabled():
+    return Image is not None and bool(Config.IMAGE_VARIANT_SIZES)
+
+
+def variant_path(path, size):
+    # accounts/logo.png -> accounts/logo.png.64.webp, stored next to the original
+    return f'{path}.{size}.webp'
+
+
+def variant_paths(path):
+    return [variant_path(path, size) for size in Config.IMAGE_VARIANT_SIZES]
+
+
+def storage_path(url):
+    # Bucket-relative path of one of our uploaded images, or None for defaults and external URLs
+    if not url or 'supabase.co/storage' not in url:
+        return None
+    parts = url.split(STORAGE_MARKER)
+    if len(parts) < 2 or parts[1] in DEFAULT_IMAGES:
+        return None
+    return parts[1]
+
+
+def variant_urls(url):
+    if not enabled() or storage_path(url) is None:
+        return {}
+    return {str(size): variant_path(url, size) for size in Config.IMAGE_VARIANT_SIZES}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=Config.IMAGE_WORKERS, thread_name_prefix='image-variants')
+    return _executor
+
+
+def _render_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail((size, size))
+    buffer = io.BytesIO()
+    variant.save(buffer, 'WEBP', quality=Config.IMAGE_VARIANT_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def _build_variants(data, path, bucket_name):
+    # Pillow only warns about images past its own limit; treat that as fatal too
+    warnings.simplefilter('error', Image.DecompressionBombWarning)
+    try:
+        # Opening reads just the header, so the size is known before anything is decoded
+        with Image.open(io.BytesIO(data)) as source:
+            if source.width * source.height > Config.IMAGE_MAX_PIXELS:
+                logger.warning('Skipping variants for %s: %sx%s image is too large', path, source.width, source.height)
+                return
+            image = ImageOps.exif_transpose(source)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            for size in Config.IMAGE_VARIANT_SIZES:
+                result = upload_file_to_supabase(_render_variant(image, size), variant_path(path, size), bucket_name, 'image/webp')
+                if result['error']:
+                    logger.error('Error uploading %spx variant of %s: %s', size, path, result['error'])
+    except (Image.DecompressionBombWarning, Image.DecompressionBombError) as e:
+        logger.warning('Skipping variants for %s: %s', path, e)
+    except Exception as e:
+        logger.exception('Error building variants for %s', path)
+
+
+def schedule_variants(upload, path, bucket_name='images'):
+    # The upload's spool is closed with the request, so the worker gets its own copy
+    if not enabled():
+        return None
+    upload.stream.seek(0)
+    data = upload.stream.read()
+    if Config.IMAGE_VARIANTS_INLINE:
+        _build_variants(data, path, bucket_name)
+        return None
+    return _get_executor().submit(_build_variants, data, path, bucket_name)
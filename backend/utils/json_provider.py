@@ -0,0 +1,73 @@
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    # Optional: without it the stdlib encoder is used with the same output rules
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _default(o):
+    # Values Supabase rows and our own payloads may carry beyond plain JSON types
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def _stdlib_dumps(obj, **kwargs):
+    kwargs.setdefault('default', _default)
+    kwargs.setdefault('ensure_ascii', False)
+    kwargs.setdefault('separators', (',', ':'))
+    return json.dumps(obj, **kwargs)
+
+
+class FastJSONProvider(JSONProvider):
+    """Compact JSON via orjson when installed, stdlib json otherwise.
+
+    Dates and datetimes serialize as ISO 8601 and UUIDs as strings with either
+    backend. Keys keep insertion order and output is never indented.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode('utf-8')
+            except orjson.JSONEncodeError:
+                # e.g. integers beyond 64 bits; the stdlib path handles those
+                pass
+        return _stdlib_dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = None
+        if orjson is not None:
+            # Bytes straight into the response, skipping the str round trip
+            try:
+                body = orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+            except orjson.JSONEncodeError:
+                pass
+        if body is None:
+            body = f'{_stdlib_dumps(obj)}\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,45 @@
+import importlib
+import importlib.util
+import threading
+
+
+def lazy_import(name):
+    """Return a stand-in for module `name` that imports it on first attribute
+    read, or None when it is not installed."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        return None
+    if spec is None:
+        return None
+    # A plain import behind LazyObject's lock rather than importlib's
+    # LazyLoader, whose first access races between threads before 3.12
+    return LazyObject(lambda: importlib.import_module(name))
+
+
+class LazyObject:
+    # Stands in for an object that is expensive to build (e.g. the Supabase
+    # client) and builds it, once, on first attribute access.
+
+    def __init__(self, factory, available=lambda: True):
+        self._factory = factory
+        self._available = available
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self):
+        return self._instance is not None
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __bool__(self):
+        return bool(self._available())
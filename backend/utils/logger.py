@@ -0,0 +1,201 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, has_request_context, request
+from config import Config
+
+# Attributes every LogRecord carries; anything else was passed via extra= and
+# is emitted as a structured field
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+REDACTED = '[REDACTED]'
+SENSITIVE_KEYS = ('password', 'otp', 'token', 'secret', 'authorization', 'api_key', 'apikey')
+
+# Secrets that can end up inside free-form messages, e.g. from exception text
+SENSITIVE_PATTERNS = (
+    (re.compile(r'eyJ[\w-]+\.[\w-]+\.[\w-]+'), REDACTED),
+    (re.compile(r'(?i)(bearer\s+)\S+'), r'\1' + REDACTED),
+    (re.compile(r'(?i)\b(otp(?:[_ ]?code)?|password|pass|token|secret)(["\']?\s*[:=]\s*)("[^"]*"|\'[^\']*\'|[^\s,}]+)'), r'\1\2' + REDACTED),
+)
+
+
+def _is_sensitive(key):
+    key = key.lower()
+    return any(word in key for word in SENSITIVE_KEYS)
+
+
+def redact(value):
+    if isinstance(value, str):
+        for pattern, replacement in SENSITIVE_PATTERNS:
+            value = pattern.sub(replacement, value)
+        return value
+    if isinstance(value, dict):
+        return {k: REDACTED if _is_sensitive(str(k)) else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    return value
+
+
+def current_request_id():
+    if has_request_context():
+        return getattr(g, 'request_id', None)
+    return None
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request ID and drops sampled-out records before they are queued."""
+
+    def __init__(self, sample_rate=1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        # High-volume info events opt in with extra={'sampled': True}
+        if getattr(record, 'sampled', False) and record.levelno <= logging.INFO:
+            if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+                return False
+        if not hasattr(record, 'request_id'):
+            record.request_id = current_request_id()
+        return True
+
+
+class RedactingQueueHandler(QueueHandler):
+    """Renders and redacts records on the calling thread, then hands them to the
+    listener without ever blocking; records are dropped when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        message = redact(record.getMessage())
+        exc_text = None
+        if record.exc_info:
+            exc_text = redact(logging.Formatter().formatException(record.exc_info))
+        prepared = logging.makeLogRecord(redact(dict(vars(record))))
+        prepared.msg = message
+        prepared.message = message
+        prepared.args = None
+        prepared.exc_info = None
+        prepared.exc_text = exc_text
+        prepared.stack_info = None
+        return prepared
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['requestId'] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != 'sampled':
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s')
+
+    def format(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = None
+        return super().format(record)
+
+
+def parse_levels(spec):
+    # "controllers.auth_controller=DEBUG,utils.mailer=WARNING"
+    levels = {}
+    for part in (spec or '').split(','):
+        name, _, level = part.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class LogPipeline:
+    def __init__(self):
+        self.handler = None
+        self.listener = None
+
+    def start(self, level=None, levels=None, fmt=None, sample_rate=None, queue_size=None, stream=None):
+        if self.listener is not None:
+            return self
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if (fmt or Config.LOG_FORMAT) == 'json' else TextFormatter())
+
+        self.handler = RedactingQueueHandler(queue.Queue(queue_size or Config.LOG_QUEUE_SIZE))
+        self.handler.addFilter(ContextFilter(Config.LOG_SAMPLE_RATE if sample_rate is None else sample_rate))
+        self.listener = QueueListener(self.handler.queue, output, respect_handler_level=True)
+
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(level or Config.LOG_LEVEL)
+        for name, logger_level in (levels if levels is not None else parse_levels(Config.LOG_LEVELS)).items():
+            logging.getLogger(name).setLevel(logger_level)
+
+        self.listener.start()
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        # Flushes whatever is still queued before the process exits
+        if self.listener is not None:
+            self.listener.stop()
+            logging.getLogger().removeHandler(self.handler)
+            self.listener = None
+
+    def stats(self):
+        if self.handler is None:
+            return {'running': False}
+        return {
+            'running': self.listener is not None,
+            'queued': self.handler.queue.qsize(),
+            'dropped': self.handler.dropped
+        }
+
+
+log_pipeline = LogPipeline()
+
+
+def init_logging(app):
+    log_pipeline.start()
+
+    @app.before_request
+    def assign_request_id():
+        # Honour an upstream ID (e.g. from Vercel or a proxy) so logs can be joined
+        incoming = request.headers.get('X-Request-ID', '')
+        g.request_id = incoming[:64] if incoming else uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        request_id = current_request_id()
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
+
+    return log_pipeline
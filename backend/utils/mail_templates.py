@@ -0,0 +1,132 @@
+import os
+import re
+import html
+import threading
+from html.parser import HTMLParser
+from config import Config
+
+PLACEHOLDER = re.compile(r'\{\{\s*([A-Z0-9_]+)\s*\}\}')
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'frontend', 'templates')
+
+
+class _TextExtractor(HTMLParser):
+    # Turns an email template into its plain-text alternative, keeping
+    # {{PLACEHOLDERS}} intact so the text can be compiled like the HTML.
+    SKIP = {'head', 'style', 'script', 'title'}
+    BLOCK = {'p', 'div', 'br', 'h1', 'h2', 'h3', 'h4', 'li', 'ol', 'ul', 'tr', 'table'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag == 'li':
+            self.parts.append('\n- ')
+        elif tag in self.BLOCK:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self):
+        lines = (' '.join(line.split()) for line in ''.join(self.parts).splitlines())
+        text = '\n'.join(lines)
+        return re.sub(r'\n{3,}', '\n\n', text).strip()
+
+
+def html_to_text(source):
+    parser = _TextExtractor()
+    parser.feed(source)
+    parser.close()
+    return parser.text()
+
+
+class CompiledTemplate:
+    # A template pre-split into literal fragments and placeholder names, so
+    # rendering is a single join.
+
+    def __init__(self, source):
+        pieces = PLACEHOLDER.split(source)
+        self.literals = pieces[0::2]
+        self.names = pieces[1::2]
+
+    def render(self, context, escape=None):
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = str(context.get(name, ''))
+            out.append(escape(value) if escape else value)
+            out.append(literal)
+        return ''.join(out)
+
+
+class MailTemplateRegistry:
+    def __init__(self, directory=TEMPLATE_DIR, auto_reload=False):
+        self.directory = os.path.normpath(directory)
+        self.auto_reload = auto_reload
+        self._templates = {}
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def load(self):
+        with self._lock:
+            templates = {}
+            mtimes = {}
+            for file_name in sorted(os.listdir(self.directory)):
+                name, ext = os.path.splitext(file_name)
+                if ext != '.html':
+                    continue
+                path = os.path.join(self.directory, file_name)
+                templates[name] = self._compile(path)
+                mtimes[name] = os.path.getmtime(path)
+            self._templates = templates
+            self._mtimes = mtimes
+            self._loaded = True
+
+    def _compile(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        return CompiledTemplate(source), CompiledTemplate(html_to_text(source))
+
+    def _reload_if_changed(self, name):
+        path = os.path.join(self.directory, f'{name}.html')
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return
+        if mtime != self._mtimes.get(name):
+            with self._lock:
+                self._templates[name] = self._compile(path)
+                self._mtimes[name] = mtime
+
+    def names(self):
+        if not self._loaded:
+            self.load()
+        return sorted(self._templates)
+
+    def render(self, name, **context):
+        # Returns (html, text); context values are HTML-escaped in the HTML part only
+        if not self._loaded:
+            self.load()
+        elif self.auto_reload:
+            self._reload_if_changed(name)
+
+        try:
+            html_template, text_template = self._templates[name]
+        except KeyError:
+            raise KeyError(f'Unknown mail template: {name}')
+
+        return html_template.render(context, escape=html.escape), text_template.render(context)
+
+
+mail_templates = MailTemplateRegistry(auto_reload=Config.TEMPLATE_AUTO_RELOAD)
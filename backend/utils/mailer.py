@@ -1,15 +1,27 @@
+import logging
 import smtplib
+import threading
+import queue
+import random
+import time
+import atexit
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import os
+from config import Config
+from utils.metrics import observe_smtp
 
-def send_mail(to_email, subject, html_content, text_content):
-    sender_email = "darielganzon2003@gmail.com"
-    sender_password = "azfs mmtr jhxh tsyu" # Hardcoded as per original JS file
-    
+logger = logging.getLogger(__name__)
+
+
+class MailQueueFull(Exception):
+    pass
+
+
+def build_message(to_email, subject, html_content, text_content):
     message = MIMEMultipart("alternative")
     message["Subject"] = subject
-    message["From"] = f'"Leirad Noznag" <{sender_email}>'
+    message["From"] = f'"{Config.EMAIL_FROM_NAME}" <{Config.EMAIL_USER}>'
     message["To"] = to_email
 
     part1 = MIMEText(text_content, "plain")
@@ -17,14 +29,193 @@ def send_mail(to_email, subject, html_content, text_content):
 
     message.attach(part1)
     message.attach(part2)
+    return message
 
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
+
+class SmtpTransport:
+    # Keeps one authenticated SMTP session open and reuses it across sends.
+    # Not thread-safe: each dispatcher worker owns its own transport.
+
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=True, timeout=10):
+        self.host = host or Config.EMAIL_HOST
+        self.port = port or Config.EMAIL_PORT
+        self.username = Config.EMAIL_USER if username is None else username
+        self.password = Config.EMAIL_PASS if password is None else password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
             server.starttls()
-            server.login(sender_email, sender_password)
-            server.sendmail(sender_email, to_email, message.as_string())
-        print(f"Email sent successfully to {to_email}")
+        if self.username:
+            server.login(self.username, self.password)
+        self._server = server
+
+    def send(self, from_email, to_email, message_string):
+        if self._server is None:
+            self._connect()
+        try:
+            self._server.sendmail(from_email, to_email, message_string)
+        except smtplib.SMTPServerDisconnected:
+            # Session went stale between sends; reconnect once and retry
+            self.close()
+            self._connect()
+            self._server.sendmail(from_email, to_email, message_string)
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+
+class MailDispatcher:
+    # Bounded queue of outgoing mail drained by background worker threads.
+    # Failed sends are retried with exponential backoff and end up in
+    # `dead_letters` once `max_retries` is exhausted.
+
+    def __init__(self, transport_factory=SmtpTransport, workers=2, max_queue_size=100,
+                 max_retries=3, backoff_base=1.0, dead_letter_size=100):
+        self.transport_factory = transport_factory
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.dead_letters = deque(maxlen=dead_letter_size)
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f'mail-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, to_email, subject, html_content, text_content):
+        self.start()
+        job = {
+            'to': to_email,
+            'subject': subject,
+            'message': build_message(to_email, subject, html_content, text_content).as_string(),
+            'attempts': 0
+        }
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise MailQueueFull('Mail queue is full, try again later.')
+
+    def _run(self):
+        transport = self.transport_factory()
+        try:
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    self._queue.task_done()
+                    break
+                started = time.perf_counter()
+                try:
+                    transport.send(Config.EMAIL_USER, job['to'], job['message'])
+                    observe_smtp('sent', time.perf_counter() - started)
+                    self.sent += 1
+                    logger.info('Email sent', extra={'to': job['to']})
+                except Exception as e:
+                    observe_smtp('failed', time.perf_counter() - started)
+                    transport.close()
+                    self._retry_or_dead_letter(job, e)
+                finally:
+                    self._queue.task_done()
+        finally:
+            transport.close()
+
+    def _retry_or_dead_letter(self, job, error):
+        job['attempts'] += 1
+        if job['attempts'] > self.max_retries:
+            self.failed += 1
+            logger.error('Giving up on email to %s after %d attempts: %s', job['to'], job['attempts'], error)
+            self.dead_letters.append({
+                'to': job['to'],
+                'subject': job['subject'],
+                'attempts': job['attempts'],
+                'error': str(error),
+                'failedAt': time.time()
+            })
+            return
+
+        delay = self.backoff_base * (2 ** (job['attempts'] - 1))
+        delay += random.uniform(0, delay / 2)
+        logger.warning('Error sending email to %s (attempt %d), retrying in %.1fs: %s', job['to'], job['attempts'], delay, error)
+        timer = threading.Timer(delay, self._requeue, args=(job,))
+        timer.daemon = True
+        timer.start()
+
+    def _requeue(self, job):
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            self._retry_or_dead_letter(job, MailQueueFull('Mail queue is full.'))
+
+    def join(self):
+        self._queue.join()
+
+    def shutdown(self, timeout=5):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                # Workers are daemon threads; don't hang interpreter exit on a full queue
+                logger.warning('Mail queue still full at shutdown, %d emails not sent', self._queue.qsize())
+                break
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'deadLetters': len(self.dead_letters)
+        }
+
+
+dispatcher = MailDispatcher(
+    workers=Config.MAIL_WORKERS,
+    max_queue_size=Config.MAIL_QUEUE_SIZE,
+    max_retries=Config.MAIL_MAX_RETRIES
+)
+atexit.register(dispatcher.shutdown)
+
+
+def queue_mail(to_email, subject, html_content, text_content):
+    if not Config.MAIL_ASYNC:
+        return send_mail(to_email, subject, html_content, text_content)
+    dispatcher.enqueue(to_email, subject, html_content, text_content)
+    return True
+
+
+def send_mail(to_email, subject, html_content, text_content):
+    message = build_message(to_email, subject, html_content, text_content)
+    transport = SmtpTransport()
+    started = time.perf_counter()
+
+    try:
+        transport.send(Config.EMAIL_USER, to_email, message.as_string())
+        observe_smtp('sent', time.perf_counter() - started)
+        logger.info('Email sent', extra={'to': to_email})
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        observe_smtp('failed', time.perf_counter() - started)
+        logger.exception('Error sending email')
         raise e
+    finally:
+        transport.close()
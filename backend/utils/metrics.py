@@ -0,0 +1,132 @@
+import hmac
+import os
+import time
+from flask import request, g, has_request_context, Response, abort, jsonify
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from config import Config
+
+# Under gunicorn and similar pre-fork servers, set PROMETHEUS_MULTIPROC_DIR to
+# an empty directory so every worker writes its samples there and /metrics
+# aggregates them; call mark_process_dead(pid) from the server's child-exit hook.
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route.',
+    ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by route and status code.',
+    ['blueprint', 'endpoint', 'method', 'status']
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled.',
+    ['blueprint', 'endpoint'], multiprocess_mode='livesum'
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_supabase_seconds', 'Time each request spent waiting on Supabase.',
+    ['blueprint', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+SUPABASE_LATENCY = Histogram(
+    'supabase_call_duration_seconds', 'Supabase HTTP call latency by service and route.',
+    ['service', 'operation', 'endpoint'], buckets=LATENCY_BUCKETS
+)
+SUPABASE_CALLS = Counter(
+    'supabase_calls_total', 'Supabase HTTP calls by service, route and outcome.',
+    ['service', 'operation', 'endpoint', 'status']
+)
+SINGLE_FLIGHT = Counter(
+    'supabase_single_flight_total', 'PostgREST reads that ran (executed) or joined one in flight (coalesced).',
+    ['outcome']
+)
+BCRYPT_LATENCY = Histogram(
+    'bcrypt_duration_seconds', 'Password hashing latency, including pool queueing.',
+    ['operation'], buckets=LATENCY_BUCKETS
+)
+RATE_LIMITED = Counter(
+    'rate_limited_total', 'Requests rejected by the rate limiter (limited) or load shedding (shed).',
+    ['rule', 'reason']
+)
+SMTP_LATENCY = Histogram(
+    'smtp_send_duration_seconds', 'SMTP send latency.',
+    ['outcome'], buckets=LATENCY_BUCKETS
+)
+
+
+def _route_labels():
+    if not has_request_context():
+        return '', 'background'
+    endpoint = request.endpoint or 'unmatched'
+    return request.blueprint or '', endpoint
+
+
+def observe_supabase(service, operation, status, seconds):
+    blueprint, endpoint = _route_labels()
+    SUPABASE_LATENCY.labels(service, operation, endpoint).observe(seconds)
+    SUPABASE_CALLS.labels(service, operation, endpoint, str(status)).inc()
+    if has_request_context():
+        g.supabase_time = g.get('supabase_time', 0.0) + seconds
+
+
+def observe_single_flight(outcome):
+    SINGLE_FLIGHT.labels(outcome).inc()
+
+
+def observe_bcrypt(operation, seconds):
+    BCRYPT_LATENCY.labels(operation).observe(seconds)
+
+
+def observe_smtp(outcome, seconds):
+    SMTP_LATENCY.labels(outcome).observe(seconds)
+
+
+def observe_rate_limited(rule, reason):
+    RATE_LIMITED.labels(rule, reason).inc()
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_labels = _route_labels()
+    IN_FLIGHT.labels(*g.metrics_labels).inc()
+
+
+def _after_request(response):
+    started = g.get('metrics_started')
+    if started is not None:
+        blueprint, endpoint = g.metrics_labels
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(time.perf_counter() - started)
+        REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+        REQUEST_DB_TIME.labels(blueprint, endpoint).observe(g.get('supabase_time', 0.0))
+    return response
+
+
+def _teardown_request(exc):
+    labels = g.get('metrics_labels')
+    if labels is not None:
+        IN_FLIGHT.labels(*labels).dec()
+
+
+def metrics_view():
+    # Metrics name every route and its traffic, so never serve them unauthenticated
+    if not Config.METRICS_TOKEN:
+        abort(404)
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode('utf-8'), Config.METRICS_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'message': 'Unauthorized.'}), 401
+
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,226 @@
+import datetime
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
+from config import Config
+from utils.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+# verify() outcomes
+VERIFIED = 'verified'
+MISMATCH = 'mismatch'
+EXPIRED = 'expired'
+LOCKED = 'locked'
+MISSING = 'missing'
+
+
+def generate_code(digits=6):
+    return str(secrets.randbelow(10 ** digits)).zfill(digits)
+
+
+class SupabaseOtpStore:
+    # OTPs in the `otps` table, shared by every instance. Verification is a
+    # single RPC (sql/otp_store.sql) that compares, counts the attempt and
+    # deletes spent or expired codes atomically.
+
+    def __init__(self, max_attempts=5):
+        self.max_attempts = max_attempts
+
+    def issue(self, email, ttl):
+        code = generate_code()
+        expires_at = (datetime.datetime.utcnow() + datetime.timedelta(seconds=ttl)).isoformat()
+        supabase.table('otps').upsert({
+            'email': email,
+            'otp_code': code,
+            'expires_at': expires_at,
+            'attempts': 0
+        }, on_conflict='email').execute()
+        return code, expires_at
+
+    def verify(self, email, code, consume=True):
+        response = supabase.rpc('otp_verify', {
+            'p_email': email,
+            'p_code': str(code),
+            'p_max_attempts': self.max_attempts,
+            'p_consume': consume
+        }).execute()
+        return response.data or MISSING
+
+    def discard(self, email):
+        supabase.table('otps').delete().eq('email', email).execute()
+
+    def sweep(self):
+        # One statement removes every expired code
+        now = datetime.datetime.utcnow().isoformat()
+        response = supabase.table('otps').delete().lt('expires_at', now).execute()
+        return len(response.data or [])
+
+
+class TableOtpStore(SupabaseOtpStore):
+    # The `otps` table as created by sql/supabase_tables.sql, for databases
+    # that haven't run sql/otp_store.sql yet: a select and compare per check,
+    # without attempt counting.
+
+    def issue(self, email, ttl):
+        code = generate_code()
+        expires_at = (datetime.datetime.utcnow() + datetime.timedelta(seconds=ttl)).isoformat()
+        supabase.table('otps').upsert({
+            'email': email,
+            'otp_code': code,
+            'expires_at': expires_at
+        }, on_conflict='email').execute()
+        return code, expires_at
+
+    def verify(self, email, code, consume=True):
+        response = supabase.table('otps').select('otp_code, expires_at').eq('email', email).execute()
+        if not response.data:
+            return MISSING
+        stored = response.data[0]
+        expires_at = datetime.datetime.fromisoformat(stored['expires_at'].replace('Z', '+00:00')).replace(tzinfo=None)
+        if datetime.datetime.utcnow() > expires_at:
+            self.discard(email)
+            return EXPIRED
+        if not hmac.compare_digest(str(stored['otp_code']).encode('utf-8'), str(code).encode('utf-8')):
+            return MISMATCH
+        if consume:
+            self.discard(email)
+        return VERIFIED
+
+
+class MemoryOtpStore:
+    # Process-local OTPs for single-instance deployments and development.
+    # Codes are kept only as keyed digests. Expiry is tracked on a hashed
+    # timing wheel: `slots` buckets of `tick` seconds, so a sweep only looks at
+    # the buckets that came due instead of scanning every entry.
+
+    def __init__(self, max_attempts=5, tick=1.0, slots=512):
+        self.max_attempts = max_attempts
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self._entries = {}
+        self._key = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        self._cursor = self._tick_of(time.time())
+
+    def _tick_of(self, timestamp):
+        return int(timestamp // self.tick)
+
+    def _digest(self, code):
+        return hmac.new(self._key, str(code).encode('utf-8'), hashlib.sha256).digest()
+
+    def issue(self, email, ttl):
+        code = generate_code()
+        expires = time.time() + ttl
+        with self._lock:
+            self._entries[email] = {'digest': self._digest(code), 'expires': expires, 'attempts': 0}
+            self.slots[self._tick_of(expires) % len(self.slots)].add(email)
+        expires_at = datetime.datetime.utcfromtimestamp(expires).isoformat()
+        return code, expires_at
+
+    def verify(self, email, code, consume=True):
+        digest = self._digest(code)
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return MISSING
+            if entry['expires'] <= time.time():
+                del self._entries[email]
+                return EXPIRED
+            if hmac.compare_digest(entry['digest'], digest):
+                if consume:
+                    del self._entries[email]
+                return VERIFIED
+            entry['attempts'] += 1
+            if entry['attempts'] >= self.max_attempts:
+                del self._entries[email]
+                return LOCKED
+            return MISMATCH
+
+    def discard(self, email):
+        with self._lock:
+            self._entries.pop(email, None)
+
+    def sweep(self):
+        now = time.time()
+        removed = 0
+        with self._lock:
+            current = self._tick_of(now)
+            # Visit each slot that came due since the last sweep, at most one full turn
+            for tick in range(max(self._cursor, current - len(self.slots) + 1), current + 1):
+                slot = self.slots[tick % len(self.slots)]
+                for email in list(slot):
+                    entry = self._entries.get(email)
+                    if entry is None:
+                        slot.discard(email)
+                    elif entry['expires'] <= now:
+                        del self._entries[email]
+                        slot.discard(email)
+                        removed += 1
+                    elif self._tick_of(entry['expires']) % len(self.slots) != tick % len(self.slots):
+                        # Re-issued with a new expiry, which lives in another slot
+                        slot.discard(email)
+                    # Otherwise it is due on a later turn of the wheel
+            self._cursor = current + 1
+        return removed
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class OtpService:
+    # Front for the configured store that also runs the background sweeper,
+    # started on the first issued code so cold starts stay cheap.
+
+    def __init__(self, store, ttl=300, sweep_interval=60):
+        self.store = store
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._sweeper = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def issue(self, email):
+        self._ensure_sweeper()
+        return self.store.issue(email, self.ttl)
+
+    def verify(self, email, code, consume=True):
+        return self.store.verify(email, code, consume=consume)
+
+    def discard(self, email):
+        self.store.discard(email)
+
+    def _ensure_sweeper(self):
+        if self._sweeper is not None or self.sweep_interval <= 0:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name='otp-sweeper', daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stopped.wait(self.sweep_interval):
+            try:
+                removed = self.store.sweep()
+                if removed:
+                    logger.debug('Swept expired OTPs', extra={'removed': removed})
+            except Exception as e:
+                logger.warning('Error sweeping expired OTPs: %s', e)
+
+    def stop(self):
+        self._stopped.set()
+
+
+def create_store(kind=None):
+    kind = (kind or Config.OTP_STORE).lower()
+    if kind == 'memory':
+        return MemoryOtpStore(max_attempts=Config.OTP_MAX_ATTEMPTS)
+    if kind == 'table':
+        return TableOtpStore(max_attempts=Config.OTP_MAX_ATTEMPTS)
+    return SupabaseOtpStore(max_attempts=Config.OTP_MAX_ATTEMPTS)
+
+
+otp_store = OtpService(create_store(), ttl=Config.OTP_TTL, sweep_interval=Config.OTP_SWEEP_INTERVAL)
@@ -0,0 +1,146 @@
+import logging
+import base64
+import json
+from flask import request, current_app, stream_with_context, Response
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+NDJSON = 'application/x-ndjson'
+
+
+def encode_cursor(last_id):
+    raw = json.dumps({'id': last_id}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['id']
+    except Exception:
+        raise ValueError('Invalid cursor.')
+
+
+def parse_list_args(allowed_fields, default_fields, req=None):
+    # Reads limit/cursor/fields/stream from the query string. Returns None when
+    # none are present so callers keep their original unpaginated response.
+    # `req` defaults to Flask's request; the ASGI app passes Quart's.
+    req = req or request
+    args = req.args
+    wants_stream = args.get('stream') == 'ndjson' or NDJSON in req.headers.get('Accept', '')
+    if not wants_stream and not any(args.get(name) for name in ('limit', 'cursor', 'fields')):
+        return None
+
+    fields = default_fields
+    if args.get('fields'):
+        requested = [field.strip() for field in args.get('fields').split(',') if field.strip()]
+        unknown = [field for field in requested if field not in allowed_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}.")
+        # Keyset paging needs the id of every row
+        if 'id' not in requested:
+            requested.insert(0, 'id')
+        fields = ', '.join(requested)
+
+    limit = None
+    if args.get('limit') or args.get('cursor'):
+        try:
+            limit = int(args.get('limit') or Config.PAGE_DEFAULT_LIMIT)
+        except ValueError:
+            raise ValueError('Limit must be a number.')
+        if limit < 1:
+            raise ValueError('Limit must be at least 1.')
+        limit = min(limit, Config.PAGE_MAX_LIMIT)
+
+    after = decode_cursor(args.get('cursor')) if args.get('cursor') else None
+
+    return {'fields': fields, 'limit': limit, 'after': after, 'stream': wants_stream}
+
+
+def _keyset_query(build_query, fields, after, size):
+    query = build_query(fields).order('id')
+    if after is not None:
+        query = query.gt('id', after)
+    return query.limit(size)
+
+
+def fetch_page(build_query, page):
+    # Fetches one keyset page; build_query(fields) must return a fresh,
+    # user-scoped select. Returns (rows, next_cursor).
+    if page['limit'] is None:
+        return build_query(page['fields']).execute().data, None
+
+    rows = _keyset_query(build_query, page['fields'], page['after'], page['limit'] + 1).execute().data
+    if len(rows) > page['limit']:
+        rows = rows[:page['limit']]
+        return rows, encode_cursor(rows[-1]['id'])
+    return rows, None
+
+
+def stream_rows(build_query, page, transform=None):
+    # NDJSON response that pulls Supabase pages lazily as the client reads,
+    # so the full list is never held in memory.
+    page_size = page['limit'] or Config.STREAM_PAGE_SIZE
+    fields = page['fields']
+    dumps = current_app.json.dumps
+
+    def generate():
+        after = page['after']
+        sent = 0
+        while True:
+            size = page_size
+            if page['limit'] is not None:
+                size = min(size, page['limit'] - sent)
+                if size <= 0:
+                    break
+            try:
+                rows = _keyset_query(build_query, fields, after, size).execute().data
+            except Exception as e:
+                logger.exception('Error streaming rows')
+                yield dumps({'error': 'Error reading rows.'}) + '\n'
+                return
+            for row in rows:
+                yield dumps(transform(row) if transform else row) + '\n'
+            sent += len(rows)
+            if len(rows) < size:
+                break
+            after = rows[-1]['id']
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON)
+
+
+async def fetch_page_async(build_query, page):
+    if page['limit'] is None:
+        return (await build_query(page['fields']).execute()).data, None
+
+    rows = (await _keyset_query(build_query, page['fields'], page['after'], page['limit'] + 1).execute()).data
+    if len(rows) > page['limit']:
+        rows = rows[:page['limit']]
+        return rows, encode_cursor(rows[-1]['id'])
+    return rows, None
+
+
+async def stream_rows_async(build_query, page, dumps, transform=None):
+    # Async generator of NDJSON lines; the ASGI app wraps it in a response
+    page_size = page['limit'] or Config.STREAM_PAGE_SIZE
+    after = page['after']
+    sent = 0
+    while True:
+        size = page_size
+        if page['limit'] is not None:
+            size = min(size, page['limit'] - sent)
+            if size <= 0:
+                break
+        try:
+            rows = (await _keyset_query(build_query, page['fields'], after, size).execute()).data
+        except Exception as e:
+            logger.exception('Error streaming rows')
+            yield dumps({'error': 'Error reading rows.'}) + '\n'
+            return
+        for row in rows:
+            yield dumps(transform(row) if transform else row) + '\n'
+        sent += len(rows)
+        if len(rows) < size:
+            break
+        after = rows[-1]['id']
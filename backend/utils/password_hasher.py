@@ -0,0 +1,151 @@
+import logging
+import os
+import time
+import threading
+import bcrypt
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from config import Config
+from utils.metrics import observe_bcrypt
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_ROUNDS = 8
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def hash_rounds(hashed):
+    # "$2b$12$<salt+hash>" -> 12
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    # Runs bcrypt off the request thread on a worker pool. The cost factor is
+    # sized on first use so one hash takes roughly `target_ms`, unless `rounds`
+    # pins it explicitly.
+
+    def __init__(self, pool='process', workers=None, target_ms=250, min_rounds=12, max_rounds=14, rounds=None):
+        self.pool_kind = pool
+        self.workers = workers or os.cpu_count() or 1
+        self.target_ms = target_ms
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self._rounds = rounds
+        self._executor = None
+        self._lock = threading.Lock()
+        self._calibration_lock = threading.Lock()
+        self._pending = 0
+        self._latency = {
+            'hash': {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0},
+            'verify': {'count': 0, 'totalMs': 0.0, 'maxMs': 0.0}
+        }
+
+    @property
+    def rounds(self):
+        # Calibrated on first use (or by the warmup hook) to keep it off the cold-start path
+        if self._rounds is None:
+            with self._calibration_lock:
+                if self._rounds is None:
+                    self._rounds = self.calibrate()
+        return self._rounds
+
+    def calibrate(self):
+        # Each extra round doubles the work, so time a cheap hash and extrapolate
+        password = b'calibration-password'
+        elapsed = min(self._time_hash(password) for _ in range(3))
+        rounds = self.min_rounds
+        while rounds < self.max_rounds and elapsed * 2 ** (rounds + 1 - CALIBRATION_ROUNDS) * 1000 <= self.target_ms:
+            rounds += 1
+        return rounds
+
+    @staticmethod
+    def _time_hash(password):
+        started = time.perf_counter()
+        _hash(password, CALIBRATION_ROUNDS)
+        return time.perf_counter() - started
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._create_executor()
+        return self._executor
+
+    def _create_executor(self):
+        if self.pool_kind == 'process':
+            try:
+                executor = ProcessPoolExecutor(max_workers=self.workers)
+                # Surface missing multiprocessing support (e.g. no /dev/shm) now
+                executor.submit(int).result()
+                return executor
+            except (OSError, NotImplementedError, ImportError) as e:
+                logger.warning('Process pool unavailable for bcrypt, using threads: %s', e)
+        # bcrypt releases the GIL, so threads still keep it off the request thread
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+
+    def _run(self, kind, fn, *args):
+        with self._lock:
+            self._pending += 1
+        started = time.perf_counter()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            elapsed = time.perf_counter() - started
+            observe_bcrypt(kind, elapsed)
+            elapsed_ms = elapsed * 1000
+            with self._lock:
+                self._pending -= 1
+                stats = self._latency[kind]
+                stats['count'] += 1
+                stats['totalMs'] += elapsed_ms
+                stats['maxMs'] = max(stats['maxMs'], elapsed_ms)
+
+    def hash(self, password):
+        return self._run('hash', _hash, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password, hashed):
+        return self._run('verify', _check, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        # Upgrade-only: instances calibrate independently, and a slower one must
+        # not pull hashes down (or make logins bounce users between costs)
+        rounds = hash_rounds(hashed)
+        return rounds is None or rounds < self.rounds
+
+    def stats(self):
+        with self._lock:
+            latency = {}
+            for kind, stats in self._latency.items():
+                average = stats['totalMs'] / stats['count'] if stats['count'] else 0.0
+                latency[kind] = {'count': stats['count'], 'avgMs': round(average, 2), 'maxMs': round(stats['maxMs'], 2)}
+            return {
+                'rounds': self._rounds,
+                'pool': self.pool_kind,
+                'workers': self.workers,
+                'queueDepth': self._pending,
+                'latency': latency
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pool=Config.BCRYPT_POOL,
+    workers=Config.BCRYPT_WORKERS,
+    target_ms=Config.BCRYPT_TARGET_MS,
+    min_rounds=Config.BCRYPT_MIN_ROUNDS,
+    max_rounds=Config.BCRYPT_MAX_ROUNDS,
+    rounds=Config.BCRYPT_ROUNDS
+)
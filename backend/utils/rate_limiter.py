@@ -0,0 +1,327 @@
+import logging
+import math
+import threading
+import time
+import zlib
+from functools import wraps
+from flask import request, jsonify, g
+from config import Config
+from utils.metrics import observe_rate_limited
+from utils.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# Optional: only needed for a store shared across instances
+redis = lazy_import('redis')
+
+
+class MemoryStore:
+    # Per-process counters split across independently locked shards, so
+    # concurrent requests for different keys rarely contend on one lock.
+    # Expired entries are swept from a shard every `sweep_every` operations.
+
+    def __init__(self, shards=16, sweep_every=1000):
+        self.shards = [({}, threading.Lock()) for _ in range(shards)]
+        self.sweep_every = sweep_every
+        self._ops = [0] * shards
+
+    def _shard(self, key):
+        index = zlib.crc32(key.encode('utf-8')) % len(self.shards)
+        return index, self.shards[index]
+
+    def _maybe_sweep(self, index, entries, now):
+        self._ops[index] += 1
+        if self._ops[index] % self.sweep_every == 0:
+            for stale in [k for k, entry in entries.items() if entry[-1] <= now]:
+                del entries[stale]
+
+    def hit_window(self, key, limit, window, now=None):
+        # Sliding-window counter: the previous fixed window's count is weighted
+        # by how much of it still overlaps the sliding window
+        now = time.time() if now is None else now
+        index, (entries, lock) = self._shard(key)
+        current_start = now - now % window
+        with lock:
+            self._maybe_sweep(index, entries, now)
+            start, previous, current, _ = entries.get(key, (current_start, 0, 0, 0))
+            if start != current_start:
+                previous = current if start == current_start - window else 0
+                current = 0
+            weight = 1 - (now - current_start) / window
+            if previous * weight + current >= limit:
+                entries[key] = (current_start, previous, current, current_start + 2 * window)
+                if current >= limit:
+                    return False, current_start + window - now
+                # Wait until enough of the previous window has slid out
+                return False, current_start + window * (1 - (limit - current) / previous) - now
+            entries[key] = (current_start, previous, current + 1, current_start + 2 * window)
+            return True, 0
+
+    def take_token(self, key, rate, capacity, now=None):
+        # Token bucket: `capacity` burst, refilled at `rate` tokens per second
+        now = time.time() if now is None else now
+        index, (entries, lock) = self._shard(key)
+        with lock:
+            self._maybe_sweep(index, entries, now)
+            tokens, updated, _ = entries.get(key, (capacity, now, 0))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            expires = now + capacity / rate
+            if tokens < 1:
+                entries[key] = (tokens, now, expires)
+                return False, (1 - tokens) / rate
+            entries[key] = (tokens - 1, now, expires)
+            return True, 0
+
+    def refund_window(self, key, window, now=None):
+        # Give back a hit counted in the current window by hit_window
+        now = time.time() if now is None else now
+        index, (entries, lock) = self._shard(key)
+        with lock:
+            entry = entries.get(key)
+            if entry and entry[0] == now - now % window and entry[2] > 0:
+                start, previous, current, expires = entry
+                entries[key] = (start, previous, current - 1, expires)
+
+    def refund_token(self, key, capacity):
+        # Give back a token taken by take_token
+        index, (entries, lock) = self._shard(key)
+        with lock:
+            entry = entries.get(key)
+            if entry:
+                tokens, updated, expires = entry
+                entries[key] = (min(capacity, tokens + 1), updated, expires)
+
+    def clear(self):
+        for entries, lock in self.shards:
+            with lock:
+                entries.clear()
+
+
+class RedisStore:
+    # Shared counters for multi-instance deployments, implemented as Lua
+    # scripts so each check is a single atomic round trip.
+
+    WINDOW_SCRIPT = """
+    local current_start = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local limit = tonumber(ARGV[3])
+    local now = tonumber(ARGV[4])
+    local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (current_start - window)) or '0')
+    local current = tonumber(redis.call('GET', KEYS[1] .. ':' .. current_start) or '0')
+    local weight = 1 - (now - current_start) / window
+    if previous * weight + current >= limit then
+        return 0
+    end
+    local key = KEYS[1] .. ':' .. current_start
+    redis.call('INCR', key)
+    redis.call('PEXPIRE', key, math.ceil(window * 2000))
+    return 1
+    """
+
+    BUCKET_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - updated) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return {allowed, tostring(tokens)}
+    """
+
+    WINDOW_REFUND_SCRIPT = """
+    local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+    if current > 0 then
+        redis.call('DECR', KEYS[1])
+    end
+    """
+
+    BUCKET_REFUND_SCRIPT = """
+    local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+    if tokens then
+        redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(tonumber(ARGV[1]), tokens + 1)))
+    end
+    """
+
+    def __init__(self, url, prefix='ratelimit'):
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._window = self.client.register_script(self.WINDOW_SCRIPT)
+        self._bucket = self.client.register_script(self.BUCKET_SCRIPT)
+        self._window_refund = self.client.register_script(self.WINDOW_REFUND_SCRIPT)
+        self._bucket_refund = self.client.register_script(self.BUCKET_REFUND_SCRIPT)
+
+    def hit_window(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        current_start = int(now - now % window)
+        allowed = self._window(keys=[f'{self.prefix}:w:{key}'], args=[current_start, window, limit, now])
+        return (True, 0) if allowed else (False, current_start + window - now)
+
+    def take_token(self, key, rate, capacity, now=None):
+        now = time.time() if now is None else now
+        allowed, tokens = self._bucket(keys=[f'{self.prefix}:b:{key}'], args=[rate, capacity, now])
+        return (True, 0) if allowed else (False, (1 - float(tokens)) / rate)
+
+    def refund_window(self, key, window, now=None):
+        now = time.time() if now is None else now
+        current_start = int(now - now % window)
+        self._window_refund(keys=[f'{self.prefix}:w:{key}:{current_start}'])
+
+    def refund_token(self, key, capacity):
+        self._bucket_refund(keys=[f'{self.prefix}:b:{key}'], args=[capacity])
+
+    def clear(self):
+        for key in self.client.scan_iter(f'{self.prefix}:*'):
+            self.client.delete(key)
+
+
+def create_store(url=None):
+    url = url or Config.RATE_LIMIT_STORAGE_URL
+    if url and url.startswith(('redis://', 'rediss://')):
+        if redis is not None:
+            return RedisStore(url)
+        logger.warning('RATE_LIMIT_STORAGE_URL is set but redis is not installed; using per-process counters.')
+    return MemoryStore(shards=Config.RATE_LIMIT_SHARDS)
+
+
+# Key functions: each returns the identity to count against, or None to skip the rule
+
+def by_ip():
+    if Config.RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get('X-Forwarded-For', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.remote_addr or 'unknown'
+
+
+def by_email():
+    data = request.get_json(silent=True) or {}
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def by_user():
+    user = g.get('user')
+    return str(user['id']) if user else None
+
+
+class Rule:
+    def __init__(self, name, key_func, limit, per, algorithm='window'):
+        self.name = name
+        self.key_func = key_func
+        self.limit = limit
+        self.per = per
+        self.algorithm = algorithm
+
+    def check(self, store):
+        identity = self.key_func()
+        if identity is None:
+            return True, 0
+        key = f'{self.name}:{identity}'
+        if self.algorithm == 'bucket':
+            return store.take_token(key, self.limit / self.per, self.limit)
+        return store.hit_window(key, self.limit, self.per)
+
+    def refund(self, store):
+        # Undo a successful check whose request was rejected by a later rule
+        identity = self.key_func()
+        if identity is None:
+            return
+        key = f'{self.name}:{identity}'
+        if self.algorithm == 'bucket':
+            store.refund_token(key, self.limit)
+        else:
+            store.refund_window(key, self.per)
+
+
+class RateLimiter:
+    def __init__(self, store=None, max_in_flight=None, enabled=True):
+        self.store = store
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_store(self):
+        if self.store is None:
+            with self._lock:
+                if self.store is None:
+                    self.store = create_store()
+        return self.store
+
+    def _too_many(self, message, retry_after, status=429):
+        response = jsonify({'success': False, 'message': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    def _refund(self, store, rules):
+        for rule in rules:
+            try:
+                rule.refund(store)
+            except Exception as e:
+                logger.warning('Rate limit store error: %s', e)
+
+    def _acquire(self):
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def limit(self, name, *rules):
+        """Decorator applying `rules` (key_func, limit, per[, algorithm]) to a
+        view and shedding load once too many limited requests are in flight."""
+        rules = [Rule(f'{name}:{i}', *rule) for i, rule in enumerate(rules)]
+
+        def decorator(f):
+            @wraps(f)
+            def decorated(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+
+                store = self.get_store()
+                passed = []
+                for rule in rules:
+                    try:
+                        allowed, retry_after = rule.check(store)
+                    except Exception as e:
+                        # A broken shared store must not take the endpoint down with it
+                        logger.warning('Rate limit store error: %s', e)
+                        continue
+                    if not allowed:
+                        # A rejected request must not use up the rules it already passed
+                        self._refund(store, passed)
+                        observe_rate_limited(name, 'limited')
+                        logger.info('Rate limited', extra={'rule': rule.name, 'sampled': True})
+                        return self._too_many('Too many requests. Please try again later.', retry_after)
+                    passed.append(rule)
+
+                # Expensive endpoints (bcrypt, SMTP) share one in-flight budget
+                if not self._acquire():
+                    observe_rate_limited(name, 'shed')
+                    return self._too_many('Server is busy. Please try again shortly.', 1, status=503)
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    self._release()
+            return decorated
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            return {'inFlight': self._in_flight, 'maxInFlight': self.max_in_flight}
+
+
+rate_limiter = RateLimiter(max_in_flight=Config.LOAD_SHED_MAX_IN_FLIGHT, enabled=Config.RATE_LIMIT_ENABLED)
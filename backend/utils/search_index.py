@@ -0,0 +1,255 @@
+import heapq
+import math
+import re
+import sys
+import threading
+from collections import Counter, OrderedDict
+from config import Config
+from utils.etag import resource_versions
+from utils.supabase_client import supabase
+
+# Indexed columns per resource, with a weight applied to matches in each
+SEARCH_FIELDS = {
+    'accounts': {'site': 1.0, 'username': 0.8},
+    'items': {'name': 1.0, 'description': 0.5}
+}
+# Extra columns returned with each hit (never passwords)
+DISPLAY_FIELDS = {
+    'accounts': ('id', 'site', 'username', 'image'),
+    'items': ('id', 'name', 'description')
+}
+MIN_SCORE = 0.6
+TOKEN = re.compile(r'\w+')
+# Rough per-posting overhead (set entry + tuple reference) for the memory budget
+POSTING_BYTES = 80
+# PostgREST caps responses at 1000 rows by default
+LOAD_PAGE_SIZE = 1000
+
+
+def tokens(text):
+    return TOKEN.findall((text or '').casefold())
+
+
+def trigrams(text, prefix_only=False):
+    # Tokens are padded like pg_trgm ("  tok ") so short and prefix queries still
+    # produce grams; queries skip the trailing pad so "exa" matches "example"
+    grams = set()
+    for token in tokens(text):
+        padded = f'  {token}' if prefix_only else f'  {token} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class UserIndex:
+    # Trigram postings over one user's accounts and items.
+
+    def __init__(self):
+        self.docs = {}
+        self.postings = {}
+        self.versions = {}
+        self.lock = threading.Lock()
+        self.size = sys.getsizeof(self.docs) + sys.getsizeof(self.postings)
+
+    def add(self, resource, row):
+        key = (resource, str(row['id']))
+        self.remove(resource, row['id'])
+        # Stored casefolded, weighted, ready for the ranking pass
+        fields = [((row.get(name) or '').casefold(), weight) for name, weight in SEARCH_FIELDS[resource].items()]
+        grams = set()
+        for value, _ in fields:
+            grams |= trigrams(value)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+        display = {name: row.get(name) for name in DISPLAY_FIELDS[resource]}
+        cost = len(grams) * POSTING_BYTES + sum(len(str(value or '')) for value in display.values()) * 2 + 200
+        self.docs[key] = {'fields': fields, 'display': display, 'grams': grams, 'cost': cost}
+        self.size += cost
+
+    def remove(self, resource, row_id):
+        doc = self.docs.pop((resource, str(row_id)), None)
+        if doc is None:
+            return
+        key = (resource, str(row_id))
+        for gram in doc['grams']:
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+        self.size -= doc['cost']
+
+    def search(self, query, resources, limit):
+        query_grams = trigrams(query, prefix_only=True)
+        if not query_grams:
+            return []
+
+        # A document needs `required` of the query's grams, so it must appear in
+        # at least one of the rarest len - required + 1 postings; candidates come
+        # only from those, and the common grams are checked by set lookup
+        postings = sorted((self.postings.get(gram, set()) for gram in query_grams), key=len)
+        required = math.ceil(MIN_SCORE * len(postings))
+        candidates = set()
+        for keys in postings[:len(postings) - required + 1]:
+            candidates.update(key for key in keys if key[0] in resources)
+        hits = Counter()
+        for keys in postings:
+            hits.update(keys & candidates)
+
+        needle = query.casefold().strip()
+        ranked = []
+        for key, matched in hits.items():
+            score = matched / len(postings)
+            if score < MIN_SCORE:
+                continue
+            doc = self.docs[key]
+            # Whole-query prefix and substring matches outrank scattered grams
+            best_field = 0.0
+            for value, weight in doc['fields']:
+                if needle in value:
+                    bonus = weight if value.startswith(needle) else 0.6 * weight
+                    if bonus > best_field:
+                        best_field = bonus
+            ranked.append((score + best_field, key))
+
+        return [
+            dict(self.docs[key]['display'], type=key[0], score=round(score, 3))
+            for score, key in heapq.nlargest(limit, ranked, key=lambda hit: hit[0])
+        ]
+
+
+class SearchIndexes:
+    # Per-user indexes built on first query, kept current by the mutation
+    # handlers and evicted least-recently-used once their estimated size
+    # passes `memory_budget` bytes. Each index remembers the resource_versions
+    # it reflects, so a mutation that skipped apply() forces a rebuild rather
+    # than serving stale results.
+
+    def __init__(self, loader=None, memory_budget=64 * 1024 * 1024):
+        self.loader = loader
+        self.memory_budget = memory_budget
+        self._indexes = OrderedDict()
+        self._build_locks = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.evictions = 0
+
+    def _current_versions(self, user_id):
+        return resource_versions.get_many(user_id, SEARCH_FIELDS)
+
+    def _fresh(self, user_id, versions):
+        with self._lock:
+            index = self._indexes.get(str(user_id))
+            # Unknown versions (None) never match, so the index is rebuilt
+            if index is not None and versions is not None and index.versions == versions:
+                self._indexes.move_to_end(str(user_id))
+                return index
+        return None
+
+    def get(self, user_id):
+        # One read of the shared versions per call, hit or miss
+        versions = self._current_versions(user_id)
+        index = self._fresh(user_id, versions)
+        if index is not None:
+            return index
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(str(user_id), threading.Lock())
+        # One build per user at a time; concurrent first queries wait for it
+        with build_lock:
+            index = self._fresh(user_id, versions)
+            if index is not None:
+                return index
+            index = UserIndex()
+            for resource, rows in self.loader(user_id).items():
+                for row in rows:
+                    index.add(resource, row)
+            index.versions = versions
+            with self._lock:
+                self._indexes[str(user_id)] = index
+                self._indexes.move_to_end(str(user_id))
+                self.builds += 1
+                self._evict(keep=str(user_id))
+                self._build_locks.pop(str(user_id), None)
+            return index
+
+    def apply(self, user_id, resource, upserts=(), deletes=()):
+        """Fold a handler's changes into a loaded index; a no-op otherwise."""
+        if self.loaded(user_id):
+            current = (resource_versions.get_many(user_id, [resource]) or {}).get(resource)
+            self._fold(user_id, resource, current, upserts, deletes)
+
+    async def apply_async(self, client, user_id, resource, upserts=(), deletes=()):
+        if self.loaded(user_id):
+            current = (await resource_versions.get_many_async(client, user_id, [resource]) or {}).get(resource)
+            self._fold(user_id, resource, current, upserts, deletes)
+
+    def loaded(self, user_id):
+        with self._lock:
+            return str(user_id) in self._indexes
+
+    def _fold(self, user_id, resource, current, upserts, deletes):
+        # Sizes are summed by _evict under self._lock, so they change under it too
+        with self._lock:
+            index = self._indexes.get(str(user_id))
+            if index is None:
+                return
+            with index.lock:
+                for row_id in deletes:
+                    index.remove(resource, row_id)
+                for row in upserts:
+                    index.add(resource, row)
+                # Still fresh only if this write was the one bump since the index
+                # last synced; a write from another instance leaves it stale
+                if index.versions is not None:
+                    known = index.versions.get(resource)
+                    fresh = current is not None and known is not None and current == known + 1
+                    index.versions[resource] = current if fresh else None
+            self._evict(keep=str(user_id))
+
+    def search(self, user_id, query, resources=None, limit=20):
+        index = self.get(user_id)
+        with index.lock:
+            return index.search(query, set(resources or SEARCH_FIELDS), limit)
+
+    def _evict(self, keep=None):
+        total = sum(index.size for index in self._indexes.values())
+        for user_id in list(self._indexes):
+            if total <= self.memory_budget:
+                break
+            if user_id == keep:
+                continue
+            total -= self._indexes.pop(user_id).size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'users': len(self._indexes),
+                'bytes': sum(index.size for index in self._indexes.values()),
+                'memoryBudget': self.memory_budget,
+                'builds': self.builds,
+                'evictions': self.evictions
+            }
+
+
+def load_user_rows(user_id):
+    rows = {}
+    for resource in SEARCH_FIELDS:
+        columns = ', '.join(dict.fromkeys(DISPLAY_FIELDS[resource] + tuple(SEARCH_FIELDS[resource])))
+        rows[resource] = []
+        start = 0
+        while True:
+            response = (supabase.table(resource).select(columns).eq('user_id', user_id)
+                        .order('id').range(start, start + LOAD_PAGE_SIZE - 1).execute())
+            rows[resource].extend(response.data)
+            if len(response.data) < LOAD_PAGE_SIZE:
+                break
+            start += LOAD_PAGE_SIZE
+    return rows
+
+
+search_indexes = SearchIndexes(loader=load_user_rows, memory_budget=Config.SEARCH_INDEX_MEMORY)
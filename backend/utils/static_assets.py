@@ -0,0 +1,150 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import request, make_response, abort
+
+try:
+    import brotli
+except ImportError:
+    # Optional: without it assets are only precompressed with gzip
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+PAGES = ('index.html', 'dashboard.html')
+SKIP_DIRS = ('templates',)
+ASSET_REFERENCE = re.compile(r'''(\b(?:href|src)=["'])([^"'#?]+)(["'])''')
+
+# Startup-time compression: 9 is close to 11 in size at a fraction of the CPU
+BROTLI_QUALITY = 9
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+class Asset:
+    # One file held in memory with its precompressed encodings
+
+    def __init__(self, data, content_type):
+        self.content_type = content_type
+        self.etag = hashlib.sha256(data).hexdigest()[:16]
+        self.encodings = {'identity': data}
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                self.encodings['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+                if len(compressed) < len(data):
+                    self.encodings['br'] = compressed
+
+    def pick_encoding(self, accept_encoding):
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and accept_encoding[encoding]:
+                return encoding
+        return 'identity'
+
+
+class StaticAssets:
+    # Content-hashes the frontend tree, precompresses it and serves it from
+    # memory. Pages are rewritten to reference fingerprinted URLs under
+    # `prefix`, which can then be cached forever.
+
+    def __init__(self, root=None, prefix='/assets'):
+        self.root = root
+        self.prefix = prefix
+        self.assets = {}
+        self.fingerprinted = {}
+        self.urls = {}
+        self.pages = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        if self.root is None:
+            self.root = app.static_folder
+        app.add_url_rule(f'{self.prefix}/<path:filename>', 'fingerprinted_asset', self.serve_fingerprinted)
+
+    def build(self):
+        with self._lock:
+            if self._built:
+                return
+            for directory, dirs, files in os.walk(self.root):
+                dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+                for file_name in files:
+                    full_path = os.path.join(directory, file_name)
+                    relative = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                    if relative.endswith(('.md', '.html')):
+                        continue
+                    self._add_asset(full_path, relative)
+
+            for page in PAGES:
+                with open(os.path.join(self.root, page), 'r', encoding='utf-8') as f:
+                    html = ASSET_REFERENCE.sub(self._rewrite_reference, f.read())
+                self.pages[page] = Asset(html.encode('utf-8'), 'text/html; charset=utf-8')
+            self._built = True
+
+    def _add_asset(self, full_path, relative):
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        content_type = mimetypes.guess_type(relative)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+        asset = Asset(data, content_type)
+
+        name, ext = os.path.splitext(relative)
+        fingerprinted = f'{name}.{asset.etag[:12]}{ext}'
+        self.assets[relative] = asset
+        self.fingerprinted[fingerprinted] = asset
+        self.urls[relative] = f'{self.prefix}/{fingerprinted}'
+
+    def _rewrite_reference(self, match):
+        reference = match.group(2)
+        url = self.urls.get(reference.removeprefix('./'))
+        if url is None:
+            return match.group(0)
+        return f'{match.group(1)}{url}{match.group(3)}'
+
+    def url_for(self, relative):
+        self.build()
+        return self.urls.get(relative, f'/{relative}')
+
+    def _respond(self, asset, cache_control):
+        # Each encoding is a different representation, so it gets its own ETag
+        encoding = asset.pick_encoding(request.accept_encodings)
+        etag = asset.etag if encoding == 'identity' else f'{asset.etag}-{encoding}'
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(asset.encodings[encoding])
+            response.headers['Content-Type'] = asset.content_type
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = cache_control
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def serve_fingerprinted(self, filename):
+        self.build()
+        asset = self.fingerprinted.get(filename)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, IMMUTABLE)
+
+    def serve_file(self, relative, cache_control=REVALIDATE):
+        # Non-fingerprinted path (e.g. /images/default.png); None when unknown
+        self.build()
+        asset = self.assets.get(relative)
+        if asset is None:
+            return None
+        return self._respond(asset, cache_control)
+
+    def serve_page(self, page):
+        self.build()
+        return self._respond(self.pages[page], REVALIDATE)
+
+
+static_assets = StaticAssets()
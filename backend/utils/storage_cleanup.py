@@ -0,0 +1,241 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from config import Config
+from utils.supabase_client import supabase
+from utils.supabase_storage import delete_file_from_supabase
+from utils.image_variants import variant_paths
+
+logger = logging.getLogger(__name__)
+
+
+def _claimed(rows):
+    return [row['path'] for row in rows or []]
+
+
+def _with_variants(paths):
+    return [name for path in paths for name in (path, *variant_paths(path))]
+
+
+def remove_unreferenced(paths, bucket_name='images'):
+    """Delete the blobs at `paths`, with their variants, that nothing references
+    any more. The storage_ref_claim_deletes RPC (sql/storage_refs.sql) decides
+    which ones in the same statement that locks them against new references;
+    a path re-acquired since it was released is left alone."""
+    try:
+        claimed = _claimed(supabase.rpc('storage_ref_claim_deletes', {'p_paths': list(paths)}).execute().data)
+    except Exception as e:
+        return {'error': e}
+    if not claimed:
+        return {'error': None}
+    result = delete_file_from_supabase(_with_variants(claimed), bucket_name)
+    try:
+        supabase.rpc('storage_ref_finish_deletes', {'p_paths': claimed}).execute()
+    except Exception as e:
+        # The claims lapse on their own; until then re-uploads of these paths wait
+        logger.warning('Error finishing storage deletions: %s', e)
+    return result
+
+
+async def remove_unreferenced_async(client, paths, bucket_name='images'):
+    try:
+        claimed = _claimed((await client.rpc('storage_ref_claim_deletes', {'p_paths': list(paths)}).execute()).data)
+    except Exception as e:
+        return {'error': e}
+    if not claimed:
+        return {'error': None}
+    try:
+        await client.storage.from_(bucket_name).remove(_with_variants(claimed))
+        result = {'error': None}
+    except Exception as e:
+        result = {'error': e}
+    try:
+        await client.rpc('storage_ref_finish_deletes', {'p_paths': claimed}).execute()
+    except Exception as e:
+        logger.warning('Error finishing storage deletions: %s', e)
+    return result
+
+
+class StorageCleanupQueue:
+    # Storage deletions deferred until after the response. Paths are coalesced
+    # per bucket and handed to `remover` once per batch, when `batch_size`
+    # paths are waiting or every `flush_interval` seconds. The remover re-checks
+    # each path (remove_unreferenced), so a path queued here is only a
+    # candidate. Failed batches are retried with backoff. What is still pending
+    # at shutdown is appended to `spill_path` as a best effort for long-running
+    # hosts with a persistent disk; a lost spill only leaks blobs.
+
+    def __init__(self, remover, batch_size=100, flush_interval=2.0, max_retries=5, backoff_base=1.0, spill_path=None):
+        self.remover = remover
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.spill_path = spill_path
+        # (bucket, path) -> {'attempts': n, 'due': timestamp}
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.removed = 0
+        self.batches = 0
+        self.failed = 0
+
+    def enqueue(self, paths, bucket_name='images'):
+        self.start()
+        with self._cond:
+            for path in paths:
+                self._pending.setdefault((bucket_name, path), {'attempts': 0, 'due': 0.0})
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def discard(self, paths, bucket_name='images'):
+        # An upload that re-acquired the same content must not lose it to a
+        # deletion queued before it
+        with self._cond:
+            for path in paths:
+                self._pending.pop((bucket_name, path), None)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopped = False
+            self._recover()
+            self._thread = threading.Thread(target=self._run, name='storage-cleanup', daemon=True)
+            self._thread.start()
+
+    def resume(self):
+        # Picks up a previous process's spill file without waiting for the next
+        # enqueue; replayed paths go through the remover's reference check too
+        if self.spill_path and os.path.exists(self.spill_path):
+            self.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and not self._ready():
+                    self._cond.wait(self.flush_interval)
+                if self._stopped:
+                    return
+            self.flush()
+
+    def _ready(self):
+        now = time.time()
+        return sum(1 for entry in self._pending.values() if entry['due'] <= now) >= self.batch_size
+
+    def _take_due(self):
+        now = time.time()
+        batches = {}
+        with self._cond:
+            for key, entry in list(self._pending.items()):
+                if entry['due'] > now:
+                    continue
+                bucket_name, path = key
+                batch = batches.setdefault(bucket_name, [])
+                if len(batch) < self.batch_size:
+                    batch.append((path, self._pending.pop(key)))
+        return batches
+
+    def flush(self):
+        """Remove every path that is due, one storage call per bucket batch."""
+        while True:
+            batches = self._take_due()
+            if not batches:
+                return
+            for bucket_name, batch in batches.items():
+                self._remove(bucket_name, batch)
+            if all(len(batch) < self.batch_size for batch in batches.values()):
+                return
+
+    def _remove(self, bucket_name, batch):
+        paths = [path for path, _ in batch]
+        result = self.remover(paths, bucket_name)
+        if not result['error']:
+            self.removed += len(paths)
+            self.batches += 1
+            return
+
+        retry = []
+        for path, entry in batch:
+            entry['attempts'] += 1
+            if entry['attempts'] > self.max_retries:
+                self.failed += 1
+                continue
+            entry['due'] = time.time() + self.backoff_base * (2 ** (entry['attempts'] - 1))
+            retry.append((path, entry))
+        logger.warning('Error removing %d storage objects from %s (%d will be retried): %s',
+                       len(paths), bucket_name, len(retry), result['error'])
+        if len(retry) < len(batch):
+            logger.error('Giving up on %d storage objects in %s', len(batch) - len(retry), bucket_name)
+        with self._cond:
+            for path, entry in retry:
+                self._pending.setdefault((bucket_name, path), entry)
+
+    def _recover(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        try:
+            with open(self.spill_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._pending.setdefault((entry['bucket'], entry['path']), {'attempts': 0, 'due': 0.0})
+            os.remove(self.spill_path)
+            logger.info('Recovered pending storage deletions', extra={'pending': len(self._pending)})
+        except (OSError, ValueError, KeyError) as e:
+            logger.error('Error reading storage cleanup spill file %s: %s', self.spill_path, e)
+
+    def _spill(self):
+        with self._cond:
+            pending = list(self._pending)
+        if not pending or not self.spill_path:
+            return
+        try:
+            # Appended, so a spill left by another worker process is kept too
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for bucket_name, path in pending:
+                    f.write(json.dumps({'bucket': bucket_name, 'path': path}) + '\n')
+            logger.info('Spilled pending storage deletions', extra={'pending': len(pending)})
+        except OSError as e:
+            logger.error('Error writing storage cleanup spill file %s: %s', self.spill_path, e)
+
+    def shutdown(self, timeout=5):
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+            self._cond.notify()
+        if thread is None:
+            return
+        thread.join(timeout)
+        # One last attempt for whatever is due; the rest waits for the next process
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning('Error flushing storage deletions at shutdown: %s', e)
+        self._spill()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'removed': self.removed,
+            'batches': self.batches,
+            'failed': self.failed
+        }
+
+
+storage_cleanup = StorageCleanupQueue(
+    remove_unreferenced,
+    batch_size=Config.STORAGE_CLEANUP_BATCH_SIZE,
+    flush_interval=Config.STORAGE_CLEANUP_INTERVAL,
+    max_retries=Config.STORAGE_CLEANUP_MAX_RETRIES,
+    spill_path=Config.STORAGE_CLEANUP_SPILL_PATH
+)
+atexit.register(storage_cleanup.shutdown)
@@ -1,14 +1,76 @@
-import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import asyncio
+import logging
+from config import Config
+from utils.lazy import LazyObject
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-url: str = os.environ.get("SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_KEY")
 
-if not url or not key:
-    print("Warning: SUPABASE_URL or SUPABASE_KEY not found in environment variables.")
-    supabase = None
-else:
-    supabase: Client = create_client(url, key)
+def create_supabase_client(url, key):
+    # The SDK (postgrest, storage3, realtime, auth) and httpx take ~0.7 s to
+    # import, so they are only loaded when a client is actually built
+    import httpx
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    from utils.supabase_transport import transport, client_timeout
+
+    # Every client built here shares `transport`, and with it one connection pool
+    http_client = httpx.Client(
+        transport=transport,
+        timeout=client_timeout(Config.SUPABASE_READ_TIMEOUT, Config.SUPABASE_WRITE_TIMEOUT),
+        follow_redirects=True
+    )
+    return create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+
+
+async def create_async_supabase_client(url, key):
+    # Async twin of create_supabase_client for the ASGI app (asgi.py)
+    import httpx
+    from supabase import acreate_client, AsyncClientOptions
+    from utils.supabase_transport import create_async_transport, client_timeout
+
+    http_client = httpx.AsyncClient(
+        transport=create_async_transport(),
+        timeout=client_timeout(Config.SUPABASE_READ_TIMEOUT, Config.SUPABASE_WRITE_TIMEOUT),
+        follow_redirects=True
+    )
+    return await acreate_client(url, key, options=AsyncClientOptions(httpx_client=http_client))
+
+
+_async_clients = {}
+
+
+async def get_async_supabase():
+    # One client (and connection pool) per event loop, built once on first use
+    loop = asyncio.get_running_loop()
+    build = _async_clients.get(loop)
+    if build is None:
+        if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+            raise RuntimeError('Supabase is not configured: set SUPABASE_URL and SUPABASE_KEY.')
+        build = _async_clients[loop] = loop.create_task(create_async_supabase_client(Config.SUPABASE_URL, Config.SUPABASE_KEY))
+    try:
+        return await build
+    except Exception:
+        # Let the next request try again
+        if _async_clients.get(loop) is build:
+            del _async_clients[loop]
+        raise
+
+
+def pool_stats():
+    from utils.supabase_transport import transport
+    return transport.stats()
+
+
+def _build_client():
+    if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+        raise RuntimeError('Supabase is not configured: set SUPABASE_URL and SUPABASE_KEY.')
+    return create_supabase_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+
+
+if not Config.SUPABASE_URL or not Config.SUPABASE_KEY:
+    logger.warning('SUPABASE_URL or SUPABASE_KEY not found in environment variables.')
+
+# Built on first use rather than at import, so cold starts that never reach the
+# database (static pages, 401s, /metrics) skip it entirely
+supabase = LazyObject(_build_client, available=lambda: bool(Config.SUPABASE_URL and Config.SUPABASE_KEY))
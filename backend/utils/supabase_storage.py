@@ -1,13 +1,13 @@
 from utils.supabase_client import supabase
 
-def upload_file_to_supabase(file_buffer, file_name, bucket_name='images'):
+def upload_file_to_supabase(file_buffer, file_name, bucket_name='images', content_type='image/jpeg'):
     try:
         # Supabase Storage upload
-        # file_buffer should be bytes
+        # file_buffer is bytes or a binary file reader, which is sent in chunks
         response = supabase.storage.from_(bucket_name).upload(
             path=file_name,
             file=file_buffer,
-            file_options={"content-type": "image/jpeg", "upsert": "true"} # Adjust content-type if needed or detect it
+            file_options={"content-type": content_type, "upsert": "true"}
         )
         
         # Get public URL
@@ -19,8 +19,10 @@ def upload_file_to_supabase(file_buffer, file_name, bucket_name='images'):
         return {'publicUrl': None, 'error': e}
 
 def delete_file_from_supabase(file_path, bucket_name='images'):
+    # file_path may be a single path or a list of paths removed in one call
+    paths = file_path if isinstance(file_path, list) else [file_path]
     try:
-        response = supabase.storage.from_(bucket_name).remove([file_path])
+        response = supabase.storage.from_(bucket_name).remove(paths)
         return {'error': None}
     except Exception as e:
         return {'error': e}
@@ -0,0 +1,292 @@
+import asyncio
+import random
+import threading
+import time
+import httpx
+from config import Config
+from utils.metrics import observe_supabase, observe_single_flight
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+# PostgREST already retries its own 503/520 responses
+RETRY_STATUSES = (502, 504)
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+# Request headers that change what PostgREST returns for the same URL
+VARYING_HEADERS = ('authorization', 'apikey', 'accept', 'accept-profile', 'prefer', 'range', 'range-unit')
+
+
+class PooledTransport(httpx.BaseTransport):
+    # One keep-alive connection pool shared by the PostgREST and Storage
+    # clients. Applies per-operation timeouts, retries idempotent requests with
+    # jittered backoff and counts pool usage.
+
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_expiry=30.0, http2=True,
+                 retries=2, backoff=0.2, timeouts=None, transport=None):
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.timeouts = timeouts or {}
+        self._transport = transport or httpx.HTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            )
+        )
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'inFlight': 0, 'maxInFlight': 0, 'waits': 0, 'timeouts': 0, 'poolTimeouts': 0, 'retries': 0, 'errors': 0}
+
+    @staticmethod
+    def operation(request):
+        path = request.url.path
+        if '/storage/v1/' in path:
+            return 'storage'
+        if request.method in IDEMPOTENT_METHODS:
+            return 'read'
+        return 'write'
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _enter(self):
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['inFlight'] += 1
+            # More callers than connections means this one queues for a slot
+            if self._stats['inFlight'] > self.max_connections:
+                self._stats['waits'] += 1
+            self._stats['maxInFlight'] = max(self._stats['maxInFlight'], self._stats['inFlight'])
+
+    def _delay(self, attempt):
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def handle_request(self, request):
+        timeout = self.timeouts.get(self.operation(request))
+        if timeout is not None:
+            request.extensions['timeout'] = timeout.as_dict()
+
+        retryable = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        status = 'error'
+        started = time.perf_counter()
+        self._enter()
+        try:
+            while True:
+                try:
+                    response = self._transport.handle_request(request)
+                except httpx.PoolTimeout:
+                    self._count('poolTimeouts')
+                    raise
+                except RETRY_EXCEPTIONS as e:
+                    if isinstance(e, httpx.TimeoutException):
+                        self._count('timeouts')
+                    if not retryable or attempt >= self.retries:
+                        self._count('errors')
+                        raise
+                else:
+                    if not (retryable and response.status_code in RETRY_STATUSES and attempt < self.retries):
+                        status = response.status_code
+                        return response
+                    response.close()
+
+                self._count('retries')
+                time.sleep(self._delay(attempt))
+                attempt += 1
+        finally:
+            self._count('inFlight', -1)
+            service = 'storage' if '/storage/v1/' in request.url.path else 'postgrest'
+            observe_supabase(service, request.method, status, time.perf_counter() - started)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        connections = getattr(getattr(self._transport, '_pool', None), 'connections', [])
+        stats['connections'] = len(connections)
+        stats['idleConnections'] = sum(1 for connection in connections if connection.is_idle())
+        stats['maxConnections'] = self.max_connections
+        return stats
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncPooledTransport(PooledTransport, httpx.AsyncBaseTransport):
+    # PooledTransport for httpx.AsyncClient: the same timeouts, retries and
+    # counters, on an asyncio connection pool.
+
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_expiry=30.0, http2=True, **kwargs):
+        kwargs.setdefault('transport', httpx.AsyncHTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry
+            )
+        ))
+        super().__init__(max_connections=max_connections, **kwargs)
+
+    async def handle_async_request(self, request):
+        timeout = self.timeouts.get(self.operation(request))
+        if timeout is not None:
+            request.extensions['timeout'] = timeout.as_dict()
+
+        retryable = request.method in IDEMPOTENT_METHODS
+        attempt = 0
+        status = 'error'
+        started = time.perf_counter()
+        self._enter()
+        try:
+            while True:
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except httpx.PoolTimeout:
+                    self._count('poolTimeouts')
+                    raise
+                except RETRY_EXCEPTIONS as e:
+                    if isinstance(e, httpx.TimeoutException):
+                        self._count('timeouts')
+                    if not retryable or attempt >= self.retries:
+                        self._count('errors')
+                        raise
+                else:
+                    if not (retryable and response.status_code in RETRY_STATUSES and attempt < self.retries):
+                        status = response.status_code
+                        return response
+                    await response.aclose()
+
+                self._count('retries')
+                await asyncio.sleep(self._delay(attempt))
+                attempt += 1
+        finally:
+            self._count('inFlight', -1)
+            service = 'storage' if '/storage/v1/' in request.url.path else 'postgrest'
+            observe_supabase(service, request.method, status, time.perf_counter() - started)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlightTransport(httpx.BaseTransport):
+    # Coalesces identical concurrent PostgREST reads: the first caller runs the
+    # request, callers arriving while it is in flight wait and get a copy of its
+    # response instead of issuing their own. Nothing is cached past the flight,
+    # but a read issued right after a write can join a flight that started
+    # before the write and see the old rows; SUPABASE_SINGLE_FLIGHT=0 opts out.
+
+    def __init__(self, transport, enabled=True):
+        self._transport = transport
+        self.enabled = enabled
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'executed': 0, 'coalesced': 0}
+
+    @staticmethod
+    def flight_key(request):
+        if request.method not in ('GET', 'HEAD') or '/rest/v1/' not in request.url.path:
+            return None
+        headers = tuple((name, request.headers.get(name)) for name in VARYING_HEADERS)
+        return request.method, str(request.url), headers
+
+    @staticmethod
+    def _replay(request, result):
+        status_code, headers, body, extensions = result
+        # Raw (still encoded) bytes, so each copy decodes exactly like the original
+        return httpx.Response(status_code, headers=headers, stream=httpx.ByteStream(body), extensions=dict(extensions), request=request)
+
+    def handle_request(self, request):
+        key = self.flight_key(request) if self.enabled else None
+        if key is None:
+            return self._transport.handle_request(request)
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stats['executed'] += 1
+            else:
+                flight.waiters += 1
+                self._stats['coalesced'] += 1
+        observe_single_flight('executed' if leader else 'coalesced')
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._replay(request, flight.result)
+
+        try:
+            response = self._transport.handle_request(request)
+            try:
+                body = b''.join(response.stream)
+            finally:
+                response.close()
+            extensions = {k: v for k, v in response.extensions.items() if k in ('http_version', 'reason_phrase')}
+            flight.result = (response.status_code, response.headers.multi_items(), body, extensions)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+        return self._replay(request, flight.result)
+
+    def stats(self):
+        stats = self._transport.stats()
+        with self._lock:
+            stats['singleFlight'] = dict(self._stats, inFlight=len(self._flights), enabled=self.enabled)
+        return stats
+
+    def close(self):
+        self._transport.close()
+
+
+def client_timeout(read, write):
+    return httpx.Timeout(connect=Config.SUPABASE_CONNECT_TIMEOUT, read=read, write=write, pool=Config.SUPABASE_POOL_TIMEOUT)
+
+
+def _timeouts():
+    return {
+        'read': client_timeout(Config.SUPABASE_READ_TIMEOUT, Config.SUPABASE_READ_TIMEOUT),
+        'write': client_timeout(Config.SUPABASE_WRITE_TIMEOUT, Config.SUPABASE_WRITE_TIMEOUT),
+        'storage': client_timeout(Config.SUPABASE_STORAGE_TIMEOUT, Config.SUPABASE_STORAGE_TIMEOUT)
+    }
+
+
+def create_async_transport():
+    # Built per event loop by the async client; asyncio pools can't be shared across loops
+    return AsyncPooledTransport(
+        max_connections=Config.SUPABASE_MAX_CONNECTIONS,
+        max_keepalive=Config.SUPABASE_MAX_KEEPALIVE,
+        keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+        http2=Config.SUPABASE_HTTP2,
+        retries=Config.SUPABASE_RETRIES,
+        backoff=Config.SUPABASE_RETRY_BACKOFF,
+        timeouts=_timeouts()
+    )
+
+
+pooled_transport = PooledTransport(
+    max_connections=Config.SUPABASE_MAX_CONNECTIONS,
+    max_keepalive=Config.SUPABASE_MAX_KEEPALIVE,
+    keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+    http2=Config.SUPABASE_HTTP2,
+    retries=Config.SUPABASE_RETRIES,
+    backoff=Config.SUPABASE_RETRY_BACKOFF,
+    timeouts=_timeouts()
+)
+
+transport = SingleFlightTransport(pooled_transport, enabled=Config.SUPABASE_SINGLE_FLIGHT)
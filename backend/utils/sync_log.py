@@ -0,0 +1,102 @@
+import base64
+import json
+import logging
+from utils.supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+def encode_sync_cursor(state):
+    raw = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _is_xid(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _valid_position(position):
+    if not isinstance(position, dict) or set(position) - {'from', 'to', 'after'}:
+        return False
+    if any(position.get(key) is not None and not _is_xid(position[key]) for key in ('from', 'to')):
+        return False
+    after = position.get('after')
+    if after is None:
+        return True
+    # Mid-pass positions carry the watermark the pass started with
+    return (isinstance(after, list) and len(after) == 2 and all(_is_xid(part) for part in after)
+            and position.get('to') is not None)
+
+
+def decode_sync_cursor(cursor, streams):
+    # {'at': issued (epoch seconds), '<stream>': position} where a position is
+    # {'from': xid watermark, 'to': watermark of the pass in progress,
+    #  'after': [sync_xid, id] of the last row sent in that pass}
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid sync cursor.')
+    if (not isinstance(state, dict) or isinstance(state.get('at'), bool)
+            or not isinstance(state.get('at'), (int, float))
+            or set(state) - {'at', *streams}
+            or not all(_valid_position(state[name]) for name in streams if name in state)):
+        raise ValueError('Invalid sync cursor.')
+    return state
+
+
+def sync_watermark():
+    """Oldest transaction id still running; rows written below it are committed."""
+    return int(supabase.rpc('sync_watermark').execute().data)
+
+
+def changed_since(table, fields, user_id, position, limit):
+    # Rows written at or after position['from'], past the position's keyset,
+    # in (sync_xid, id) order. Fetches one extra row so callers can tell if
+    # more remain.
+    query = supabase.table(table).select(f'{fields}, sync_xid').eq('user_id', user_id)
+    position = position or {}
+    if position.get('from') is not None:
+        query = query.gte('sync_xid', int(position['from']))
+    if position.get('after'):
+        xid, row_id = (int(part) for part in position['after'])
+        query = query.or_(f'sync_xid.gt.{xid},and(sync_xid.eq.{xid},id.gt.{row_id})')
+    return query.order('sync_xid').order('id').limit(limit + 1).execute().data
+
+
+def advance(position, rows, limit, watermark):
+    """Cut `rows` to one page and return (rows, next position, more pending)."""
+    position = position or {}
+    # A pass keeps the watermark it started with until its last page
+    to = position['to'] if position.get('after') else watermark
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, {'from': position.get('from'), 'to': to, 'after': [int(last['sync_xid']), int(last['id'])]}, True
+    return rows, {'from': to}, False
+
+
+def record_deletes(user_id, resource, row_ids):
+    """Write tombstones for rows a handler just deleted."""
+    rows = [{'user_id': user_id, 'resource': resource, 'row_id': str(row_id)} for row_id in row_ids]
+    if not rows:
+        return
+    try:
+        supabase.table('sync_tombstones').insert(rows).execute()
+    except Exception as e:
+        # The delete already happened; clients holding a cursor keep the row
+        # until their next full resync
+        logger.exception('Error recording %s tombstones', resource)
+
+
+async def record_deletes_async(client, user_id, resource, row_ids):
+    rows = [{'user_id': user_id, 'resource': resource, 'row_id': str(row_id)} for row_id in row_ids]
+    if not rows:
+        return
+    try:
+        await client.table('sync_tombstones').insert(rows).execute()
+    except Exception as e:
+        logger.exception('Error recording %s tombstones', resource)
+
+
+def deleted_since(user_id, position, limit):
+    return changed_since('sync_tombstones', 'id, resource, row_id', user_id, position, limit)
@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+
+
+class TokenCache:
+    # Bounded LRU of verified tokens -> g.user, each entry living at most
+    # `ttl` seconds and never past the JWT's own `exp`.
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            user, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(user)
+
+    def put(self, token, user, exp=None):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        with self._lock:
+            self._entries[token] = (dict(user), expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_user(self, user_id=None, email=None):
+        with self._lock:
+            stale = [
+                token for token, (user, _) in self._entries.items()
+                if (user_id is not None and str(user.get('id')) == str(user_id))
+                or (email is not None and user.get('email') == email)
+            ]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxSize': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+token_cache = TokenCache(max_size=Config.TOKEN_CACHE_SIZE, ttl=Config.TOKEN_CACHE_TTL)
@@ -0,0 +1,94 @@
+import io
+import os
+import tempfile
+from flask import Request
+from config import Config
+
+# Magic-byte prefixes of the image formats we accept, with their MIME type and extension
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+    (b'GIF87a', 'image/gif', 'gif'),
+    (b'GIF89a', 'image/gif', 'gif'),
+    (b'BM', 'image/bmp', 'bmp'),
+    (b'\x00\x00\x01\x00', 'image/x-icon', 'ico'),
+)
+
+
+class UploadError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SpooledRequest(Request):
+    # Multipart file parts are spooled: small uploads stay in memory, larger
+    # ones roll over to a temp file instead of growing worker RSS.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_SIZE)
+
+
+def sniff_image_type(head):
+    for signature, mime_type, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime_type, extension
+    # RIFF....WEBP
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    return None, None
+
+
+class PreparedUpload:
+    # A validated upload ready to hand to storage. Use as a context manager so
+    # any file handles opened for streaming are closed afterwards.
+
+    def __init__(self, stream, size, content_type, extension):
+        self.stream = stream
+        self.size = size
+        self.content_type = content_type
+        self.extension = extension
+        self._readers = []
+
+    def body(self):
+        self.stream.seek(0)
+        if self.size <= Config.UPLOAD_SPOOL_SIZE:
+            return self.stream.read()
+
+        # Hand storage a real file reader so the request body is sent in chunks
+        try:
+            reader = os.fdopen(os.dup(self.stream.fileno()), 'rb')
+        except (OSError, AttributeError, io.UnsupportedOperation):
+            return self.stream.read()
+        reader.seek(0)
+        self._readers.append(reader)
+        return reader
+
+    def close(self):
+        for reader in self._readers:
+            reader.close()
+        self._readers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prepare_upload(file):
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+
+    if size == 0:
+        raise UploadError('Uploaded file is empty.')
+    if size > Config.MAX_UPLOAD_SIZE:
+        raise UploadError(f'File is too large. Maximum size is {Config.MAX_UPLOAD_SIZE // (1024 * 1024)} MB.', 413)
+
+    content_type, extension = sniff_image_type(stream.read(16))
+    stream.seek(0)
+    if not content_type:
+        raise UploadError('Unsupported file type. Please upload a JPEG, PNG, GIF, WebP, BMP or ICO image.', 415)
+
+    return PreparedUpload(stream, size, content_type, extension)
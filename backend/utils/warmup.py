@@ -0,0 +1,37 @@
+import logging
+import time
+from utils.supabase_client import supabase
+from utils.password_hasher import password_hasher
+from utils.mail_templates import mail_templates
+from utils.static_assets import static_assets
+from utils import decorators, image_variants
+
+logger = logging.getLogger(__name__)
+
+
+def _steps():
+    steps = [
+        ('bcrypt', lambda: password_hasher.rounds),
+        ('mailTemplates', mail_templates.load),
+        ('staticAssets', static_assets.build),
+        ('jwt', lambda: decorators.jwt.decode),
+    ]
+    if supabase:
+        steps.insert(0, ('supabase', supabase.get))
+    if image_variants.enabled():
+        steps.append(('pillow', lambda: image_variants.Image.open))
+    return steps
+
+
+def warmup():
+    """Run everything lazy-init mode defers; returns per-step timings in ms."""
+    timings = {}
+    for name, step in _steps():
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception('Warmup step %s failed', name)
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info('Warmup complete', extra={'timingsMs': timings})
+    return timings
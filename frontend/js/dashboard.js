@@ -209,15 +209,19 @@ $(document).ready(function () {
 
     let siteAccountsTable;
 
+    const applyUserInfo = (user) => {
+        $('#userId').val(user.id);
+        $('#firstName').val(user.firstname);
+        $('#middleName').val(user.middlename);
+        $('#lastName').val(user.lastname);
+        $('#email').val(user.email);
+        $('#username').val(user.email);
+    };
+
     const loadUserAccountInfo = async () => {
         const data = await fetchData(`${BASE_URL}/user-info`, 'GET');
         if (data && data.success) {
-            $('#userId').val(data.user.id);
-            $('#firstName').val(data.user.firstname);
-            $('#middleName').val(data.user.middlename);
-            $('#lastName').val(data.user.lastname);
-            $('#email').val(data.user.email);
-            $('#username').val(data.user.email);
+            applyUserInfo(data.user);
         } else if (data) {
             showToast(data.message, 'error');
         }
@@ -251,26 +255,32 @@ $(document).ready(function () {
     });
 
     siteAccountsTable = $('#siteAccountsTable').DataTable({
+        // Filtering, ordering and paging are done by the server
+        serverSide: true,
+        processing: true,
         ajax: {
-            url: `${BASE_URL}/accounts`,
+            url: `${BASE_URL}/accounts/datatable`,
             type: 'GET',
             headers: {
                 'Authorization': `Bearer ${localStorage.getItem('authToken')}`
             },
-            dataSrc: 'accounts'
+            dataSrc: 'data'
         },
+        order: [[1, 'asc']],
         columns: [
             { data: 'id', visible: false },
             { data: 'site' },
             { data: 'username' },
             {
                 data: 'password',
+                orderable: false,
                 render: function (data, type, row) {
                     return '********';
                 }
             },
             {
                 data: 'image',
+                orderable: false,
                 render: function (data, type, row) {
                     // Handle Supabase Storage URLs and local image paths
                     let imageUrl;
@@ -285,12 +295,18 @@ $(document).ready(function () {
                     } else {
                         imageUrl = 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default.png';
                     }
+                    // Prefer the small WebP variant and fall back to the original while it is being generated
+                    const thumbnailUrl = row.imageVariants && row.imageVariants['64'];
+                    if (thumbnailUrl) {
+                        return `<img src="${thumbnailUrl}" onerror="this.onerror=null;this.src='${imageUrl}';" alt="Account Image" class="img-thumbnail" style="width: 50px; height: 50px; object-fit: cover;">`;
+                    }
                     return `<img src="${imageUrl}" alt="Account Image" class="img-thumbnail" style="width: 50px; height: 50px; object-fit: cover;">`;
                 }
             },
 
             {
                 data: null,
+                orderable: false,
                 render: function (data, type, row) {
                     // Handle Supabase Storage URLs and local image paths for edit button
                     let imageAttribute;
@@ -547,15 +563,34 @@ $(document).ready(function () {
         }
     });
 
+    const applyProfilePicture = (profilepicture, variants) => {
+        const avatarUrl = variants && variants['256'];
+        $('#userProfilePicture')
+            .one('error', function () { $(this).attr('src', profilepicture); })
+            .attr('src', avatarUrl || profilepicture);
+    };
+
     const loadUserProfilePicture = async () => {
         const data = await fetchData(`${BASE_URL}/profile-picture`);
         if (data && data.success && data.profilepicture) {
-            $('#userProfilePicture').attr('src', data.profilepicture);
+            applyProfilePicture(data.profilepicture, data.profilepictureVariants);
         } else {
             $('#userProfilePicture').attr('src', 'https://nttadnyxpbuwuhgtpvjh.supabase.co/storage/v1/object/public/images/default-profile.png');
         }
     };
-    loadUserProfilePicture();
+
+    // Profile form and avatar come from one /bootstrap request on page load;
+    // the accounts table keeps paging itself through /accounts/datatable
+    const loadBootstrap = async () => {
+        const data = await fetchData(`${BASE_URL}/bootstrap?sections=user`);
+        if (data && data.success && data.user) {
+            applyUserInfo(data.user);
+            applyProfilePicture(data.user.profilepicture, data.user.profilepictureVariants);
+        } else {
+            loadUserProfilePicture();
+        }
+    };
+    loadBootstrap();
 
     const initialHash = window.location.hash;
     if (initialHash && $(initialHash).hasClass('content-section')) {